@@ -0,0 +1,116 @@
+# Handshake58 Subnet 58 - Benchmark Harness
+#
+# Shared helpers for the benchmarks: throwaway wallets, building real
+# Miner/Validator neurons against the --mock chain, resource usage and
+# percentile reporting. Import this only after any env vars that
+# subnet58.config reads (REGISTRY_URLS, PROBES_PER_ROUND, ...) are set.
+
+import importlib.util
+import os
+import resource
+import sys
+import time
+from typing import Dict, List, Sequence
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+WALLET_NAME = "bench"
+
+
+def load_neuron_module(name: str):
+    """Import neurons/<name>.py (not a package) as hs58_<name>."""
+    module_name = f"hs58_{name}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    path = os.path.join(REPO_ROOT, "neurons", f"{name}.py")
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_wallets(path: str, hotkeys: Sequence[str]) -> None:
+    """One unencrypted coldkey with the given hotkeys under path."""
+    import bittensor as bt
+
+    wallet = bt.Wallet(name=WALLET_NAME, hotkey=hotkeys[0], path=path)
+    wallet.create_new_coldkey(use_password=False, overwrite=True, suppress=True)
+    for hotkey in hotkeys:
+        bt.Wallet(name=WALLET_NAME, hotkey=hotkey, path=path).create_new_hotkey(
+            use_password=False, overwrite=True, suppress=True
+        )
+
+
+def build_neuron(cls, workdir: str, hotkey: str, extra_args: Sequence[str] = ()):
+    """Construct a neuron on the mock chain, feeding its CLI config through argv."""
+    import bittensor as bt
+
+    argv = sys.argv
+    sys.argv = [
+        "bench",
+        "--mock",
+        "--netuid", "58",
+        "--wallet.name", WALLET_NAME,
+        "--wallet.hotkey", hotkey,
+        "--wallet.path", workdir,
+        "--logging.logging_dir", os.path.join(workdir, "logs"),
+        *extra_args,
+    ]
+    try:
+        neuron = cls()
+    finally:
+        sys.argv = argv
+    bt.logging.set_warning()
+    return neuron
+
+
+def percentile(samples: Sequence[float], q: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, int(round(q / 100 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ResourceMeter:
+    """Wall, CPU (user+sys) and RSS deltas around a block."""
+
+    def __enter__(self) -> "ResourceMeter":
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self._cpu0 = usage.ru_utime + usage.ru_stime
+        self._wall0 = time.perf_counter()
+        self.rss_start_mb = rss_mb()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.wall_s = time.perf_counter() - self._wall0
+        self.cpu_s = usage.ru_utime + usage.ru_stime - self._cpu0
+        self.rss_end_mb = rss_mb()
+        self.peak_rss_mb = usage.ru_maxrss / 1024
+
+
+def print_table(rows: List[Dict], columns: Sequence[str]) -> None:
+    widths = {c: max([len(c)] + [len(_fmt(r.get(c))) for r in rows]) for c in columns}
+    print("  ".join(c.rjust(widths[c]) for c in columns))
+    for row in rows:
+        print("  ".join(_fmt(row.get(c)).rjust(widths[c]) for c in columns))
+
+
+def _fmt(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return "-" if value is None else str(value)
@@ -0,0 +1,211 @@
+# Handshake58 Subnet 58 - Miner Load Test
+#
+# Drives a real miner axon (Miner.forward/blacklist/priority behind the
+# bittensor HTTP server) with synthetic validator traffic. Three processes:
+# a stand-in provider farm with known injected latency, the miner on the
+# mock chain with many fake staked validator hotkeys, and this load
+# generator signing requests from those hotkeys with real dendrites.
+#
+#   python benchmarks/miner_load.py --concurrency 1 8 32 128 --duration 15
+#
+# Reports sustained requests/s, p50/p99/p999 response time and the error of
+# the miner's reported probe_latency_ms against the providers' latency.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+NETUID = 58
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def serve_miner(args) -> None:
+    """--serve worker: a Miner on the mock chain behind a real axon."""
+    import harness
+    from subnet58.mock import get_mock_chain
+
+    miner_mod = harness.load_neuron_module("miner")
+    workdir = tempfile.mkdtemp(prefix="hs58-load-")
+    harness.make_wallets(workdir, ["miner"])
+
+    with open(args.validators_file) as f:
+        validators = json.load(f)
+    chain = get_mock_chain(NETUID)
+    for hotkey in validators:
+        chain.register(hotkey, stake=args.stake, validator_permit=True)
+
+    miner = harness.build_neuron(
+        miner_mod.Miner, workdir, "miner",
+        ["--axon.port", str(args.port), "--axon.external_ip", "127.0.0.1"],
+    )
+    miner.subtensor.serve_axon(netuid=NETUID, axon=miner.axon)
+    miner.axon.start()
+
+    print("READY " + json.dumps({
+        "hotkey": miner.wallet.hotkey.ss58_address,
+        "coldkey": miner.wallet.coldkeypub.ss58_address,
+        "port": args.port,
+    }), flush=True)
+    try:
+        while True:
+            time.sleep(5)
+            if miner.rate_limiter is not None:
+                print("STATS " + json.dumps(miner.rate_limiter.stats()), flush=True)
+    except KeyboardInterrupt:
+        miner.axon.stop()
+
+
+async def drive(dendrites, axon, providers: List[Dict], concurrency: int, duration: float, timeout: float):
+    from subnet58.protocol import ProviderProbe
+
+    response_ms: List[float] = []
+    latency_error_ms: List[float] = []
+    statuses: Dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+    healthy = [p for p in providers if p["failure_rate"] == 0]
+
+    async def worker(i: int):
+        dendrite = dendrites[i % len(dendrites)]
+        rng = random.Random(i)
+        while time.perf_counter() < deadline:
+            provider = rng.choice(healthy)
+            start = time.perf_counter()
+            resp = await dendrite.forward(
+                axons=axon,
+                synapse=ProviderProbe(target_url=provider["url"]),
+                timeout=timeout,
+                deserialize=False,
+            )
+            response_ms.append((time.perf_counter() - start) * 1000)
+            code = int(resp.dendrite.status_code or 0)
+            statuses[code] = statuses.get(code, 0) + 1
+            if code == 200 and resp.probe_reachable:
+                latency_error_ms.append(resp.probe_latency_ms - provider["latency_ms"])
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return response_ms, latency_error_ms, statuses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Miner axon load test.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per concurrency level")
+    parser.add_argument("--validators", type=int, default=32, help="Fake validator hotkeys")
+    parser.add_argument("--providers", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=100.0, help="Injected provider latency")
+    parser.add_argument("--timeout", type=float, default=12.0)
+    parser.add_argument("--port", type=int, default=18091)
+    parser.add_argument("--stake", type=float, default=10_000.0)
+    parser.add_argument(
+        "--keep-rate-limit", action="store_true",
+        help="Keep the miner's RATE_LIMIT_* settings (default: disable to measure raw throughput)",
+    )
+    parser.add_argument("--out", type=str, default=None, help="Write results as JSON")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--validators-file", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve_miner(args)
+        return
+
+    import harness
+    import bittensor as bt
+
+    keypairs = [
+        bt.Keypair.create_from_mnemonic(bt.Keypair.generate_mnemonic())
+        for _ in range(args.validators)
+    ]
+    workdir = tempfile.mkdtemp(prefix="hs58-load-")
+    validators_file = os.path.join(workdir, "validators.json")
+    with open(validators_file, "w") as f:
+        json.dump([kp.ss58_address for kp in keypairs], f)
+
+    farm = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "providers.py"),
+         "--providers", str(args.providers), "--latency-ms", str(args.latency_ms)],
+        stdout=subprocess.PIPE, text=True,
+    )
+    env = dict(os.environ)
+    if not args.keep_rate_limit:
+        env["RATE_LIMIT_ENABLED"] = "false"
+    miner = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve",
+         "--port", str(args.port), "--stake", str(args.stake),
+         "--validators-file", validators_file],
+        stdout=subprocess.PIPE, text=True, env=env,
+    )
+    try:
+        providers = json.loads(farm.stdout.readline())["providers"]
+        line = miner.stdout.readline()
+        while line and not line.startswith("READY "):
+            line = miner.stdout.readline()
+        if not line:
+            raise RuntimeError("miner process exited before becoming ready")
+        info = json.loads(line[len("READY "):])
+        axon = bt.AxonInfo(
+            version=0, ip="127.0.0.1", port=info["port"], ip_type=4,
+            hotkey=info["hotkey"], coldkey=info["coldkey"],
+        )
+        dendrites = [bt.Dendrite(wallet=kp) for kp in keypairs]
+        loop = asyncio.new_event_loop()
+
+        results = []
+        for concurrency in args.concurrency:
+            with harness.ResourceMeter() as meter:
+                response_ms, error_ms, statuses, elapsed = loop.run_until_complete(
+                    drive(dendrites, axon, providers, concurrency, args.duration, args.timeout)
+                )
+            ok = statuses.get(200, 0)
+            abs_error = [abs(e) for e in error_ms]
+            row = {
+                "concurrency": concurrency,
+                "requests": len(response_ms),
+                "ok_rps": ok / elapsed,
+                "p50_ms": harness.percentile(response_ms, 50),
+                "p99_ms": harness.percentile(response_ms, 99),
+                "p999_ms": harness.percentile(response_ms, 99.9),
+                "lat_err_mean_ms": sum(error_ms) / len(error_ms) if error_ms else None,
+                "lat_err_p50_ms": harness.percentile(abs_error, 50),
+                "lat_err_p99_ms": harness.percentile(abs_error, 99),
+                "loadgen_cpu_s": meter.cpu_s,
+                "statuses": statuses,
+            }
+            results.append(row)
+            print(
+                f"concurrency={concurrency:>4} rps={row['ok_rps']:.1f} "
+                f"p50={row['p50_ms']:.1f}ms p99={row['p99_ms']:.1f}ms "
+                f"statuses={statuses}",
+                flush=True,
+            )
+            for dendrite in dendrites:
+                loop.run_until_complete(dendrite.aclose_session())
+
+        print()
+        harness.print_table(results, [
+            "concurrency", "requests", "ok_rps", "p50_ms", "p99_ms", "p999_ms",
+            "lat_err_mean_ms", "lat_err_p50_ms", "lat_err_p99_ms", "loadgen_cpu_s",
+        ])
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(results, f, indent=2)
+    finally:
+        miner.terminate()
+        farm.terminate()
+        miner.wait(10)
+        farm.wait(10)
+
+
+if __name__ == "__main__":
+    main()
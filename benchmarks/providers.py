@@ -0,0 +1,232 @@
+# Handshake58 Subnet 58 - Stand-in Provider Farm
+#
+# A fleet of fake provider HTTP endpoints on 127.0.0.1 with configurable
+# latency, status code and failure rate, plus a registry endpoint listing
+# them in the marketplace format. Everything runs on one asyncio loop in a
+# background thread, so thousands of concurrent probes cost very little.
+
+import asyncio
+import json
+import random
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+
+@dataclass
+class ProviderSpec:
+    name: str
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    status: int = 200
+    # Probability a request is answered by dropping the connection
+    failure_rate: float = 0.0
+    protocol: str = "drain"
+
+
+class ProviderFarm:
+    """
+    Serves each ProviderSpec on its own port and a registry on another.
+
+    Use as a context manager:
+
+        with ProviderFarm(specs) as farm:
+            os.environ["REGISTRY_URLS"] = farm.registry_url
+    """
+
+    def __init__(
+        self,
+        specs: List[ProviderSpec],
+        seed: Optional[int] = None,
+        registry_latency_ms: float = 0.0,
+    ):
+        self.specs = specs
+        self.registry_latency_ms = registry_latency_ms
+        self.ports: Dict[str, int] = {}
+        self.registry_port = 0
+        # Bump after changing specs so ?since= clients refetch the listing
+        self.registry_version = 1
+        self.requests_served = 0
+        self._rng = random.Random(seed)
+        self._loop = asyncio.new_event_loop()
+        self._servers: List[asyncio.base_events.Server] = []
+        self._thread = threading.Thread(target=self._loop.run_forever, name="provider-farm", daemon=True)
+
+    # -- lifecycle -------------------------------------------------------
+
+    def start(self) -> "ProviderFarm":
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start_servers(), self._loop).result()
+        return self
+
+    def stop(self) -> None:
+        async def _close():
+            for server in self._servers:
+                server.close()
+            await asyncio.gather(*(s.wait_closed() for s in self._servers), return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result(timeout=10)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+    def __enter__(self) -> "ProviderFarm":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    async def _start_servers(self) -> None:
+        for spec in self.specs:
+            server = await asyncio.start_server(
+                lambda r, w, s=spec: self._serve_provider(r, w, s), "127.0.0.1", 0, backlog=4096,
+            )
+            self.ports[spec.name] = server.sockets[0].getsockname()[1]
+            self._servers.append(server)
+        registry = await asyncio.start_server(self._serve_registry, "127.0.0.1", 0)
+        self.registry_port = registry.sockets[0].getsockname()[1]
+        self._servers.append(registry)
+
+    # -- endpoints -------------------------------------------------------
+
+    @property
+    def registry_url(self) -> str:
+        return f"http://127.0.0.1:{self.registry_port}/api/validator/registry"
+
+    def url_for(self, name: str) -> str:
+        return f"http://127.0.0.1:{self.ports[name]}/health"
+
+    def registry_payload(self, since: Optional[str] = None) -> Dict:
+        """Full listing, or an empty delta when since is the current version."""
+        version = str(self.registry_version)
+        if since == version:
+            return {"delta": True, "since": since, "version": version, "upserts": [], "removed": []}
+        return {
+            "version": version,
+            "providers": [
+                {
+                    "id": spec.name,
+                    "name": spec.name,
+                    "probeUrl": self.url_for(spec.name),
+                    "protocol": spec.protocol,
+                }
+                for spec in self.specs
+            ]
+        }
+
+    @staticmethod
+    async def _read_request(reader: asyncio.StreamReader) -> Optional[bytes]:
+        """Request head (request line + headers), None once the client is gone."""
+        try:
+            return await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            return None
+
+    @staticmethod
+    def _response(status: int, body: bytes, content_type: str = "text/plain") -> bytes:
+        return (
+            f"HTTP/1.1 {status} X\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        ).encode() + body
+
+    async def _serve_provider(self, reader, writer, spec: ProviderSpec) -> None:
+        try:
+            while await self._read_request(reader):
+                self.requests_served += 1
+                delay = spec.latency_ms + (self._rng.uniform(-1, 1) * spec.jitter_ms)
+                await asyncio.sleep(max(delay, 0.0) / 1000)
+                if self._rng.random() < spec.failure_rate:
+                    break
+                writer.write(self._response(spec.status, b"ok"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_registry(self, reader, writer) -> None:
+        try:
+            while True:
+                head = await self._read_request(reader)
+                if head is None:
+                    break
+                if self.registry_latency_ms:
+                    await asyncio.sleep(self.registry_latency_ms / 1000)
+                query = parse_qs(urlsplit(head.split(b" ", 2)[1].decode()).query)
+                since = query.get("since", [None])[0]
+                body = json.dumps(self.registry_payload(since)).encode()
+                writer.write(self._response(200, body, "application/json"))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def make_fleet(
+    n: int,
+    latency_ms: float = 50.0,
+    jitter_ms: float = 10.0,
+    failure_rate: float = 0.0,
+    down_fraction: float = 0.0,
+    status: int = 200,
+    seed: int = 0,
+) -> List[ProviderSpec]:
+    """n providers; down_fraction of them fail every request."""
+    rng = random.Random(seed)
+    specs = []
+    for i in range(n):
+        down = rng.random() < down_fraction
+        specs.append(ProviderSpec(
+            name=f"provider-{i}",
+            latency_ms=latency_ms * rng.uniform(0.5, 1.5),
+            jitter_ms=jitter_ms,
+            status=status,
+            failure_rate=1.0 if down else failure_rate,
+        ))
+    return specs
+
+
+def main():
+    """Run a farm standalone; prints one JSON line describing it, then serves."""
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Stand-in provider farm.")
+    parser.add_argument("--providers", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--down-fraction", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    specs = make_fleet(
+        args.providers, args.latency_ms, args.jitter_ms,
+        args.failure_rate, args.down_fraction, seed=args.seed,
+    )
+    with ProviderFarm(specs, seed=args.seed) as farm:
+        print(json.dumps({
+            "registry_url": farm.registry_url,
+            "providers": [
+                {
+                    "name": s.name,
+                    "url": farm.url_for(s.name),
+                    "latency_ms": s.latency_ms,
+                    "failure_rate": s.failure_rate,
+                }
+                for s in specs
+            ],
+        }), flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
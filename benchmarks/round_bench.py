@@ -0,0 +1,187 @@
+# Handshake58 Subnet 58 - End-to-End Round Benchmark
+#
+# Runs full validation rounds (registry fetch, dendrite fan-out, consensus,
+# scoring) against N in-process miners executing the real Miner.forward,
+# which probe a local farm of stand-in providers. Each (miners, probes)
+# point runs in a fresh subprocess so CPU and RSS are measured in isolation.
+#
+#   python benchmarks/round_bench.py --miners 16 64 256 --probes 5 20
+#
+# Reports median round wall-clock, p50/p99 per-query latency as seen by the
+# validator, CPU seconds per round and RSS.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from statistics import median
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from providers import ProviderFarm, make_fleet  # noqa: E402
+
+NETUID = 58
+
+
+def run_point(args) -> dict:
+    """One benchmark point, executed inside a worker subprocess."""
+    specs = make_fleet(
+        args.providers,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        failure_rate=args.failure_rate,
+        down_fraction=args.down_fraction,
+        seed=args.seed,
+    )
+    workdir = tempfile.mkdtemp(prefix="hs58-bench-")
+
+    with ProviderFarm(specs, seed=args.seed) as farm:
+        os.environ["REGISTRY_URLS"] = farm.registry_url
+        os.environ["REGISTRY_CACHE"] = os.path.join(workdir, "registry_cache.json")
+        os.environ["PROBES_PER_ROUND"] = str(args.probes)
+
+        import harness
+        from subnet58.mock import get_mock_chain
+
+        miner_mod = harness.load_neuron_module("miner")
+        validator_mod = harness.load_neuron_module("validator")
+
+        hotkeys = ["validator"] + [f"miner{i}" for i in range(args.miners)]
+        harness.make_wallets(workdir, hotkeys)
+
+        # Register the validator with stake first so miners admit it
+        import bittensor as bt
+        vwallet = bt.Wallet(name=harness.WALLET_NAME, hotkey="validator", path=workdir)
+        get_mock_chain(NETUID).register(
+            vwallet.hotkey.ss58_address, vwallet.coldkeypub.ss58_address,
+            stake=10_000.0, validator_permit=True,
+        )
+
+        with harness.ResourceMeter() as setup:
+            miners = []
+            for i in range(args.miners):
+                miner = harness.build_neuron(
+                    miner_mod.Miner, workdir, f"miner{i}",
+                    ["--axon.port", str(20000 + i), "--axon.external_ip", "127.0.0.1"],
+                )
+                miner.subtensor.serve_axon(netuid=NETUID, axon=miner.axon)
+                miners.append(miner)
+            validator = harness.build_neuron(
+                validator_mod.Validator, workdir, "validator", ["--neuron.axon_off"]
+            )
+            for miner in miners:
+                miner.metagraph.sync()
+
+        # Collect per-query latency as the validator sees it
+        latencies = []
+        statuses = {}
+        forward = validator.dendrite.forward
+
+        async def timed_forward(*a, **kw):
+            responses = await forward(*a, **kw)
+            for r in responses:
+                latencies.append(r.dendrite.process_time * 1000)
+                code = r.dendrite.status_code
+                statuses[code] = statuses.get(code, 0) + 1
+            return responses
+
+        validator.dendrite.forward = timed_forward
+
+        round_s, cpu_s = [], []
+        for r in range(args.warmup + args.rounds):
+            with harness.ResourceMeter() as meter:
+                validator.sync()
+                validator.loop.run_until_complete(validator.forward())
+            if r >= args.warmup:
+                round_s.append(meter.wall_s)
+                cpu_s.append(meter.cpu_s)
+            else:
+                latencies.clear()
+                statuses.clear()
+
+        return {
+            "miners": args.miners,
+            "probes": args.probes,
+            "providers": args.providers,
+            "rounds": args.rounds,
+            "setup_s": setup.wall_s,
+            "round_s": median(round_s),
+            "round_max_s": max(round_s),
+            "query_p50_ms": harness.percentile(latencies, 50),
+            "query_p99_ms": harness.percentile(latencies, 99),
+            "cpu_s_per_round": median(cpu_s),
+            "rss_mb": harness.rss_mb(),
+            "peak_rss_mb": meter.peak_rss_mb,
+            "statuses": statuses,
+            "spot_checks": {
+                outcome: validator.metrics.spot_checks.get(outcome)
+                for outcome in ("agree", "disagree", "tiebreak", "pending")
+            },
+            "provider_requests": farm.requests_served,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end validation round benchmark.")
+    parser.add_argument("--miners", type=int, nargs="+", default=[16, 64, 128, 256])
+    parser.add_argument("--probes", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--providers", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--failure-rate", type=float, default=0.02)
+    parser.add_argument("--down-fraction", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=str, default=None, help="Write results as JSON")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        args.miners, args.probes = args.miners[0], args.probes[0]
+        print("RESULT " + json.dumps(run_point(args)), flush=True)
+        return
+
+    import harness
+
+    results = []
+    for n_miners in args.miners:
+        for n_probes in args.probes:
+            cmd = [
+                sys.executable, os.path.abspath(__file__), "--worker",
+                "--miners", str(n_miners), "--probes", str(n_probes),
+                "--providers", str(args.providers), "--rounds", str(args.rounds),
+                "--warmup", str(args.warmup), "--latency-ms", str(args.latency_ms),
+                "--jitter-ms", str(args.jitter_ms), "--failure-rate", str(args.failure_rate),
+                "--down-fraction", str(args.down_fraction), "--seed", str(args.seed),
+            ]
+            start = time.perf_counter()
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            lines = [l for l in proc.stdout.splitlines() if l.startswith("RESULT ")]
+            if proc.returncode != 0 or not lines:
+                print(f"miners={n_miners} probes={n_probes} failed:\n{proc.stderr[-2000:]}")
+                continue
+            result = json.loads(lines[-1][len("RESULT "):])
+            result["wall_s"] = time.perf_counter() - start
+            results.append(result)
+            print(
+                f"miners={n_miners:>3} probes={n_probes:>3} round={result['round_s']:.2f}s "
+                f"p50={result['query_p50_ms']:.1f}ms p99={result['query_p99_ms']:.1f}ms",
+                flush=True,
+            )
+
+    print()
+    harness.print_table(results, [
+        "miners", "probes", "round_s", "round_max_s", "query_p50_ms", "query_p99_ms",
+        "cpu_s_per_round", "rss_mb", "peak_rss_mb",
+    ])
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
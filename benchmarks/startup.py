@@ -0,0 +1,167 @@
+# Handshake58 Subnet 58 - Startup Benchmark
+#
+# Measures neuron cold start: interpreter launch to a constructed Miner or
+# Validator on the mock chain, split into module import and __init__. Each
+# sample runs in a fresh subprocess. Chain connect and registry latency can
+# be injected to show how much of it overlaps in the parallel init.
+#
+#   python benchmarks/startup.py --repeat 5 --connect-delay-ms 1500 --registry-latency-ms 800
+#   python benchmarks/startup.py --importtime 15
+#
+# Reports median/max process, import and init time per role, and with
+# --importtime the slowest modules by cumulative import time.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from statistics import median
+
+T_PROCESS = time.perf_counter()
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+NETUID = 58
+
+
+def run_sample(args) -> dict:
+    """One cold start, executed inside a worker subprocess."""
+    from providers import ProviderFarm, make_fleet
+
+    workdir = tempfile.mkdtemp(prefix="hs58-startup-")
+    farm = ProviderFarm(make_fleet(10), registry_latency_ms=args.registry_latency_ms).start()
+    os.environ["REGISTRY_URLS"] = farm.registry_url
+    os.environ["REGISTRY_CACHE"] = os.path.join(workdir, "registry_cache.json")
+
+    t_import = time.perf_counter()
+    import harness
+    module = harness.load_neuron_module(args.role)
+    import_s = time.perf_counter() - t_import
+
+    harness.make_wallets(workdir, [args.role])
+    if args.connect_delay_ms:
+        from subnet58.mock import MockSubtensor
+
+        mock_init = MockSubtensor.__init__
+
+        def slow_init(self, *a, **kw):
+            time.sleep(args.connect_delay_ms / 1000)
+            mock_init(self, *a, **kw)
+
+        MockSubtensor.__init__ = slow_init
+
+    if args.role == "miner":
+        cls, extra = module.Miner, ["--axon.port", "21000", "--axon.external_ip", "127.0.0.1"]
+    else:
+        cls, extra = module.Validator, ["--neuron.axon_off"]
+
+    t_init = time.perf_counter()
+    neuron = harness.build_neuron(cls, workdir, args.role, extra)
+    init_s = time.perf_counter() - t_init
+
+    first_round_s = None
+    if args.role == "validator":
+        t_round = time.perf_counter()
+        neuron.loop.run_until_complete(neuron.forward())
+        first_round_s = time.perf_counter() - t_round
+
+    farm.stop()
+    return {
+        "role": args.role,
+        "import_s": import_s,
+        "init_s": init_s,
+        "ready_s": time.perf_counter() - T_PROCESS,
+        "first_round_s": first_round_s,
+        "modules": len(sys.modules),
+    }
+
+
+def top_imports(stderr: str, n: int):
+    """Slowest modules by cumulative time from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3:
+            continue
+        self_us, cumulative_us, name = parts
+        rows.append((int(cumulative_us), int(self_us), name))
+    rows.sort(reverse=True)
+    return rows[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Neuron cold-start benchmark.")
+    parser.add_argument("--roles", nargs="+", default=["miner", "validator"], choices=["miner", "validator"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--connect-delay-ms", type=float, default=0.0, help="Injected Subtensor connect time")
+    parser.add_argument("--registry-latency-ms", type=float, default=0.0, help="Injected registry response time")
+    parser.add_argument("--importtime", type=int, default=0, help="Show the N slowest imports per role")
+    parser.add_argument("--out", type=str, default=None, help="Write results as JSON")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--role", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print("RESULT " + json.dumps(run_sample(args)), flush=True)
+        return
+
+    import harness
+
+    results = []
+    for role in args.roles:
+        samples = []
+        for i in range(args.repeat + (1 if args.importtime else 0)):
+            importtime = args.importtime and i == args.repeat
+            cmd = [sys.executable] + (["-X", "importtime"] if importtime else []) + [
+                os.path.abspath(__file__), "--worker", "--role", role,
+                "--connect-delay-ms", str(args.connect_delay_ms),
+                "--registry-latency-ms", str(args.registry_latency_ms),
+            ]
+            start = time.perf_counter()
+            proc = subprocess.run(cmd, capture_output=True, text=True)
+            wall_s = time.perf_counter() - start
+            lines = [l for l in proc.stdout.splitlines() if l.startswith("RESULT ")]
+            if proc.returncode != 0 or not lines:
+                print(f"{role} failed:\n{proc.stderr[-2000:]}")
+                break
+            if importtime:
+                print(f"\nSlowest imports ({role}):")
+                for cumulative_us, self_us, name in top_imports(proc.stderr, args.importtime):
+                    print(f"  {cumulative_us / 1000:9.1f} ms  {name}")
+                continue
+            sample = json.loads(lines[-1][len("RESULT "):])
+            sample["wall_s"] = wall_s
+            samples.append(sample)
+
+        if not samples:
+            continue
+        row = {"role": role, "samples": len(samples), "modules": samples[-1]["modules"]}
+        for key in ("wall_s", "ready_s", "import_s", "init_s", "first_round_s"):
+            values = [s[key] for s in samples if s[key] is not None]
+            if values:
+                row[key] = median(values)
+                row[key.replace("_s", "_max_s")] = max(values)
+        results.append(row)
+        print(
+            f"{role:>9} wall={row['wall_s']:.2f}s import={row['import_s']:.2f}s "
+            f"init={row['init_s']:.2f}s",
+            flush=True,
+        )
+
+    print()
+    harness.print_table(results, [
+        "role", "samples", "wall_s", "wall_max_s", "ready_s", "import_s", "init_s",
+        "init_max_s", "first_round_s", "modules",
+    ])
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
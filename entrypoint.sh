@@ -59,6 +59,36 @@ echo "[entrypoint] Wallet setup complete."
 MAX_RESTART_DELAY=120
 restart_delay=5
 
+# Exit codes from subnet58/config.py
+AUTOUPDATE_EXIT_CODE=42
+HANDOFF_EXIT_CODE=43
+AUTOUPDATE_BRANCH="${AUTOUPDATE_BRANCH:-main}"
+# Shared with the validator: standby ready file, handoff snapshot, active pid
+export HANDOFF_DIR="${HANDOFF_DIR:-$HOME/.hs58/handoff}"
+
+pull_update() {
+    echo "[entrypoint] Pulling ${AUTOUPDATE_BRANCH}..."
+    git pull --ff-only origin "$AUTOUPDATE_BRANCH" || echo "[entrypoint] git pull failed, restarting on the current code"
+}
+
+# After a handoff the validating process is the standby the old one
+# started, not a child of this shell: follow it through active.pid (which
+# moves on if it hands off again) until it exits, then take its exit code
+# from the exit_code file it leaves ("<pid> <code>"; 1 if there is none).
+follow_handoff() {
+    local pid recorded_pid recorded_code
+    while pid=$(cat "${HANDOFF_DIR}/active.pid" 2>/dev/null) && [ -n "$pid" ] && kill -0 "$pid" 2>/dev/null; do
+        sleep 5
+    done
+    exit_code=1
+    if read -r recorded_pid recorded_code < "${HANDOFF_DIR}/exit_code" 2>/dev/null \
+        && [ "$recorded_pid" = "$pid" ] && [ -n "$recorded_code" ]; then
+        exit_code=$recorded_code
+    fi
+    rm -f "${HANDOFF_DIR}/exit_code"
+    echo "[entrypoint] Handed-off validator (pid ${pid:-?}) exited with code ${exit_code}."
+}
+
 run_neuron() {
     if [ "$NEURON_TYPE" = "miner" ]; then
         AXON_PORT="${AXON_PORT:-8091}"
@@ -100,6 +130,18 @@ run_neuron() {
 while true; do
     run_neuron "$@"
     exit_code=$?
+    if [ $exit_code -eq $HANDOFF_EXIT_CODE ]; then
+        echo "[entrypoint] Neuron handed off to a warm standby."
+        restart_delay=5
+        # Sets exit_code to the handed-off validator's, handled below
+        follow_handoff
+    fi
+    if [ $exit_code -eq $AUTOUPDATE_EXIT_CODE ]; then
+        echo "[entrypoint] Neuron exited for auto-update."
+        pull_update
+        restart_delay=5
+        continue
+    fi
     echo "[entrypoint] Neuron exited with code ${exit_code}. Restarting in ${restart_delay}s..."
     sleep $restart_delay
     # Exponential backoff, capped at MAX_RESTART_DELAY
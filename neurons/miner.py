@@ -5,15 +5,16 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import sys
 import time
 import typing
-import httpx
 import bittensor as bt
 
 import subnet58
-from subnet58.protocol import ProviderProbe
+from subnet58.protocol import ENCODING_PACKED, ProviderProbe, pack_probe
 from subnet58.base.miner import BaseMinerNeuron
 from subnet58.config import PROBE_TIMEOUT_MS
+from subnet58.probe import make_client, probe_url
 
 
 class Miner(BaseMinerNeuron):
@@ -27,56 +28,86 @@ class Miner(BaseMinerNeuron):
 
     def __init__(self, config=None):
         super(Miner, self).__init__(config=config)
-        self.http_client = httpx.AsyncClient(
-            timeout=PROBE_TIMEOUT_MS / 1000,
-            follow_redirects=True,
-        )
+        self.http_client = self.startup_result("http_client") or self._make_http_client()
         bt.logging.info(
             f"Neutral Monitor ready (timeout={PROBE_TIMEOUT_MS}ms, "
             f"hotkey={self.wallet.hotkey.ss58_address})"
         )
 
+    def startup_tasks(self):
+        # httpx import + TLS context setup overlap the Subtensor connection
+        return {"http_client": self._make_http_client}
+
+    @staticmethod
+    def _make_http_client():
+        return make_client(PROBE_TIMEOUT_MS)
+
     async def forward(self, synapse: ProviderProbe) -> ProviderProbe:
         """Probe the target URL and fill response fields."""
+        self.metrics.in_flight.inc()
         try:
-            start_ns = time.perf_counter_ns()
-            resp = await self.http_client.get(synapse.target_url)
-            elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
-
-            synapse.probe_reachable = True
-            synapse.probe_status = resp.status_code
-            synapse.probe_latency_ms = elapsed_ms
-        except Exception:
-            synapse.probe_reachable = False
-            synapse.probe_status = 0
-            synapse.probe_latency_ms = 0
+            result = await probe_url(self.http_client, synapse.target_url)
+        finally:
+            self.metrics.in_flight.dec()
+
+        if synapse.probe_encoding >= ENCODING_PACKED:
+            synapse.probe_packed = pack_probe(
+                result.probe_reachable, result.probe_status, result.probe_latency_ms
+            )
+        else:
+            synapse.probe_reachable = result.probe_reachable
+            synapse.probe_status = result.probe_status
+            synapse.probe_latency_ms = result.probe_latency_ms
+        if result.probe_reachable:
+            self.metrics.probes.inc("reachable")
+            self.metrics.probe_latency.observe(result.probe_latency_ms / 1000)
+        else:
+            self.metrics.probes.inc("unreachable")
         return synapse
 
     async def blacklist(
         self, synapse: ProviderProbe
     ) -> typing.Tuple[bool, str]:
+        blocked, reason = self._check_admission(synapse)
+        if blocked:
+            self.metrics.blacklisted.inc(reason)
+        return blocked, reason
+
+    def _check_admission(self, synapse: ProviderProbe) -> typing.Tuple[bool, str]:
         if synapse.dendrite is None or synapse.dendrite.hotkey is None:
             return True, "Missing dendrite or hotkey"
 
         if synapse.dendrite.hotkey not in self.metagraph.hotkeys:
             return True, "Unrecognized hotkey"
 
+        uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
         if self.config.blacklist.force_validator_permit:
-            uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
             if not self.metagraph.validator_permit[uid]:
                 return True, "Non-validator hotkey"
 
+        if self.rate_limiter is not None and not self.rate_limiter.consume(
+            synapse.dendrite.hotkey, float(self.metagraph.S[uid])
+        ):
+            return True, "Rate limit exceeded"
+
         return False, "Hotkey recognized"
 
     async def priority(self, synapse: ProviderProbe) -> float:
         if synapse.dendrite is None or synapse.dendrite.hotkey is None:
             return 0.0
         caller_uid = self.metagraph.hotkeys.index(synapse.dendrite.hotkey)
-        return float(self.metagraph.S[caller_uid])
+        stake = float(self.metagraph.S[caller_uid])
+        # Callers draining their bucket drop behind well-behaved validators
+        if self.rate_limiter is not None:
+            return stake * self.rate_limiter.fill_ratio(synapse.dendrite.hotkey)
+        return stake
 
 
 if __name__ == "__main__":
     with Miner() as miner:
         while True:
+            if miner.chain_failed:
+                bt.logging.error("Subtensor connection failed, exiting.")
+                sys.exit(1)
             bt.logging.info(f"Miner running... {time.time()}")
             time.sleep(5)
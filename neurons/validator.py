@@ -8,13 +8,11 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+import os
 import sys
 import time
 import random
-from collections import Counter
-from statistics import median
-from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import numpy as np
 import bittensor as bt
@@ -22,15 +20,38 @@ import bittensor as bt
 import subnet58
 from subnet58.protocol import ProviderProbe
 from subnet58.base.validator import BaseValidatorNeuron
-from subnet58.registry_client import fetch_providers, send_probe_alert
-from subnet58.config import PROBES_PER_ROUND, MAX_LATENCY_DEVIATION
-
-
-@dataclass
-class Consensus:
-    reachable: bool
-    status: int
-    median_latency_ms: int
+from subnet58.registry_client import fetch_provider_updates, send_probe_alert
+from subnet58.validator.provider_table import ProviderTable
+from subnet58.validator.reward import (
+    Consensus,
+    ProbeAnswers,
+    accuracy_from_answers,
+    consensus_from_answers,
+)
+from subnet58.validator.scheduler import RoundAccumulator
+from subnet58.config import (
+    POLL_INTERVAL,
+    PROBES_PER_ROUND,
+    MAX_LATENCY_DEVIATION,
+    PROBE_LOG_ENABLED,
+    PROBE_LOG_RETENTION_DAYS,
+    ROUND_RECORD_DIR,
+    TARGET_SAMPLING,
+    COLLUSION_MODE,
+    COLLUSION_WINDOW,
+    HISTORY_MAX_UIDS,
+    MARKETPLACE_URL,
+    CONSENSUS_FEED_ENABLED,
+    CONSENSUS_FEED_KEYFRAME_EVERY,
+    CONSENSUS_FEED_OUTBOX_MAX,
+    PROBE_BATCHES_PER_EPOCH,
+    SPOT_CHECKS_PER_ROUND,
+    SPOT_CHECK_CONCURRENCY,
+    SPOT_CHECK_TIMEOUT_MS,
+    LATENCY_SKETCHES_ENABLED,
+    LATENCY_SKETCH_ALPHA,
+    PROBE_ENCODING,
+)
 
 
 class Validator(BaseValidatorNeuron):
@@ -43,131 +64,456 @@ class Validator(BaseValidatorNeuron):
 
     def __init__(self, config=None):
         super(Validator, self).__init__(config=config)
+
+        # Optional subsystems are imported only when their setting enables them
+        self.probe_log: Optional["ProbeLog"] = None
+
+        self.recorder: Optional["RoundRecorder"] = None
+        if ROUND_RECORD_DIR:
+            from subnet58.validator.replay import RoundRecorder
+
+            self.recorder = RoundRecorder(ROUND_RECORD_DIR)
+            bt.logging.info(f"Recording raw rounds to {ROUND_RECORD_DIR}")
+
+        self.provider_table = ProviderTable()
+        self._round: Optional[RoundAccumulator] = None
+        self.collusion: Optional["CollusionDetector"] = None
+        self.collusion_report: Optional["CollusionReport"] = None
+        if COLLUSION_MODE in ("log", "penalize"):
+            from subnet58.validator.collusion import CollusionDetector
+
+            self.collusion = CollusionDetector(max_uids=HISTORY_MAX_UIDS, window=COLLUSION_WINDOW)
+        self.sampler: Optional["TargetSampler"] = None
+        if TARGET_SAMPLING == "weighted":
+            from subnet58.validator.sampler import TargetSampler
+
+            self.sampler = TargetSampler()
+
+        self.sketches: Optional["LatencySketches"] = None
+        if LATENCY_SKETCHES_ENABLED:
+            from subnet58.validator.sketch import LatencySketches
+
+            self.sketches = LatencySketches(alpha=LATENCY_SKETCH_ALPHA)
+
+        self.spot_checker: Optional["SpotChecker"] = None
+        if SPOT_CHECKS_PER_ROUND > 0:
+            from subnet58.validator.spot_check import SpotChecker
+
+            self.spot_checker = SpotChecker(SPOT_CHECK_CONCURRENCY, SPOT_CHECK_TIMEOUT_MS)
+
+        self.feed: Optional["ConsensusFeed"] = None
+        if self.standby:
+            # State, the probe log and the feed outbox are still the active
+            # validator's; they are picked up in take_over()
+            bt.logging.info("Network Oracle validator starting as standby.")
+            return
+        self._open_probe_log()
+        self._start_feed()
+
         bt.logging.info("load_state()")
         self.load_state()
         bt.logging.info("Network Oracle validator ready.")
 
+    def _open_probe_log(self):
+        if not PROBE_LOG_ENABLED:
+            return
+        from subnet58.validator.probe_log import ProbeLog
+
+        try:
+            self.probe_log = ProbeLog(
+                os.path.join(self.config.neuron.full_path, "probes.db"),
+                retention_days=PROBE_LOG_RETENTION_DAYS,
+            )
+        except Exception as e:
+            bt.logging.warning(f"Probe log disabled: {e}")
+
+    def _start_feed(self):
+        if not CONSENSUS_FEED_ENABLED:
+            return
+        from subnet58.validator.feed import ConsensusFeed
+
+        self.feed = ConsensusFeed(
+            MARKETPLACE_URL,
+            os.path.join(self.config.neuron.full_path, "feed_outbox.jsonl"),
+            hotkey=self.wallet.hotkey.ss58_address,
+            signer=lambda body: "0x" + self.wallet.hotkey.sign(body).hex(),
+            keyframe_every=CONSENSUS_FEED_KEYFRAME_EVERY,
+            max_outbox=CONSENSUS_FEED_OUTBOX_MAX,
+        ).start()
+        bt.logging.info(f"Consensus feed to {self.feed.url} ({self.feed.backlog()} batches queued)")
+
+    def warm_up(self) -> bool:
+        if not super().warm_up():
+            return False
+        # Registry listing ready before the first round; later rounds
+        # only fetch the delta since it
+        self._fetch_providers()
+        return True
+
+    def take_over(self, snapshot):
+        super().take_over(snapshot)
+        self._open_probe_log()
+        self._start_feed()
+
+    def hand_over(self):
+        super().hand_over()
+        self._close_spot_checker()
+        if self.feed is not None:
+            self.feed.stop()
+            self.feed = None
+        if self.probe_log is not None:
+            self.probe_log.close()
+            self.probe_log = None
+
+    def shutdown(self):
+        super().shutdown()
+        self._close_spot_checker()
+
+    def _close_spot_checker(self):
+        if self.spot_checker is None:
+            return
+        try:
+            self.loop.run_until_complete(self.spot_checker.close())
+        except Exception as e:
+            bt.logging.warning(f"Failed to close the spot-check client: {e}")
+
+    def startup_tasks(self):
+        # The first round's provider list is fetched while Subtensor connects
+        return {"providers": self._prefetch_providers}
+
+    @staticmethod
+    def _prefetch_providers():
+        table = ProviderTable()
+        fetch_provider_updates(table)
+        return time.time(), table
+
+    def _fetch_providers(self):
+        """Registry providers, using the startup prefetch for the first round if recent."""
+        prefetched = self.startup_result("providers")
+        if prefetched is not None:
+            fetched_at, table = prefetched
+            if len(table):
+                self.provider_table = table
+                if time.time() - fetched_at < 5 * POLL_INTERVAL:
+                    return table.providers()
+        fetch_provider_updates(self.provider_table)
+        return self.provider_table.providers()
+
     async def forward(self):
         """
         One validation round: probe providers, score miners by consensus.
         """
-        bt.logging.info("Starting validation round...")
+        if not self.begin_round():
+            return
+        await self.forward_batch()
+        self.finalize_round()
 
-        providers = fetch_providers()
+    def begin_round(self) -> bool:
+        """Fetch providers and open the accumulator for this epoch's batches."""
+        bt.logging.info("Starting validation round...")
+        self._round = None
+
+        tracer = self.tracer
+        fetch_start = time.perf_counter()
+        with tracer.span("fetch_providers") as span:
+            providers = self._fetch_providers()
+            span.set(providers=len(providers))
+        self.metrics.registry_fetch.observe(time.perf_counter() - fetch_start)
+        self.metrics.providers.set(len(providers))
         if not providers:
             bt.logging.warning("No providers from registry — skipping round.")
-            return
-
-        n_probes = min(PROBES_PER_ROUND, len(providers))
-        targets = random.sample(providers, n_probes)
-        bt.logging.info(
-            f"Probing {n_probes}/{len(providers)} providers this round"
-        )
+            return False
 
         miner_uids = list(range(self.metagraph.n.item()))
         axons = [self.metagraph.axons[uid] for uid in miner_uids]
-
-        # Accumulate accuracy per miner across all probes
-        accuracy_sums = np.zeros(len(miner_uids), dtype=np.float32)
-        probe_count = 0
-
-        for target in targets:
-            probe_url = target["probeUrl"]
-            bt.logging.info(
-                f"  Probe: {target['name']} ({target['protocol']}) -> {probe_url}"
+        self._round = RoundAccumulator(miner_uids, axons, providers)
+        if self.collusion is not None:
+            self.collusion.sync_hotkeys(self.metagraph.hotkeys)
+        if self.sketches is not None and len(self.sketches) > 2 * (len(miner_uids) + len(providers)):
+            self.sketches.forget(
+                [f"miner/{hotkey}" for hotkey in self.metagraph.hotkeys]
+                + [f"provider/{p.get('id') or p['probeUrl']}" for p in providers]
             )
+        if self.recorder is not None:
+            self.recorder.begin_round(self.step, self.round_block, miner_uids)
+        return True
+
+    async def forward_batch(self):
+        """Probe PROBES_PER_ROUND providers and add the accuracies to the round."""
+        state = self._round
+        if state is None:
+            return
+        tracer = self.tracer
 
-            responses = self.dendrite.query(
-                axons=axons,
-                synapse=ProviderProbe(target_url=probe_url),
-                timeout=self.config.neuron.timeout,
-            )
-
-            consensus = self._compute_consensus(responses)
-            if consensus is None:
-                bt.logging.warning(f"  No valid responses for {probe_url}, skipping")
-                continue
-
-            bt.logging.info(
-                f"  Consensus: reachable={consensus.reachable} "
-                f"status={consensus.status} latency={consensus.median_latency_ms}ms"
-            )
+        candidates = state.unprobed()
+        n_probes = min(PROBES_PER_ROUND, len(candidates))
+        if self.sampler is not None:
+            targets = self.sampler.sample(candidates, n_probes)
+        else:
+            targets = random.sample(candidates, n_probes)
+        state.batches += 1
+        bt.logging.info(
+            f"Probing {n_probes}/{len(state.providers)} providers "
+            f"(batch {state.batches})"
+        )
 
-            if not consensus.reachable:
-                send_probe_alert(
-                    provider_id=target.get("id", ""),
-                    probe_url=probe_url,
-                    consensus_reachable=False,
+        miner_uids, axons = state.uids, state.axons
+        results: List["TargetResult"] = []
+        if self.probe_log is not None:
+            from subnet58.validator.probe_log import TargetResult
+        if self.spot_checker is not None:
+            # Spread the round's spot checks over its batches; they run while
+            # the fan-outs below are in flight
+            per_batch = -(-SPOT_CHECKS_PER_ROUND // max(1, PROBE_BATCHES_PER_EPOCH))
+            spot_targets = random.sample(targets, min(per_batch, len(targets)))
+            self.spot_checker.start([t["probeUrl"] for t in spot_targets])
+
+        try:
+            for target in targets:
+                probe_url = target["probeUrl"]
+                state.probed.add(probe_url)
+                bt.logging.info(
+                    f"  Probe: {target['name']} ({target['protocol']}) -> {probe_url}"
                 )
 
-            for i, resp in enumerate(responses):
-                accuracy_sums[i] += self._probe_accuracy(resp, consensus)
-
-            probe_count += 1
+                query_start = time.perf_counter()
+                with tracer.span("dendrite.query", provider=target.get("id", ""), axons=len(axons)):
+                    responses = await self.dendrite.forward(
+                        axons=axons,
+                        synapse=ProviderProbe(target_url=probe_url, probe_encoding=PROBE_ENCODING),
+                        timeout=self.config.neuron.timeout,
+                        deserialize=False,
+                    )
+                query_s = time.perf_counter() - query_start
+                self.metrics.query_duration.observe(query_s, target.get("protocol", "unknown"))
+                # Decode once into columns; per-miner consumers get Answer records
+                answers = ProbeAnswers.from_responses(responses)
+                records = answers.records()
+                self._observe_responses(responses, answers)
+                if self.sketches is not None:
+                    self._sketch_latencies(target, miner_uids, records)
+
+                spot = None
+                with tracer.span("consensus") as span:
+                    consensus = self._compute_consensus(answers)
+                    if consensus is not None and self.spot_checker is not None:
+                        spot = self.spot_checker.result(probe_url)
+                        consensus = self._anchor_consensus(probe_url, consensus, records, spot)
+                    if consensus is not None:
+                        span.set(reachable=consensus.reachable)
+                if self.recorder is not None:
+                    self.recorder.add_target(target, responses, query_s, records, spot)
+                if self.probe_log is not None:
+                    results.append(TargetResult(
+                        provider_id=target.get("id", ""),
+                        probe_url=probe_url,
+                        consensus=consensus,
+                        answers=[
+                            (uid, r.probe_reachable, r.probe_status, r.probe_latency_ms)
+                            if r is not None else (uid, None, None, None)
+                            for uid, r in zip(miner_uids, records)
+                        ],
+                    ))
+
+                if self.sampler is not None:
+                    self.sampler.update(target, consensus, records)
+
+                if consensus is None:
+                    bt.logging.warning(f"  No valid responses for {probe_url}, skipping")
+                    self.metrics.consensus.inc("none")
+                    continue
+                self.metrics.consensus.inc(str(consensus.reachable).lower())
+                if self.collusion is not None:
+                    self.collusion.add_probe(miner_uids, records, consensus)
+
+                bt.logging.info(
+                    f"  Consensus: reachable={consensus.reachable} "
+                    f"status={consensus.status} latency={consensus.median_latency_ms}ms"
+                )
 
-        if probe_count == 0:
+                if self.feed is not None:
+                    self.feed.record(target, consensus)
+                elif not consensus.reachable:
+                    with tracer.span("send_probe_alert"):
+                        send_probe_alert(
+                            provider_id=target.get("id", ""),
+                            probe_url=probe_url,
+                            consensus_reachable=False,
+                        )
+
+                state.add(self._probe_accuracy(answers, consensus))
+        finally:
+            # Also on errors: no spot check outlives its batch
+            if self.spot_checker is not None:
+                await self.spot_checker.cancel()
+        if self.probe_log is not None:
+            self.probe_log.log_round(self.step, results)
+
+    def finalize_round(self):
+        """Turn the round's accumulated accuracy into rewards and update scores."""
+        state, self._round = self._round, None
+        if state is None:
+            return
+        if self.recorder is not None:
+            try:
+                self.recorder.end_round()
+            except Exception as e:
+                bt.logging.warning(f"Failed to record round: {e}")
+        if self.feed is not None:
+            try:
+                self.feed.publish(self.step, self.round_block)
+            except Exception as e:
+                bt.logging.warning(f"Failed to queue consensus feed batch: {e}")
+
+        rewards = state.rewards()
+        if rewards is None:
             bt.logging.warning("No successful probes this round.")
             return
 
-        rewards = accuracy_sums / probe_count
-        self.update_scores(rewards, miner_uids)
+        if self.collusion is not None:
+            rewards = self._apply_collusion(rewards, state.uids)
+        self.update_scores(rewards, state.uids)
 
         nonzero = np.count_nonzero(self.scores)
+        self.metrics.nonzero_scores.set(nonzero)
         bt.logging.info(
-            f"Round complete: {probe_count} probes, "
+            f"Round complete: {state.probe_count} probes in {state.batches} batch(es), "
             f"{nonzero} miners with non-zero scores"
         )
 
-    @staticmethod
-    def _compute_consensus(responses) -> Optional[Consensus]:
-        valid = [
-            r for r in responses
-            if r is not None and r.probe_reachable is not None
-        ]
-        if not valid:
-            return None
-
-        reachable_votes = [r.probe_reachable for r in valid]
-        status_votes = [r.probe_status for r in valid]
+    def _apply_collusion(self, rewards: np.ndarray, uids: List[int]) -> np.ndarray:
+        """Report copycat clusters; in penalize mode each cluster shares one reward."""
+        with self.tracer.span("collusion") as span:
+            report = self.collusion.analyze()
+            span.set(clusters=len(report.clusters), flagged=report.flagged)
+        self.collusion_report = report
+        self.metrics.collusion_flagged.set(report.flagged)
+        for cluster in report.clusters:
+            bt.logging.warning(
+                f"Suspected copycat cluster ({len(cluster)} miners over {report.probes} probes): "
+                f"uids={cluster}"
+            )
+        if COLLUSION_MODE == "penalize" and report.clusters:
+            rewards = report.apply(rewards, uids, self.collusion.max_uids)
+        return rewards
+
+    def _anchor_consensus(self, probe_url: str, consensus: Consensus, responses, spot) -> Consensus:
+        """Let a finished spot check break a reachability tie or flag a disagreement."""
+        from subnet58.validator.spot_check import AGREE, PENDING
+
+        if spot is None:
+            if self.spot_checker.pending(probe_url):
+                self.metrics.spot_checks.inc(PENDING)
+            return consensus
+        anchored, outcome = self.spot_checker.anchor(consensus, responses, spot)
+        self.metrics.spot_checks.inc(outcome)
+        if outcome != AGREE:
+            bt.logging.info(
+                f"  Spot check {outcome}: validator saw reachable={spot.probe_reachable} "
+                f"status={spot.probe_status}, miners voted reachable={consensus.reachable} "
+                f"status={consensus.status}"
+            )
+        return anchored
+
+    def load_state(self):
+        super().load_state()
+        if self.sampler is not None:
+            sampler_path = os.path.join(self.config.neuron.full_path, "sampler.npz")
+            if os.path.exists(sampler_path):
+                try:
+                    self.sampler.load(sampler_path)
+                    bt.logging.info(f"Target sampler restored ({len(self.sampler)} providers)")
+                except Exception as e:
+                    bt.logging.warning(f"Failed to load target sampler state: {e}")
+        if self.sketches is not None:
+            sketch_path = os.path.join(self.config.neuron.full_path, "sketches.npz")
+            if os.path.exists(sketch_path):
+                try:
+                    restored = type(self.sketches).load(sketch_path)
+                    if restored.compatible(self.sketches):
+                        self.sketches = restored
+                        bt.logging.info(f"Latency sketches restored ({len(restored)} keys)")
+                except Exception as e:
+                    bt.logging.warning(f"Failed to load latency sketches: {e}")
+
+    def save_state(self):
+        super().save_state()
+        if self.sampler is not None:
+            try:
+                self.sampler.save(os.path.join(self.config.neuron.full_path, "sampler.npz"))
+            except Exception as e:
+                bt.logging.warning(f"Failed to save target sampler state: {e}")
+        if self.sketches is not None:
+            try:
+                self.sketches.save(os.path.join(self.config.neuron.full_path, "sketches.npz"))
+            except Exception as e:
+                bt.logging.warning(f"Failed to save latency sketches: {e}")
+
+    def _sketch_latencies(self, target, miner_uids: List[int], responses) -> None:
+        """Feed reachable answers' latencies to the provider's and each miner's sketch."""
         latencies = [
-            r.probe_latency_ms for r in valid
-            if r.probe_latency_ms is not None and r.probe_latency_ms > 0
+            r.probe_latency_ms if r is not None and r.probe_reachable else 0
+            for r in responses
         ]
-
-        return Consensus(
-            reachable=Counter(reachable_votes).most_common(1)[0][0],
-            status=Counter(status_votes).most_common(1)[0][0],
-            median_latency_ms=int(median(latencies)) if latencies else 0,
+        self.sketches.add(f"provider/{target.get('id') or target['probeUrl']}", latencies)
+        self.sketches.add_many(
+            [f"miner/{self.metagraph.hotkeys[uid]}" for uid in miner_uids], latencies,
         )
 
-    @staticmethod
-    def _probe_accuracy(response, consensus: Consensus) -> float:
-        """
-        Score a single miner response against consensus.
-
-        Weights: 40% reachable match, 30% status match, 30% latency closeness.
-        """
-        if response is None or response.probe_reachable is None:
-            return 0.0
-
-        reachable_match = float(response.probe_reachable == consensus.reachable)
-        status_match = float(response.probe_status == consensus.status)
+    def provider_latency(self, provider_id: str) -> Dict:
+        """Long-horizon p50/p95/p99 of miner-reported latency for a provider."""
+        return self.sketches.quantiles(f"provider/{provider_id}") if self.sketches else {"samples": 0}
+
+    def miner_latency(self, uid: int) -> Dict:
+        """Long-horizon p50/p95/p99 of the latencies a miner reported."""
+        if not self.sketches or uid >= len(self.metagraph.hotkeys):
+            return {"samples": 0}
+        return self.sketches.quantiles(f"miner/{self.metagraph.hotkeys[uid]}")
+
+    def _observe_responses(self, responses, answers: ProbeAnswers) -> None:
+        """Count responses by outcome and record per-miner dendrite latency."""
+        for r, answered in zip(responses, (answers.reachable >= 0).tolist()):
+            terminal = getattr(r, "dendrite", None)
+            code = getattr(terminal, "status_code", None)
+            if code is None:
+                outcome = "error"
+            elif int(code) == 200:
+                outcome = "ok" if answered else "empty"
+            elif int(code) == 408:
+                outcome = "timeout"
+            elif int(code) in (401, 403):
+                outcome = "rejected"
+            else:
+                outcome = "error"
+            self.metrics.responses.inc(outcome)
+            if terminal is not None and terminal.process_time is not None:
+                self.metrics.response_latency.observe(float(terminal.process_time))
 
-        lat = response.probe_latency_ms or 0
-        if consensus.median_latency_ms > 0 and lat > 0:
-            deviation = abs(lat - consensus.median_latency_ms)
-            latency_score = max(0.0, 1.0 - deviation / MAX_LATENCY_DEVIATION)
-        else:
-            latency_score = reachable_match
+    @staticmethod
+    def _compute_consensus(answers: ProbeAnswers) -> Optional[Consensus]:
+        return consensus_from_answers(answers)
 
-        return 0.4 * reachable_match + 0.3 * status_match + 0.3 * latency_score
+    @staticmethod
+    def _probe_accuracy(answers: ProbeAnswers, consensus: Consensus) -> np.ndarray:
+        return accuracy_from_answers(answers, consensus, MAX_LATENCY_DEVIATION)
 
 
 if __name__ == "__main__":
     with Validator() as validator:
         while True:
+            # Wakes as soon as the validator loop returns (update, handoff,
+            # standby exit); the timeout only paces the chain check and log
+            stopped = validator.wait_until_stopped(60)
+            if validator.chain_failed:
+                bt.logging.error("Subtensor connection failed, exiting.")
+                validator.record_exit(1)
+                sys.exit(1)
             if validator._update_exit_code is not None:
                 bt.logging.info("Auto-update triggered, exiting for update.")
+                validator.record_exit(validator._update_exit_code)
                 sys.exit(validator._update_exit_code)
+            if stopped:
+                bt.logging.error("Validator loop stopped, exiting.")
+                validator.record_exit(1)
+                sys.exit(1)
             bt.logging.info(f"Validator running... {time.time()}")
-            time.sleep(60)
@@ -9,4 +9,12 @@ __spec_version__ = (
     + (1 * int(version_split[2]))
 )
 
-from . import protocol
+
+def __getattr__(name):
+    # protocol pulls in bittensor (~1s); load it on first use so tools that
+    # only need subnet58.config or the scoring code start fast
+    if name == "protocol":
+        import importlib
+
+        return importlib.import_module(".protocol", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -11,6 +11,15 @@ import bittensor as bt
 
 from subnet58.base.neuron import BaseNeuron
 from subnet58.utils.config import add_miner_args
+from subnet58.miner.rate_limit import TokenBucketLimiter
+from subnet58.utils.metrics import MinerMetrics, start_metrics_server
+from subnet58.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_BASE,
+    RATE_LIMIT_MAX,
+    RATE_LIMIT_WINDOW_S,
+    METRICS_PORT,
+)
 
 from typing import Union
 
@@ -33,6 +42,27 @@ class BaseMinerNeuron(BaseNeuron):
                 "Allowing non-validators to send requests. This is a security risk."
             )
 
+        self.metrics = MinerMetrics()
+        if METRICS_PORT:
+            try:
+                start_metrics_server(self.metrics.registry, METRICS_PORT)
+            except Exception as e:
+                bt.logging.warning(f"Metrics endpoint disabled: {e}")
+        self.start_memwatch(self.metrics.registry)
+
+        # Per-hotkey admission limits (consulted by blacklist/priority)
+        self.rate_limiter: Union[TokenBucketLimiter, None] = None
+        if RATE_LIMIT_ENABLED:
+            self.rate_limiter = TokenBucketLimiter(
+                base_capacity=RATE_LIMIT_BASE,
+                max_capacity=RATE_LIMIT_MAX,
+                window_s=RATE_LIMIT_WINDOW_S,
+            )
+            bt.logging.info(
+                f"Rate limiting enabled (base={RATE_LIMIT_BASE}, "
+                f"max={RATE_LIMIT_MAX}, window={RATE_LIMIT_WINDOW_S}s)"
+            )
+
         # The axon handles request processing
         axon_port = getattr(self.config.axon, 'port', 8091)
         axon_external_ip = getattr(self.config.axon, 'external_ip', None)
@@ -68,28 +98,24 @@ class BaseMinerNeuron(BaseNeuron):
 
     def run(self):
         """Main loop for the miner."""
-        self.sync()
-
-        bt.logging.info(
-            f"Serving miner axon on network: {self.config.subtensor.chain_endpoint} "
-            f"with netuid: {self.config.netuid}"
-        )
+        # Start answering immediately (possibly from the metagraph snapshot);
+        # announcing the axon on chain waits for the Subtensor connection.
         try:
-            self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
             self.axon.start()
-            bt.logging.info("Axon serving successfully.")
+            bt.logging.info("Axon started.")
         except Exception as e:
-            bt.logging.warning(
-                f"Axon serve failed (expected on Railway/no public port): {e}. "
-                f"Miner will still run and respond to queries via internal networking."
-            )
+            bt.logging.warning(f"Axon start failed: {e}")
+        self.when_chain_ready(self._on_chain_ready)
 
         bt.logging.info(f"Miner starting at block: {self.block}")
 
         try:
             while not self.should_exit:
-                self.sync()
+                if self.step > 0:
+                    self.sync()
                 self.step += 1
+                if self.rate_limiter is not None:
+                    bt.logging.info(f"Rate limit stats: {self.rate_limiter.stats()}")
                 # Sleep for one epoch before next sync
                 # epoch_length blocks * ~12 sec/block
                 epoch_sleep = max(self.config.neuron.epoch_length * 12, 120)
@@ -105,6 +131,22 @@ class BaseMinerNeuron(BaseNeuron):
         except Exception as e:
             bt.logging.error(traceback.format_exc())
 
+    def _on_chain_ready(self):
+        """Announce the axon on chain and replace snapshot data with a live sync."""
+        bt.logging.info(
+            f"Serving miner axon on network: {self.config.subtensor.chain_endpoint} "
+            f"with netuid: {self.config.netuid}"
+        )
+        try:
+            self.axon.serve(netuid=self.config.netuid, subtensor=self.subtensor)
+            bt.logging.info("Axon serving successfully.")
+        except Exception as e:
+            bt.logging.warning(
+                f"Axon serve failed (expected on Railway/no public port): {e}. "
+                f"Miner will still run and respond to queries via internal networking."
+            )
+        self.sync()
+
     def run_in_background_thread(self):
         if not self.is_running:
             bt.logging.debug("Starting miner in background thread.")
@@ -131,3 +173,5 @@ class BaseMinerNeuron(BaseNeuron):
     def resync_metagraph(self):
         bt.logging.info("resync_metagraph()")
         self.metagraph.sync(subtensor=self.subtensor)
+        if self.rate_limiter is not None:
+            self.rate_limiter.prune(self.metagraph.hotkeys)
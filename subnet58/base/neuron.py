@@ -2,13 +2,26 @@
 # Base neuron class for Subnet 58
 
 import copy
+import os
 import time
+import threading
 import bittensor as bt
 from abc import ABC, abstractmethod
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
 
 from subnet58.utils.config import check_config, add_args, config
 from subnet58.utils.misc import ttl_get_block
+from subnet58.utils.snapshot import SnapshotMetagraph, load_snapshot, save_snapshot
 from subnet58 import __spec_version__ as spec_version
+from subnet58.config import (
+    METAGRAPH_SNAPSHOT,
+    METAGRAPH_SNAPSHOT_MAX_AGE,
+    MEMWATCH_ENABLED,
+    MEMWATCH_INTERVAL_S,
+    MEMWATCH_GROWTH_MB,
+    MEMWATCH_TRACEMALLOC_FRAMES,
+)
 
 
 class BaseNeuron(ABC):
@@ -18,6 +31,8 @@ class BaseNeuron(ABC):
     """
 
     neuron_type: str = "BaseNeuron"
+    # A warm standby validator shares the active one's files until it takes over
+    standby: bool = False
 
     @classmethod
     def check_config(cls, config: "bt.Config"):
@@ -38,8 +53,19 @@ class BaseNeuron(ABC):
 
     @property
     def block(self):
+        if not self._chain_ready.is_set() and isinstance(self.metagraph, SnapshotMetagraph):
+            return self.metagraph.estimated_block()
         return ttl_get_block(self)
 
+    @property
+    def chain_ready(self) -> bool:
+        return self._chain_ready.is_set()
+
+    @property
+    def chain_failed(self) -> bool:
+        """The background Subtensor connection gave up; the process should exit non-zero."""
+        return self._chain_failed.is_set()
+
     def __init__(self, config=None):
         base_config = copy.deepcopy(config or BaseNeuron.config())
         self.config = self.config()
@@ -50,30 +76,104 @@ class BaseNeuron(ABC):
         self.device = self.config.neuron.device
         bt.logging.info(self.config)
 
-        # Build Bittensor objects (with retry for transient network issues)
+        # Build Bittensor objects. Wallet load, Subtensor connect (with retry
+        # for transient network issues) and subclass startup tasks run
+        # concurrently.
         bt.logging.info("Setting up bittensor objects.")
-        self.wallet = bt.Wallet(config=self.config)
-        self.subtensor = self._connect_subtensor()
-        self.metagraph = self.subtensor.metagraph(self.config.netuid)
+        self._chain_ready = threading.Event()
+        self._chain_failed = threading.Event()
+        # Guards _chain_ready.set() + draining callbacks against when_chain_ready()
+        self._chain_lock = threading.Lock()
+        self._chain_callbacks: List[Callable[[], None]] = []
+        self._snapshot_path = os.path.join(self.config.neuron.full_path, "metagraph.npz")
 
-        bt.logging.info(f"Wallet: {self.wallet}")
-        bt.logging.info(f"Subtensor: {self.subtensor}")
-        bt.logging.info(f"Metagraph: {self.metagraph}")
+        pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="init")
+        self._startup_futures: Dict[str, Future] = {
+            name: pool.submit(task) for name, task in self.startup_tasks().items()
+        }
+        wallet_future = pool.submit(self._load_wallet)
 
-        # Check registration
-        self.check_registered()
+        snapshot: Optional[SnapshotMetagraph] = None
+        if METAGRAPH_SNAPSHOT and not self.config.mock:
+            snapshot = load_snapshot(
+                self._snapshot_path, self.config.netuid, None, METAGRAPH_SNAPSHOT_MAX_AGE
+            )
+        subtensor_future = pool.submit(self._connect_subtensor) if snapshot is None else None
+
+        self.wallet = wallet_future.result()
+        if snapshot is not None and self.wallet.hotkey.ss58_address not in snapshot.hotkeys:
+            bt.logging.info("[Snapshot] Hotkey not in snapshot, ignoring")
+            snapshot = None
+            subtensor_future = pool.submit(self._connect_subtensor)
+        pool.shutdown(wait=False)
+
+        if snapshot is not None:
+            # Serve from the snapshot; connect, verify registration and
+            # download the live metagraph in the background.
+            self.subtensor = None
+            self.metagraph = snapshot
+            bt.logging.info(f"Wallet: {self.wallet}")
+            bt.logging.info(f"Metagraph: {self.metagraph}")
+            threading.Thread(
+                target=self._connect_in_background, name="chain-connect", daemon=True
+            ).start()
+        else:
+            self.subtensor = subtensor_future.result()
+            if self.config.mock:
+                self.subtensor.chain.register(
+                    self.wallet.hotkey.ss58_address, self.wallet.coldkeypub.ss58_address
+                )
+            self.metagraph = self.subtensor.metagraph(self.config.netuid)
+
+            bt.logging.info(f"Wallet: {self.wallet}")
+            bt.logging.info(f"Subtensor: {self.subtensor}")
+            bt.logging.info(f"Metagraph: {self.metagraph}")
+
+            # Check registration
+            self.check_registered()
+            self._chain_ready.set()
 
         self.uid = self.metagraph.hotkeys.index(
             self.wallet.hotkey.ss58_address
         )
         bt.logging.info(
             f"Running neuron on subnet: {self.config.netuid} with uid {self.uid} "
-            f"using network: {self.subtensor.chain_endpoint}"
+            f"using network: {getattr(self.subtensor, 'chain_endpoint', self.config.subtensor.chain_endpoint)}"
         )
         self.step = 0
 
+    def startup_tasks(self) -> Dict[str, Callable[[], Any]]:
+        """
+        Independent init work (e.g. HTTP clients, registry prefetch) to run
+        concurrently with wallet load and the Subtensor connection. Tasks
+        must not depend on neuron state; fetch results with startup_result().
+        """
+        return {}
+
+    def startup_result(self, name: str) -> Any:
+        """Result of a startup task (waits for it), or None if it failed or is unknown."""
+        future = self._startup_futures.pop(name, None)
+        if future is None:
+            return None
+        try:
+            return future.result()
+        except Exception as e:
+            bt.logging.warning(f"Startup task {name!r} failed: {e}")
+            return None
+
+    def _load_wallet(self) -> "bt.Wallet":
+        wallet = bt.Wallet(config=self.config)
+        # Touch the keys so keyfile reads happen here, not on first use
+        wallet.hotkey
+        wallet.coldkeypub
+        return wallet
+
     def _connect_subtensor(self, max_retries: int = 5) -> "bt.Subtensor":
         """Connect to Subtensor with exponential backoff retry."""
+        if self.config.mock:
+            from subnet58.mock import MockSubtensor
+
+            return MockSubtensor(self.config.netuid)
         for attempt in range(1, max_retries + 1):
             try:
                 subtensor = bt.Subtensor(config=self.config)
@@ -92,6 +192,70 @@ class BaseNeuron(ABC):
                 )
                 time.sleep(wait)
 
+    def _connect_in_background(self):
+        """Connect to Subtensor, check registration and stage the live metagraph."""
+        start = time.perf_counter()
+        try:
+            self.subtensor = self._connect_subtensor()
+            self.check_registered()
+            live = self.subtensor.metagraph(self.config.netuid)
+            if isinstance(self.metagraph, SnapshotMetagraph):
+                self.metagraph.stage(live)
+        except Exception as e:
+            bt.logging.error(f"Background chain connection failed: {e}")
+            self._chain_failed.set()
+            self.should_exit = True
+            return
+        with self._chain_lock:
+            self._chain_ready.set()
+            callbacks, self._chain_callbacks = self._chain_callbacks, []
+        bt.logging.info(
+            f"Chain ready after {time.perf_counter() - start:.1f}s "
+            f"(Subtensor: {self.subtensor}); switching from metagraph snapshot."
+        )
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                bt.logging.warning(f"Chain-ready callback failed: {e}")
+
+    def when_chain_ready(self, callback: Callable[[], None]):
+        """Run callback once Subtensor is connected (immediately if it already is)."""
+        with self._chain_lock:
+            if not self._chain_ready.is_set():
+                self._chain_callbacks.append(callback)
+                return
+        callback()
+
+    def wait_for_chain(self, timeout: Optional[float] = None) -> bool:
+        """Wait for Subtensor; False on timeout or if the background connection failed."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = 1.0 if deadline is None else min(1.0, max(0.0, deadline - time.monotonic()))
+            if self._chain_ready.wait(wait):
+                return True
+            if self._chain_failed.is_set() or (deadline is not None and time.monotonic() >= deadline):
+                return False
+
+    def start_memwatch(self, registry=None):
+        """Start the opt-in memory watchdog (reports under <full_path>/memwatch)."""
+        self.memwatch = None
+        if not MEMWATCH_ENABLED:
+            return
+        from subnet58.utils.memwatch import MemoryWatch
+
+        try:
+            self.memwatch = MemoryWatch(
+                os.path.join(self.config.neuron.full_path, "memwatch"),
+                interval_s=MEMWATCH_INTERVAL_S,
+                growth_mb=MEMWATCH_GROWTH_MB,
+                frames=MEMWATCH_TRACEMALLOC_FRAMES,
+                registry=registry,
+            ).start()
+            bt.logging.info(f"Memory watchdog every {MEMWATCH_INTERVAL_S:.0f}s (alarm at +{MEMWATCH_GROWTH_MB:.0f} MiB)")
+        except Exception as e:
+            bt.logging.warning(f"Memory watchdog disabled: {e}")
+
     @abstractmethod
     async def forward(self, synapse: bt.Synapse) -> bt.Synapse:
         ...
@@ -101,9 +265,21 @@ class BaseNeuron(ABC):
         ...
 
     def sync(self):
-        """Check registration and resync metagraph."""
+        """Check registration, resync metagraph and refresh the snapshot."""
+        if not self._chain_ready.is_set():
+            bt.logging.debug("Chain not ready yet, using metagraph snapshot.")
+            return
         self.check_registered()
         self.resync_metagraph()
+        self._save_snapshot()
+
+    def _save_snapshot(self):
+        if not METAGRAPH_SNAPSHOT or self.config.mock or self.standby:
+            return
+        try:
+            save_snapshot(self.metagraph, self._snapshot_path, self.config.netuid, block=self.block)
+        except Exception as e:
+            bt.logging.warning(f"Failed to save metagraph snapshot: {e}")
 
     def check_registered(self):
         while not self.subtensor.is_hotkey_registered(
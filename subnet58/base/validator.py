@@ -3,6 +3,7 @@
 
 import copy
 import os
+import sys
 import time
 import subprocess
 import numpy as np
@@ -15,17 +16,39 @@ import bittensor as bt
 # Allow nested event loops (required for bittensor v7+ dendrite.query)
 nest_asyncio.apply()
 
-from typing import List, Union
+from typing import Dict, List, Union
 from traceback import print_exception
 
 from subnet58.base.neuron import BaseNeuron
 from subnet58.utils.config import add_validator_args
+from subnet58.validator.history import ScoreHistory
+from subnet58.validator.reward import scatter_rewards, ema_update, quantize_weights
+from subnet58.validator.scheduler import ProbeScheduler
+from subnet58.utils.metrics import ValidatorMetrics, start_metrics_server
+from subnet58.utils.tracing import Tracer
+from subnet58.utils.handoff import Handoff, await_handoff, record_exit, PARENT_ENV
 from subnet58.config import (
     TEMPO,
     POLL_INTERVAL,
     AUTOUPDATE_ENABLED,
     AUTOUPDATE_BRANCH,
     AUTOUPDATE_EXIT_CODE,
+    AUTOUPDATE_HANDOFF,
+    HANDOFF_DIR,
+    HANDOFF_TIMEOUT_S,
+    HANDOFF_EXIT_CODE,
+    HISTORY_RETENTION_ROUNDS,
+    HISTORY_MAX_UIDS,
+    METRICS_PORT,
+    PROBE_BATCHES_PER_EPOCH,
+    PROBE_FINALIZE_MARGIN_BLOCKS,
+    TRACE_ENABLED,
+    TRACE_FILE,
+    TRACE_MAX_BYTES,
+    TRACE_BACKUPS,
+    TRACE_PROFILE_THRESHOLD_S,
+    TRACE_PROFILE_INTERVAL_MS,
+    WEIGHTS_TOP_K,
 )
 
 
@@ -43,18 +66,50 @@ class BaseValidatorNeuron(BaseNeuron):
         super().__init__(config=config)
 
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
-        self.dendrite = bt.Dendrite(wallet=self.wallet)
+        if self.config.mock:
+            from subnet58.mock import MockDendrite
+
+            self.dendrite = MockDendrite(wallet=self.wallet, netuid=self.config.netuid)
+        else:
+            self.dendrite = bt.Dendrite(wallet=self.wallet)
         bt.logging.info(f"Dendrite: {self.dendrite}")
 
         # Scoring weights
         bt.logging.info("Building validation weights.")
         self.scores = np.zeros(self.metagraph.n, dtype=np.float32)
+        # Bumped whenever scores change; keys the quantized weights cache
+        self.scores_version = 0
+        self._weights_cache = None
+
+        # A standby (--neuron.standby) warms up alongside the active
+        # validator and takes over when it hands off; until then it holds
+        # no ports and writes no state.
+        self.standby: bool = self.config.neuron.standby
+        self.handoff_dir = HANDOFF_DIR or os.path.join(self.config.neuron.full_path, "handoff")
+        self._handoff: Union[Handoff, None] = None
+
+        self.metrics = ValidatorMetrics()
+        self.metrics_server = None
+        if not self.standby:
+            self._start_metrics_server()
+        self.start_memwatch(self.metrics.registry)
+
+        # Trace file and per-round history (appended by save_state) are
+        # opened once this process is the active validator
+        self.tracer = Tracer()
+        self.history: Union[ScoreHistory, None] = None
+        if not self.standby:
+            self._start_tracer()
+            self._open_history()
+        self._last_rewards: Union[np.ndarray, None] = None
+        self.round_block: int = 0
 
         self.sync()
 
-        # Serve axon
-        if not self.config.neuron.axon_off:
-            self.serve_axon()
+        # Serve axon (deferred until Subtensor is connected when starting
+        # from a metagraph snapshot)
+        if not self.config.neuron.axon_off and not self.standby:
+            self.when_chain_ready(self.serve_axon)
 
         self.loop = asyncio.get_event_loop()
         self.should_exit: bool = False
@@ -62,6 +117,49 @@ class BaseValidatorNeuron(BaseNeuron):
         self.thread: Union[threading.Thread, None] = None
         self.lock = asyncio.Lock()
         self._update_exit_code: Union[int, None] = None
+        # Set when run() returns, so the main thread exits without polling
+        self._stopped = threading.Event()
+        self.scheduler = ProbeScheduler(
+            batches=PROBE_BATCHES_PER_EPOCH,
+            finalize_margin=PROBE_FINALIZE_MARGIN_BLOCKS,
+            seed_key=self.wallet.hotkey.ss58_address,
+        )
+        self._round_busy_s = 0.0
+        # A scheduled round's trace, open from round_start until finalize
+        self._round_trace = None
+
+    def _start_tracer(self):
+        if not TRACE_ENABLED:
+            return
+        try:
+            self.tracer = Tracer(
+                TRACE_FILE or os.path.join(self.config.neuron.full_path, "trace.jsonl"),
+                enabled=True,
+                max_bytes=TRACE_MAX_BYTES,
+                backups=TRACE_BACKUPS,
+                profile_threshold_s=TRACE_PROFILE_THRESHOLD_S,
+                profile_interval_s=TRACE_PROFILE_INTERVAL_MS / 1000,
+            )
+        except Exception as e:
+            bt.logging.warning(f"Round tracing disabled: {e}")
+
+    def _open_history(self):
+        try:
+            self.history = ScoreHistory(
+                os.path.join(self.config.neuron.full_path, "history.bin"),
+                max_uids=HISTORY_MAX_UIDS,
+                retention=HISTORY_RETENTION_ROUNDS,
+            )
+        except Exception as e:
+            bt.logging.warning(f"Score history disabled: {e}")
+
+    def _start_metrics_server(self):
+        if not METRICS_PORT:
+            return
+        try:
+            self.metrics_server = start_metrics_server(self.metrics.registry, METRICS_PORT)
+        except Exception as e:
+            bt.logging.warning(f"Metrics endpoint disabled: {e}")
 
     def serve_axon(self):
         bt.logging.info("Serving axon to chain...")
@@ -80,11 +178,24 @@ class BaseValidatorNeuron(BaseNeuron):
         Polls the Bittensor block number every POLL_INTERVAL seconds.
         When a new epoch begins (current_block // TEMPO changes), runs
         a full validation round: sync, forward, set_weights, save_state.
+        With PROBE_BATCHES_PER_EPOCH > 1 the round is instead split into
+        micro-batches at jittered offsets across the epoch, finalized
+        (set_weights, save_state) after the last batch near epoch end.
         """
+        try:
+            if self.standby and not self._await_takeover():
+                return
+            self._run_epochs()
+        finally:
+            self.shutdown()
+            self._stopped.set()
+
+    def _run_epochs(self):
         self.sync()
         bt.logging.info(f"Validator starting at block: {self.block}")
 
         last_epoch = None
+        scheduler = self.scheduler
 
         try:
             while not self.should_exit:
@@ -94,18 +205,29 @@ class BaseValidatorNeuron(BaseNeuron):
                 blocks_remaining = TEMPO - blocks_into
 
                 if epoch != last_epoch:
+                    if scheduler.pending:
+                        bt.logging.warning(
+                            f"Epoch {scheduler.epoch} ended before its round was finalized, "
+                            f"finalizing {scheduler.next_batch}/{len(scheduler.offsets)} batches now."
+                        )
+                        self._finalize_scheduled_round(current_block)
+                    if self._handoff is not None and self._poll_handoff(current_block, epoch):
+                        break
                     bt.logging.info(
                         f"Epoch {epoch} started | block={current_block} "
                         f"into_epoch={blocks_into} remaining={blocks_remaining}"
                     )
-                    self.sync()
-                    self.loop.run_until_complete(self.forward())
-                    if not self.config.neuron.disable_set_weights:
-                        self.set_weights()
-                    self.save_state()
-                    self._check_for_update()
                     last_epoch = epoch
-                    self.step += 1
+                    if scheduler.batches == 1:
+                        self._run_full_round(current_block, epoch)
+                    else:
+                        self._start_scheduled_round(current_block, epoch, blocks_into)
+
+                elif scheduler.pending:
+                    if scheduler.batch_due(blocks_into):
+                        self._run_scheduled_batch(current_block)
+                    if scheduler.finalize_due(blocks_into):
+                        self._finalize_scheduled_round(current_block)
                 else:
                     bt.logging.info(
                         f"Waiting | block={current_block} epoch={epoch} "
@@ -121,6 +243,98 @@ class BaseValidatorNeuron(BaseNeuron):
             bt.logging.error(f"Error during validation: {str(err)}")
             bt.logging.debug(str(print_exception(type(err), err, err.__traceback__)))
 
+    def _run_full_round(self, current_block: int, epoch: int):
+        """The whole round in one burst at the epoch boundary."""
+        round_start = time.perf_counter()
+        tracer = self.tracer
+        with tracer.round(step=self.step, block=current_block, epoch=epoch):
+            with tracer.span("sync"):
+                self.sync()
+            self.round_block = current_block
+            with tracer.span("forward"):
+                self.loop.run_until_complete(self.forward())
+            if not self.config.neuron.disable_set_weights:
+                with tracer.span("set_weights"):
+                    self.set_weights()
+            with tracer.span("save_state"):
+                self.save_state()
+        self.metrics.round_duration.observe(time.perf_counter() - round_start)
+        self._end_round()
+
+    def _start_scheduled_round(self, current_block: int, epoch: int, blocks_into: int):
+        start = time.perf_counter()
+        tracer = self.tracer
+        self._round_trace = tracer.open_round(step=self.step, block=current_block, epoch=epoch)
+        with self._round_trace.part("round_start"):
+            with tracer.span("sync"):
+                self.sync()
+            self.round_block = current_block
+            with tracer.span("begin_round"):
+                started = self.begin_round()
+        self._round_busy_s = time.perf_counter() - start
+        self.scheduler.start_epoch(epoch, blocks_into)
+        if not started:
+            # Nothing to probe: finalize right away, as a full round would
+            self._finalize_scheduled_round(current_block)
+            return
+        bt.logging.info(
+            f"Scheduled {self.scheduler.batches} probe batches at epoch offsets "
+            f"{self.scheduler.offsets}, finalize at {self.scheduler.finalize_offset}"
+        )
+
+    def _run_scheduled_batch(self, current_block: int):
+        start = time.perf_counter()
+        scheduler = self.scheduler
+        with self._scheduled_trace(current_block).part("batch", block=current_block, batch=scheduler.next_batch):
+            self.loop.run_until_complete(self.forward_batch())
+        scheduler.batch_done()
+        self._round_busy_s += time.perf_counter() - start
+
+    def _finalize_scheduled_round(self, current_block: int):
+        start = time.perf_counter()
+        tracer = self.tracer
+        trace = self._scheduled_trace(current_block)
+        with trace.part("finalize", block=current_block):
+            with tracer.span("finalize_round"):
+                self.finalize_round()
+            if not self.config.neuron.disable_set_weights:
+                with tracer.span("set_weights"):
+                    self.set_weights()
+            with tracer.span("save_state"):
+                self.save_state()
+        trace.close()
+        self._round_trace = None
+        self.scheduler.finish()
+        self.metrics.round_duration.observe(self._round_busy_s + time.perf_counter() - start)
+        self._end_round()
+
+    def _scheduled_trace(self, current_block: int):
+        # Normally opened at round_start; a fresh one keeps later parts traced
+        if self._round_trace is None:
+            self._round_trace = self.tracer.open_round(step=self.step, block=current_block)
+        return self._round_trace
+
+    def _end_round(self):
+        self._check_for_update()
+        self.step += 1
+        self.metrics.step.set(self.step)
+
+    def begin_round(self) -> bool:
+        """Prepare a scheduled round; False skips the epoch."""
+        return True
+
+    async def forward_batch(self):
+        """One micro-batch of a scheduled round (defaults to a full forward)."""
+        await self.forward()
+
+    def finalize_round(self):
+        """Fold a scheduled round's batches into scores."""
+        pass
+
+    def shutdown(self):
+        """Release clients when run() returns (after a handoff, an update or an error)."""
+        pass
+
     def run_in_background_thread(self):
         if not self.is_running:
             bt.logging.debug("Starting validator in background thread.")
@@ -129,6 +343,18 @@ class BaseValidatorNeuron(BaseNeuron):
             self.thread.start()
             self.is_running = True
 
+    def wait_until_stopped(self, timeout: Union[float, None] = None) -> bool:
+        """Block until run() has returned (True) or timeout passes (False)."""
+        return self._stopped.wait(timeout)
+
+    def record_exit(self, code: int):
+        """
+        A process that took over from a standby is no longer entrypoint.sh's
+        child: leave the exit code in the handoff directory for it.
+        """
+        if os.environ.get(PARENT_ENV):
+            record_exit(self.handoff_dir, code)
+
     def stop_run_thread(self):
         if self.is_running:
             bt.logging.debug("Stopping validator in background thread.")
@@ -148,42 +374,51 @@ class BaseValidatorNeuron(BaseNeuron):
 
     def set_weights(self):
         """Sets validator weights on chain based on scores."""
-        if np.isnan(self.scores).any():
-            bt.logging.warning("Scores contain NaN values.")
-
-        # Normalize scores
-        raw_weights = self.scores.copy()
-        norm = np.sum(raw_weights)
-        if norm > 0:
-            raw_weights = raw_weights / norm
-        else:
+        if not self.wait_for_chain(timeout=60):
+            bt.logging.warning("Subtensor not connected yet, skipping set_weights.")
+            self.metrics.set_weights.inc("skipped")
+            return
+
+        uids, weights = self.quantized_weights()
+        if len(uids) == 0:
             bt.logging.warning("All scores are zero, skipping set_weights.")
+            self.metrics.set_weights.inc("skipped")
             return
 
-        bt.logging.info(f"Setting weights: {raw_weights}")
+        bt.logging.info(f"Setting weights on {len(uids)} uids: {dict(zip(uids.tolist(), weights.tolist()))}")
 
-        # Convert to uint16
-        uids = self.metagraph.uids
         result, msg = self.subtensor.set_weights(
             wallet=self.wallet,
             netuid=self.config.netuid,
             uids=uids,
-            weights=raw_weights,
+            weights=weights,
             wait_for_finalization=False,
             wait_for_inclusion=False,
             version_key=self.spec_version,
         )
         if result:
             bt.logging.info("set_weights on chain successfully!")
+            self.metrics.set_weights.inc("success")
         else:
             bt.logging.error(f"set_weights failed: {msg}")
+            self.metrics.set_weights.inc("failure")
+
+    def quantized_weights(self):
+        """Top-k uint16 weights for the current scores, cached per scores_version."""
+        key = (self.scores_version, len(self.scores), WEIGHTS_TOP_K)
+        if self._weights_cache is None or self._weights_cache[0] != key:
+            if np.isnan(self.scores).any():
+                bt.logging.warning("Scores contain NaN values.")
+            self._weights_cache = (key, quantize_weights(self.scores, WEIGHTS_TOP_K))
+        return self._weights_cache[1]
 
     def _check_for_update(self):
         """
         Compare local HEAD against the remote branch.  If a newer commit
-        exists, set should_exit so the entrypoint can pull and restart.
+        exists, set should_exit so the entrypoint can pull and restart, or
+        with AUTOUPDATE_HANDOFF start the update as a warm standby.
         """
-        if not AUTOUPDATE_ENABLED:
+        if not AUTOUPDATE_ENABLED or self._handoff is not None:
             return
         try:
             repo_root = os.path.dirname(
@@ -203,6 +438,8 @@ class BaseValidatorNeuron(BaseNeuron):
             ).stdout.strip()
 
             if local_sha and remote_sha and local_sha != remote_sha:
+                if AUTOUPDATE_HANDOFF and self._begin_handoff(repo_root, remote_sha):
+                    return
                 bt.logging.info(
                     f"Update available: {local_sha[:8]} -> {remote_sha[:8]}. "
                     f"Exiting for auto-update."
@@ -214,6 +451,104 @@ class BaseValidatorNeuron(BaseNeuron):
         except Exception as e:
             bt.logging.warning(f"Auto-update check failed (non-fatal): {e}")
 
+    def _begin_handoff(self, repo_root: str, remote_sha: str) -> bool:
+        """Pull the update and start it as a standby; False falls back to a cold restart."""
+        try:
+            pull = subprocess.run(
+                ["git", "pull", "--ff-only", "origin", AUTOUPDATE_BRANCH],
+                capture_output=True, text=True, timeout=120, cwd=repo_root,
+            )
+            if pull.returncode != 0:
+                bt.logging.warning(f"Handoff: git pull failed: {pull.stderr.strip()}")
+                return False
+            command = [sys.executable] + [a for a in sys.argv if a != "--neuron.standby"] + ["--neuron.standby"]
+            self._handoff = Handoff(self.handoff_dir, command, HANDOFF_TIMEOUT_S).start()
+        except Exception as e:
+            bt.logging.warning(f"Handoff: could not start standby: {e}")
+            return False
+        bt.logging.info(
+            f"Update {remote_sha[:8]} pulled; standby warming up, "
+            f"handing over at the first epoch boundary it is ready for."
+        )
+        return True
+
+    def _poll_handoff(self, current_block: int, epoch: int) -> bool:
+        """
+        At an epoch boundary, after the previous round was finalized and
+        saved: hand over to a ready standby, or fall back to a cold restart
+        if it died or missed HANDOFF_TIMEOUT_S. True means stop validating.
+        """
+        handoff = self._handoff
+        if handoff.ready():
+            self.hand_over()
+            handoff.commit({
+                "step": self.step,
+                "epoch": epoch,
+                "block": current_block,
+                "round_block": self.round_block,
+                "pid": os.getpid(),
+            })
+            self._update_exit_code = HANDOFF_EXIT_CODE
+        elif handoff.failed():
+            bt.logging.warning("Handoff: standby failed to become ready, restarting cold.")
+            handoff.abort()
+            self._update_exit_code = AUTOUPDATE_EXIT_CODE
+        else:
+            bt.logging.info("Handoff: standby not ready yet, running this epoch here.")
+            return False
+        self._handoff = None
+        self.should_exit = True
+        return True
+
+    def warm_up(self) -> bool:
+        """Standby: get ready to validate without touching shared state."""
+        return self.wait_for_chain(timeout=HANDOFF_TIMEOUT_S)
+
+    def _await_takeover(self) -> bool:
+        if not self.warm_up():
+            bt.logging.error("Standby could not connect to Subtensor, exiting.")
+            self._update_exit_code = 1
+            self.should_exit = True
+            return False
+        snapshot = await_handoff(self.handoff_dir, should_exit=lambda: self.should_exit)
+        if snapshot is None:
+            self._update_exit_code = 0
+            self.should_exit = True
+            return False
+        self.take_over(snapshot)
+        bt.logging.info(
+            f"Took over from pid {snapshot.get('pid')} at step {self.step} "
+            f"(epoch {snapshot.get('epoch')}, block {snapshot.get('block')})"
+        )
+        return True
+
+    def take_over(self, snapshot: Dict):
+        """Standby: become the active validator from the saved state and snapshot."""
+        self.standby = False
+        self._start_tracer()
+        self._open_history()
+        self.load_state()
+        self.step = int(snapshot.get("step", self.step))
+        self.round_block = int(snapshot.get("round_block", self.round_block))
+        self.metrics.step.set(self.step)
+        self._start_metrics_server()
+        if not self.config.neuron.axon_off:
+            self.when_chain_ready(self.serve_axon)
+
+    def hand_over(self):
+        """Active: release ports and background writers before the standby takes over."""
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+            self.metrics_server = None
+        self.tracer.close()
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        if self.memwatch is not None:
+            self.memwatch.stop()
+            self.memwatch = None
+
     def resync_metagraph(self):
         """Resyncs metagraph and handles hotkey changes."""
         bt.logging.info("resync_metagraph()")
@@ -239,42 +574,72 @@ class BaseValidatorNeuron(BaseNeuron):
             self.scores = new_scores
 
         self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+        self.scores_version += 1
 
     def update_scores(self, rewards: np.ndarray, uids: List[int]):
         """Exponential moving average on scores."""
-        if np.isnan(rewards).any():
-            rewards = np.nan_to_num(rewards, nan=0)
-
-        rewards = np.asarray(rewards)
-        uids_array = np.array(uids) if not isinstance(uids, np.ndarray) else uids.copy()
-
-        if rewards.size == 0 or uids_array.size == 0:
+        scattered_rewards = scatter_rewards(rewards, uids, len(self.scores))
+        if scattered_rewards is None:
             return
 
-        scattered_rewards = np.zeros_like(self.scores)
-        scattered_rewards[uids_array] = rewards
-
         alpha = self.config.neuron.moving_average_alpha
-        self.scores = alpha * scattered_rewards + (1 - alpha) * self.scores
+        self.scores = ema_update(self.scores, scattered_rewards, alpha)
+        self.scores_version += 1
+        self._last_rewards = scattered_rewards
 
     def save_state(self):
-        """Saves validator state."""
+        """Saves validator state atomically and appends the round to history."""
+        path = self.config.neuron.full_path + "/state.npz"
+        tmp = path + ".tmp"
         try:
-            np.savez(
-                self.config.neuron.full_path + "/state.npz",
-                step=self.step,
-                scores=self.scores,
-                hotkeys=self.hotkeys,
-            )
+            with open(tmp, "wb") as f:
+                np.savez(
+                    f,
+                    step=self.step,
+                    scores=self.scores,
+                    hotkeys=self.hotkeys,
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
         except Exception as e:
             bt.logging.warning(f"Failed to save state: {e}")
 
+        if self.history is not None and self._last_rewards is not None:
+            try:
+                self.history.append(
+                    step=self.step,
+                    block=self.round_block,
+                    rewards=self._last_rewards,
+                    scores=self.scores,
+                    hotkeys=self.hotkeys,
+                )
+                self._last_rewards = None
+            except Exception as e:
+                bt.logging.warning(f"Failed to append score history: {e}")
+
     def load_state(self):
-        """Loads validator state."""
+        """Loads validator state, falling back to the last history record."""
         try:
             state = np.load(self.config.neuron.full_path + "/state.npz")
             self.step = int(state["step"])
             self.scores = state["scores"]
             self.hotkeys = list(state["hotkeys"])
+            self.scores_version += 1
+            return
         except Exception:
-            bt.logging.info("No saved state found, starting fresh.")
+            pass
+
+        last = self.history.last() if self.history is not None else None
+        if last is not None:
+            self.step = int(last["step"])
+            self.scores = self.history.restore_scores(self.metagraph.hotkeys)
+            self.scores_version += 1
+            self.hotkeys = copy.deepcopy(self.metagraph.hotkeys)
+            bt.logging.info(
+                f"state.npz unavailable, restored scores from history "
+                f"(step={self.step}, block={int(last['block'])})"
+            )
+            return
+
+        bt.logging.info("No saved state found, starting fresh.")
@@ -28,12 +28,65 @@ REGISTRY_CACHE_FILE = os.getenv("REGISTRY_CACHE", "registry_cache.json")
 PROBE_TIMEOUT_MS = int(os.getenv("PROBE_TIMEOUT_MS", "5000"))
 PROBE_CONCURRENCY = int(os.getenv("PROBE_CONCURRENCY", "10"))
 PROBES_PER_ROUND = int(os.getenv("PROBES_PER_ROUND", "5"))
+# "weighted" favours stale, contested and flapping providers; "uniform" = random.sample
+TARGET_SAMPLING = os.getenv("TARGET_SAMPLING", "weighted").lower()
+# Split each epoch's probing into this many jittered micro-batches of
+# PROBES_PER_ROUND targets (1 = one burst at the epoch boundary)
+PROBE_BATCHES_PER_EPOCH = int(os.getenv("PROBE_BATCHES_PER_EPOCH", "1"))
+# Probe answer encoding requested from miners: 0 = the three plain fields,
+# 1 = one packed base64 field (decoded straight into arrays). Leave at 0
+# until the miners you query run a release that understands it.
+PROBE_ENCODING = int(os.getenv("PROBE_ENCODING", "0"))
+# Blocks before epoch end reserved for finalizing (set_weights, save_state)
+PROBE_FINALIZE_MARGIN_BLOCKS = int(os.getenv("PROBE_FINALIZE_MARGIN_BLOCKS", "10"))
+# Submit weights for at most this many top-scoring uids (0 = every nonzero score)
+WEIGHTS_TOP_K = int(os.getenv("WEIGHTS_TOP_K", "0"))
+# Targets per round the validator probes itself (0 = off); a finished spot
+# check breaks reachability ties and is compared with consensus
+SPOT_CHECKS_PER_ROUND = int(os.getenv("SPOT_CHECKS_PER_ROUND", "2"))
+SPOT_CHECK_CONCURRENCY = int(os.getenv("SPOT_CHECK_CONCURRENCY", "4"))
+SPOT_CHECK_TIMEOUT_MS = int(os.getenv("SPOT_CHECK_TIMEOUT_MS", str(PROBE_TIMEOUT_MS)))
+
+# ---------------------------------------------------------------------------
+# Miner Rate Limiting (per-validator token buckets)
+# ---------------------------------------------------------------------------
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BASE = float(os.getenv("RATE_LIMIT_BASE", "20"))
+RATE_LIMIT_MAX = float(os.getenv("RATE_LIMIT_MAX", "200"))
+RATE_LIMIT_WINDOW_S = float(os.getenv("RATE_LIMIT_WINDOW_S", "60"))
 
 # ---------------------------------------------------------------------------
 # Scoring
 # ---------------------------------------------------------------------------
 ACCURACY_EMA_ALPHA = float(os.getenv("ACCURACY_EMA_ALPHA", "0.3"))
 MAX_LATENCY_DEVIATION = int(os.getenv("MAX_LATENCY_DEVIATION", "2000"))
+# Copycat detection over recent answers: "off", "log" (report clusters) or
+# "penalize" (a cluster of k miners shares one miner's reward)
+COLLUSION_MODE = os.getenv("COLLUSION_MODE", "log").lower()
+COLLUSION_WINDOW = int(os.getenv("COLLUSION_WINDOW", "2048"))  # probes kept per miner
+
+# ---------------------------------------------------------------------------
+# Score History (append-only per-round rewards/scores)
+# ---------------------------------------------------------------------------
+HISTORY_RETENTION_ROUNDS = int(os.getenv("HISTORY_RETENTION_ROUNDS", "2000"))
+HISTORY_MAX_UIDS = int(os.getenv("HISTORY_MAX_UIDS", "256"))
+
+# ---------------------------------------------------------------------------
+# Probe Log (local SQLite store of per-probe results)
+# ---------------------------------------------------------------------------
+PROBE_LOG_ENABLED = os.getenv("PROBE_LOG_ENABLED", "true").lower() == "true"
+PROBE_LOG_RETENTION_DAYS = float(os.getenv("PROBE_LOG_RETENTION_DAYS", "14"))
+
+# ---------------------------------------------------------------------------
+# Latency Sketches (fixed-memory p50/p95/p99 per provider and per miner)
+# ---------------------------------------------------------------------------
+LATENCY_SKETCHES_ENABLED = os.getenv("LATENCY_SKETCHES_ENABLED", "true").lower() == "true"
+LATENCY_SKETCH_ALPHA = float(os.getenv("LATENCY_SKETCH_ALPHA", "0.02"))  # relative quantile error
+
+# ---------------------------------------------------------------------------
+# Round Recording (raw rounds for offline replay; empty = disabled)
+# ---------------------------------------------------------------------------
+ROUND_RECORD_DIR = os.getenv("ROUND_RECORD_DIR", "")
 
 # ---------------------------------------------------------------------------
 # Bittensor Tempo
@@ -47,8 +100,50 @@ POLL_INTERVAL = 12
 AUTOUPDATE_ENABLED = os.getenv("AUTOUPDATE_ENABLED", "false").lower() == "true"
 AUTOUPDATE_BRANCH = os.getenv("AUTOUPDATE_BRANCH", "main")
 AUTOUPDATE_EXIT_CODE = 42
+# Warm standby handoff: pull the update, start the new code alongside and
+# switch over at the next epoch boundary instead of a cold restart
+AUTOUPDATE_HANDOFF = os.getenv("AUTOUPDATE_HANDOFF", "false").lower() == "true"
+HANDOFF_DIR = os.getenv("HANDOFF_DIR", "")  # empty = <full_path>/handoff; entrypoint.sh sets it
+HANDOFF_TIMEOUT_S = float(os.getenv("HANDOFF_TIMEOUT_S", "1800"))  # standby not ready by then -> cold restart
+HANDOFF_EXIT_CODE = 43
+
+# ---------------------------------------------------------------------------
+# Metagraph snapshot (fast restart: serve from the last synced metagraph
+# while Subtensor connects in the background)
+# ---------------------------------------------------------------------------
+METAGRAPH_SNAPSHOT = os.getenv("METAGRAPH_SNAPSHOT", "true").lower() == "true"
+METAGRAPH_SNAPSHOT_MAX_AGE = float(os.getenv("METAGRAPH_SNAPSHOT_MAX_AGE", "21600"))  # seconds
+
+# ---------------------------------------------------------------------------
+# Metrics (Prometheus text endpoint; 0 = disabled)
+# ---------------------------------------------------------------------------
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# ---------------------------------------------------------------------------
+# Memory watchdog (tracemalloc + RSS trend; reports under <full_path>/memwatch)
+# ---------------------------------------------------------------------------
+MEMWATCH_ENABLED = os.getenv("MEMWATCH_ENABLED", "false").lower() == "true"
+MEMWATCH_INTERVAL_S = float(os.getenv("MEMWATCH_INTERVAL_S", str(TEMPO * 12)))  # default: one epoch
+MEMWATCH_GROWTH_MB = float(os.getenv("MEMWATCH_GROWTH_MB", "256"))
+# Stack depth recorded by tracemalloc (1 = allocation line only, ~20% CPU
+# overhead; 10+ gives full tracebacks at ~3x; 0 = RSS and object counts only)
+MEMWATCH_TRACEMALLOC_FRAMES = int(os.getenv("MEMWATCH_TRACEMALLOC_FRAMES", "1"))
+
+# ---------------------------------------------------------------------------
+# Round tracing (one JSON span tree per validation round)
+# ---------------------------------------------------------------------------
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "false").lower() == "true"
+TRACE_FILE = os.getenv("TRACE_FILE", "")  # empty = <full_path>/trace.jsonl
+TRACE_MAX_BYTES = int(os.getenv("TRACE_MAX_BYTES", str(10 * 2**20)))
+TRACE_BACKUPS = int(os.getenv("TRACE_BACKUPS", "5"))
+TRACE_PROFILE_THRESHOLD_S = float(os.getenv("TRACE_PROFILE_THRESHOLD_S", "0"))  # 0 = no profiler
+TRACE_PROFILE_INTERVAL_MS = float(os.getenv("TRACE_PROFILE_INTERVAL_MS", "10"))
 
 # ---------------------------------------------------------------------------
 # Marketplace
 # ---------------------------------------------------------------------------
 MARKETPLACE_URL = os.getenv("MARKETPLACE_URL", "https://www.handshake58.com")
+# Per-round consensus feed to the marketplace (replaces per-target probe alerts)
+CONSENSUS_FEED_ENABLED = os.getenv("CONSENSUS_FEED_ENABLED", "false").lower() == "true"
+CONSENSUS_FEED_KEYFRAME_EVERY = int(os.getenv("CONSENSUS_FEED_KEYFRAME_EVERY", "10"))  # rounds
+CONSENSUS_FEED_OUTBOX_MAX = int(os.getenv("CONSENSUS_FEED_OUTBOX_MAX", "500"))  # batches kept while offline
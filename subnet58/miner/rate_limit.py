@@ -0,0 +1,94 @@
+# Handshake58 Subnet 58 - Miner Rate Limiting
+#
+# Per-hotkey token buckets for the miner admission path. Buckets are sized
+# by caller stake so high-stake validators get more headroom, and every
+# rejection is counted so operators can see who is flooding the probe path.
+
+import math
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List
+
+
+class TokenBucketLimiter:
+    """
+    Token-bucket limiter keyed by hotkey.
+
+    Capacity is base_capacity * (1 + log10(1 + stake)), capped at
+    max_capacity. A bucket refills to capacity over window_s seconds.
+    Called from the axon event loop only, so no locking is needed.
+    """
+
+    def __init__(
+        self,
+        base_capacity: float,
+        max_capacity: float,
+        window_s: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.base_capacity = float(base_capacity)
+        self.max_capacity = float(max(max_capacity, base_capacity))
+        self.window_s = float(max(window_s, 1e-3))
+        self._clock = clock
+        # hotkey -> [tokens, last_refill_ts, capacity]
+        self._buckets: Dict[str, List[float]] = {}
+        self.allowed = 0
+        self.rejected = 0
+        self.rejected_by_hotkey: Counter = Counter()
+
+    def capacity_for(self, stake: float) -> float:
+        stake = max(float(stake), 0.0)
+        capacity = self.base_capacity * (1.0 + math.log10(1.0 + stake))
+        return min(capacity, self.max_capacity)
+
+    def _refill(self, hotkey: str, stake: float) -> List[float]:
+        now = self._clock()
+        capacity = self.capacity_for(stake)
+        bucket = self._buckets.get(hotkey)
+        if bucket is None:
+            bucket = [capacity, now, capacity]
+            self._buckets[hotkey] = bucket
+            return bucket
+
+        elapsed = now - bucket[1]
+        if elapsed > 0:
+            bucket[0] = min(capacity, bucket[0] + elapsed * capacity / self.window_s)
+            bucket[1] = now
+        bucket[2] = capacity
+        return bucket
+
+    def consume(self, hotkey: str, stake: float, cost: float = 1.0) -> bool:
+        """Take cost tokens from the caller's bucket. False if it is empty."""
+        bucket = self._refill(hotkey, stake)
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            self.allowed += 1
+            return True
+        self.rejected += 1
+        self.rejected_by_hotkey[hotkey] += 1
+        return False
+
+    def fill_ratio(self, hotkey: str) -> float:
+        """Fraction of the bucket still available (1.0 for unseen hotkeys)."""
+        bucket = self._buckets.get(hotkey)
+        if bucket is None or bucket[2] <= 0:
+            return 1.0
+        elapsed = max(self._clock() - bucket[1], 0.0)
+        tokens = min(bucket[2], bucket[0] + elapsed * bucket[2] / self.window_s)
+        return tokens / bucket[2]
+
+    def prune(self, active_hotkeys: Iterable[str]) -> None:
+        """Drop buckets and rejection counts for hotkeys that are no longer registered."""
+        active = set(active_hotkeys)
+        for hotkey in [h for h in self._buckets if h not in active]:
+            del self._buckets[hotkey]
+        for hotkey in [h for h in self.rejected_by_hotkey if h not in active]:
+            del self.rejected_by_hotkey[hotkey]
+
+    def stats(self, top: int = 5) -> Dict:
+        return {
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+            "tracked_hotkeys": len(self._buckets),
+            "top_rejected": self.rejected_by_hotkey.most_common(top),
+        }
@@ -0,0 +1,200 @@
+# Handshake58 Subnet 58 - Mock Chain
+#
+# In-process stand-ins for Subtensor, Metagraph and Dendrite, enabled with
+# --mock. All mock neurons in one process share a chain per netuid, so a
+# validator and any number of miners can be wired together without a
+# network: served axons are registered on the chain and MockDendrite
+# dispatches synapses straight to their attached blacklist/forward fns.
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import bittensor as bt
+
+
+class MockChain:
+    """Registration, stake and axon state for one mock subnet."""
+
+    def __init__(self, netuid: int, block_time: float = 12.0):
+        self.netuid = netuid
+        self.block_time = block_time
+        self.start_time = time.time()
+        self.start_block = 0
+        self.hotkeys: List[str] = []
+        self.coldkeys: List[str] = []
+        self.stakes: List[float] = []
+        self.permits: List[bool] = []
+        self.axons: List["bt.AxonInfo"] = []
+        self.handlers: Dict[str, "bt.Axon"] = {}
+        self.weights: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @property
+    def block(self) -> int:
+        return self.start_block + int((time.time() - self.start_time) / self.block_time)
+
+    def register(
+        self,
+        hotkey: str,
+        coldkey: str = "",
+        stake: float = 0.0,
+        validator_permit: bool = False,
+    ) -> int:
+        if hotkey in self.hotkeys:
+            return self.hotkeys.index(hotkey)
+        self.hotkeys.append(hotkey)
+        self.coldkeys.append(coldkey)
+        self.stakes.append(float(stake))
+        self.permits.append(bool(validator_permit))
+        self.axons.append(bt.AxonInfo(
+            version=0, ip="0.0.0.0", port=0, ip_type=4,
+            hotkey=hotkey, coldkey=coldkey,
+        ))
+        return len(self.hotkeys) - 1
+
+
+_CHAINS: Dict[int, MockChain] = {}
+
+
+def get_mock_chain(netuid: int) -> MockChain:
+    """The process-wide mock chain for netuid (created on first use)."""
+    if netuid not in _CHAINS:
+        _CHAINS[netuid] = MockChain(netuid)
+    return _CHAINS[netuid]
+
+
+class MockMetagraph:
+    """Snapshot of a MockChain exposing the metagraph fields the neurons use."""
+
+    def __init__(self, netuid: int):
+        self.netuid = netuid
+        self.sync()
+
+    def sync(self, subtensor=None, lite: bool = True, block: Optional[int] = None):
+        chain = get_mock_chain(self.netuid)
+        self.block = np.array(chain.block, dtype=np.int64)
+        self.n = np.array(len(chain.hotkeys), dtype=np.int64)
+        self.uids = np.arange(len(chain.hotkeys), dtype=np.int64)
+        self.hotkeys = list(chain.hotkeys)
+        self.coldkeys = list(chain.coldkeys)
+        self.S = np.array(chain.stakes, dtype=np.float32)
+        self.validator_permit = np.array(chain.permits, dtype=bool)
+        self.axons = list(chain.axons)
+
+    def __str__(self):
+        return f"MockMetagraph(netuid:{self.netuid}, n:{int(self.n)}, block:{int(self.block)})"
+
+
+class MockSubtensor:
+    """Subtensor stand-in backed by the shared MockChain."""
+
+    def __init__(self, netuid: int, wallet: Optional["bt.Wallet"] = None):
+        self.netuid = netuid
+        self.chain = get_mock_chain(netuid)
+        self.chain_endpoint = "mock://local"
+        self.network = "mock"
+        if wallet is not None:
+            self.chain.register(
+                wallet.hotkey.ss58_address,
+                wallet.coldkeypub.ss58_address,
+            )
+
+    def get_current_block(self) -> int:
+        return self.chain.block
+
+    def is_hotkey_registered(self, netuid: int, hotkey_ss58: str) -> bool:
+        return hotkey_ss58 in self.chain.hotkeys
+
+    def metagraph(self, netuid: int) -> MockMetagraph:
+        return MockMetagraph(netuid)
+
+    def serve_axon(self, netuid: int, axon: "bt.Axon", certificate=None, **kwargs) -> bool:
+        hotkey = axon.wallet.hotkey.ss58_address
+        uid = self.chain.register(hotkey, axon.wallet.coldkeypub.ss58_address)
+        info = axon.info()
+        info.ip = "127.0.0.1"
+        self.chain.axons[uid] = info
+        self.chain.handlers[hotkey] = axon
+        return True
+
+    def set_weights(self, wallet, netuid, uids, weights, **kwargs) -> Tuple[bool, str]:
+        self.chain.weights[wallet.hotkey.ss58_address] = (
+            np.asarray(uids), np.asarray(weights),
+        )
+        return True, ""
+
+    def __str__(self):
+        return f"MockSubtensor({self.chain_endpoint}, netuid={self.netuid})"
+
+
+class MockDendrite:
+    """
+    Dendrite stand-in that calls served axons' attached functions in-process.
+
+    Fills synapse.dendrite.status_code / process_time like the real client:
+    200 on success, 403 when blacklisted, 408 on timeout, 503 if the target
+    hotkey has no served axon.
+    """
+
+    def __init__(self, wallet=None, netuid: int = 58):
+        keypair = getattr(wallet, "hotkey", wallet)
+        self.hotkey = keypair.ss58_address if keypair is not None else ""
+        self.netuid = netuid
+
+    async def _call(self, axon_info, synapse: "bt.Synapse", timeout: float):
+        start = time.perf_counter()
+        synapse.dendrite = bt.TerminalInfo(hotkey=self.hotkey, ip="127.0.0.1")
+        synapse.axon = bt.TerminalInfo(hotkey=axon_info.hotkey)
+        name = type(synapse).__name__
+
+        axon = get_mock_chain(self.netuid).handlers.get(axon_info.hotkey)
+        status, message = 200, "Success"
+        if axon is None or name not in axon.forward_fns:
+            status, message = 503, "Service unavailable"
+        else:
+            blacklist_fn = axon.blacklist_fns.get(name)
+            blocked, reason = (await blacklist_fn(synapse)) if blacklist_fn else (False, "")
+            if blocked:
+                status, message = 403, reason
+            else:
+                try:
+                    synapse = await asyncio.wait_for(axon.forward_fns[name](synapse), timeout)
+                except asyncio.TimeoutError:
+                    status, message = 408, "Timeout"
+                except Exception as e:
+                    status, message = 500, str(e)
+
+        synapse.dendrite.status_code = status
+        synapse.dendrite.status_message = message
+        synapse.dendrite.process_time = time.perf_counter() - start
+        return synapse
+
+    async def forward(
+        self,
+        axons,
+        synapse: "bt.Synapse" = None,
+        timeout: float = 12,
+        deserialize: bool = True,
+        run_async: bool = True,
+        streaming: bool = False,
+    ):
+        single = not isinstance(axons, list)
+        targets = [axons] if single else axons
+        results = await asyncio.gather(*(
+            self._call(axon, synapse.model_copy(deep=True), timeout)
+            for axon in targets
+        ))
+        if deserialize:
+            results = [r.deserialize() for r in results]
+        return results[0] if single else results
+
+    def query(self, *args, **kwargs):
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(self.forward(*args, **kwargs))
+
+    async def __call__(self, *args, **kwargs):
+        return await self.forward(*args, **kwargs)
+
+    def __str__(self):
+        return f"MockDendrite({self.hotkey})"
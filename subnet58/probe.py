@@ -0,0 +1,42 @@
+# Handshake58 Subnet 58 - Provider Probe
+#
+# The HTTP probe itself, shared by the miner (answering ProviderProbe
+# synapses) and the validator's spot checks. A result carries the same
+# probe_* fields as a ProviderProbe response, so it can be scored and
+# compared with consensus like any miner answer.
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from subnet58.config import PROBE_TIMEOUT_MS
+
+
+@dataclass
+class ProbeResult:
+    probe_reachable: bool
+    probe_status: int
+    probe_latency_ms: int
+
+
+def make_client(timeout_ms: float = PROBE_TIMEOUT_MS, max_connections: Optional[int] = None):
+    """httpx.AsyncClient configured for probing (imported lazily)."""
+    import httpx
+
+    limits = httpx.Limits(max_connections=max_connections) if max_connections else httpx.Limits()
+    return httpx.AsyncClient(
+        timeout=timeout_ms / 1000,
+        follow_redirects=True,
+        limits=limits,
+    )
+
+
+async def probe_url(client, url: str) -> ProbeResult:
+    """GET url; any response (including 4xx/5xx) counts as reachable."""
+    try:
+        start_ns = time.perf_counter_ns()
+        resp = await client.get(url)
+        elapsed_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
+        return ProbeResult(True, resp.status_code, elapsed_ms)
+    except Exception:
+        return ProbeResult(False, 0, 0)
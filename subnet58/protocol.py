@@ -2,9 +2,24 @@
 #
 # ProviderProbe: Validator sends a target URL, miner probes it and returns
 # reachability, HTTP status, and latency. Protocol-agnostic (DRAIN + MPP).
+#
+# Compact encoding: a validator that sets probe_encoding=ENCODING_PACKED asks
+# for the answer as probe_packed, a base64 fixed-layout record (flags, status,
+# latency; 7 bytes, see utils/probe_codec.py) instead of the three separate
+# fields. Miners that predate it ignore the flag and fill the fields, so
+# validators read either form.
 
 import typing
+
 import bittensor as bt
+from pydantic import SerializationInfo, model_serializer
+
+from subnet58.utils.probe_codec import PACKED_DTYPE, pack_probe, unpack_probes  # noqa: F401
+
+ENCODING_FIELDS = 0
+ENCODING_PACKED = 1
+
+_ANSWER_FIELDS = ("probe_latency_ms", "probe_status", "probe_reachable", "probe_packed")
 
 
 class ProviderProbe(bt.Synapse):
@@ -18,13 +33,38 @@ class ProviderProbe(bt.Synapse):
 
     # Request (validator sets)
     target_url: str = ""
+    probe_encoding: int = ENCODING_FIELDS
 
     # Response (miner fills)
     probe_latency_ms: typing.Optional[int] = None
     probe_status: typing.Optional[int] = None
     probe_reachable: typing.Optional[bool] = None
+    # Set instead of the three fields above when probe_encoding >= ENCODING_PACKED
+    probe_packed: typing.Optional[str] = None
+
+    @model_serializer(mode="wrap")
+    def _omit_unset_answers(self, handler, info: SerializationInfo):
+        # The axon's JSON response leaves out answer fields the miner didn't
+        # set, so a packed answer doesn't also carry three nulls. Python-mode
+        # dumps keep every field: the dendrite copies the response back key
+        # by key from the request's model_dump().
+        data = handler(self)
+        if info.mode == "json":
+            for name in _ANSWER_FIELDS:
+                if name in data and data[name] is None:
+                    del data[name]
+        return data
 
     def deserialize(self) -> typing.Dict[str, typing.Any]:
+        if self.probe_packed and self.probe_reachable is None:
+            (flags, status, latency), = unpack_probes([self.probe_packed]).tolist()
+            if flags & 1:
+                return {
+                    "target_url": self.target_url,
+                    "probe_latency_ms": latency,
+                    "probe_status": status,
+                    "probe_reachable": bool(flags & 2),
+                }
         return {
             "target_url": self.target_url,
             "probe_latency_ms": self.probe_latency_ms,
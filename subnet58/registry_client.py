@@ -1,7 +1,9 @@
 # Handshake58 Subnet 58 - Registry Client
 #
-# Validator-side provider discovery. Fetches provider list from marketplace
-# registry, caches locally for resilience.
+# Validator-side provider discovery. fetch_provider_updates() keeps a
+# ProviderTable current with the marketplace registry, asking for changes
+# since the table's version and falling back to diffing a full listing.
+# The listing is cached locally for resilience.
 
 import json
 import os
@@ -15,59 +17,67 @@ from subnet58.config import (
     REGISTRY_CACHE_FILE,
     MARKETPLACE_URL,
 )
+from subnet58.validator.provider_table import ProviderDelta, ProviderTable
 
 
-def fetch_providers(registries: Optional[List[str]] = None) -> List[Dict]:
+def fetch_provider_updates(
+    table: ProviderTable, registries: Optional[List[str]] = None
+) -> Optional[ProviderDelta]:
     """
-    Fetch provider list from registry APIs with local cache fallback.
-
-    Tries each registry URL in order. On success, caches the result locally.
-    If all registries fail, reads from the local cache file.
-
-    Returns list of dicts with at least: id, probeUrl, name, protocol.
+    Bring table up to date with the registry; returns the applied delta.
+
+    With a known table version the registry is asked for ?since=<version>.
+    A response with "delta": true and a matching "since" carries only
+    "upserts" and "removed" ids; a delta from any other version is
+    refetched as a full listing, which is diffed against the table. The
+    local cache is rewritten only when something changed. Returns None if
+    every registry failed.
     """
     urls = registries or DEFAULT_REGISTRIES
-    providers = None
 
     for url in urls:
         try:
-            resp = requests.get(url, timeout=15)
-            resp.raise_for_status()
-            data = resp.json()
-
-            raw = data.get("providers", data.get("miners", []))
-            providers = []
-            for p in raw:
-                probe_url = p.get("probeUrl") or p.get("apiUrl", "")
-                if not probe_url:
-                    continue
-                providers.append({
-                    "id": p.get("id", ""),
-                    "probeUrl": probe_url,
-                    "name": p.get("name", "unknown"),
-                    "protocol": p.get("protocol", "drain"),
-                })
-
-            bt.logging.info(
-                f"[Registry] {len(providers)} providers from {url}"
-            )
-            _save_cache(providers)
-            return providers
+            data = _get_json(url, {"since": table.version} if table.version else None)
+            if data.get("delta") and (table.version is None or str(data.get("since")) != table.version):
+                # A delta against some other version can't be applied
+                data = _get_json(url, None)
+                if data.get("delta"):
+                    raise ValueError("delta without a matching since")
+            version = data.get("version")
+            version = str(version) if version is not None else None
+
+            if data.get("delta"):
+                delta = table.apply_delta(data.get("upserts", []), data.get("removed", []), version)
+            else:
+                delta = table.apply(data.get("providers", data.get("miners", [])), version)
+
+            if delta:
+                bt.logging.info(f"[Registry] {len(table)} providers from {url} ({delta})")
+                _save_cache([
+                    {k: v for k, v in row.items() if k != "index"} for row in table.providers()
+                ])
+            return delta
 
         except Exception as e:
             bt.logging.warning(f"[Registry] {url} failed: {e}")
             continue
 
-    cached = _load_cache()
-    if cached is not None:
-        bt.logging.info(
-            f"[Registry] All registries down, using cache "
-            f"({len(cached)} providers)"
-        )
-        return cached
+    if len(table) == 0:
+        cached = _load_cache()
+        if cached is not None:
+            bt.logging.info(
+                f"[Registry] All registries down, using cache "
+                f"({len(cached)} providers)"
+            )
+            return table.apply(cached)
+        bt.logging.error("[Registry] No providers available (all registries down, no cache)")
+    return None
+
 
-    bt.logging.error("[Registry] No providers available (all registries down, no cache)")
-    return []
+def _get_json(url: str, params: Optional[Dict]) -> Dict:
+    resp = requests.get(url, params=params, timeout=15)
+    resp.raise_for_status()
+    return resp.json()
 
 
 def send_probe_alert(
@@ -93,9 +103,12 @@ def send_probe_alert(
 
 
 def _save_cache(providers: List[Dict]) -> None:
+    # Atomic: a standby validator may read or write the same cache
+    tmp = f"{REGISTRY_CACHE_FILE}.{os.getpid()}.tmp"
     try:
-        with open(REGISTRY_CACHE_FILE, "w") as f:
+        with open(tmp, "w") as f:
             json.dump(providers, f)
+        os.replace(tmp, REGISTRY_CACHE_FILE)
     except Exception as e:
         bt.logging.trace(f"[Registry] Cache write failed: {e}")
 
@@ -1,5 +1,5 @@
 # Adapted from opentensor/bittensor-subnet-template
-# Simplified for Subnet 58 - no wandb, no mock, no events logger
+# Simplified for Subnet 58 - no wandb, no events logger
 
 import os
 import argparse
@@ -30,6 +30,12 @@ def add_args(cls, parser):
     parser.add_argument(
         "--neuron.device", type=str, help="Device to run on.", default="cpu"
     )
+    parser.add_argument(
+        "--mock",
+        action="store_true",
+        help="Run against the in-process mock chain (benchmarks).",
+        default=False,
+    )
     parser.add_argument(
         "--neuron.epoch_length",
         type=int,
@@ -92,6 +98,12 @@ def add_validator_args(cls, parser):
         help="Do not serve an Axon.",
         default=False,
     )
+    parser.add_argument(
+        "--neuron.standby",
+        action="store_true",
+        help="Start as a warm standby that takes over when the active validator hands off.",
+        default=False,
+    )
 
 
 def config(cls):
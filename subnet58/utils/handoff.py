@@ -0,0 +1,157 @@
+# Handshake58 Subnet 58 - Warm Standby Handoff
+#
+# Zero-downtime auto-update for validators. When an update is found the
+# active process pulls it and spawns the new code as a standby
+# (--neuron.standby). The standby connects, syncs the metagraph and warms
+# its clients, then writes a ready file and waits. At the next epoch
+# boundary (after the previous round is finalized and saved) the active
+# process writes the handoff snapshot and exits with HANDOFF_EXIT_CODE; the
+# standby loads the saved state and runs that epoch's round. Files in the
+# handoff directory:
+#
+#   ready         standby pid, written once it is warm
+#   handoff.json  snapshot from the active process (step, epoch, block);
+#                 its appearance is the standby's signal to take over
+#   active.pid    pid of the process now validating, for entrypoint.sh
+#                 (which no longer has it as a child)
+#   exit_code     "<pid> <code>", left by the process named in active.pid
+#                 when it exits, so entrypoint.sh can act on the code
+
+import json
+import os
+import subprocess
+import time
+from typing import Dict, List, Optional
+
+import bittensor as bt
+
+READY_FILE = "ready"
+SNAPSHOT_FILE = "handoff.json"
+ACTIVE_PID_FILE = "active.pid"
+EXIT_CODE_FILE = "exit_code"
+# Set for the standby: the active process's pid (getppid() is unreliable
+# once the parent may already be gone)
+PARENT_ENV = "HS58_HANDOFF_PARENT"
+
+
+def write_atomic(path: str, text: str) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def record_exit(directory: str, code: int) -> bool:
+    """Leave this process's exit code for entrypoint.sh if it is the handed-off active one."""
+    try:
+        with open(os.path.join(directory, ACTIVE_PID_FILE)) as f:
+            if int(f.read().strip() or 0) != os.getpid():
+                return False
+        write_atomic(os.path.join(directory, EXIT_CODE_FILE), f"{os.getpid()} {int(code)}\n")
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Handoff:
+    """
+    Active side of a handoff: spawns the standby, reports whether it is
+    ready, and either commits the handoff or aborts it.
+    """
+
+    def __init__(self, directory: str, command: List[str], timeout_s: float = 1800.0, cwd: Optional[str] = None):
+        self.directory = directory
+        self.command = command
+        self.timeout_s = timeout_s
+        self.cwd = cwd
+        self.proc: Optional[subprocess.Popen] = None
+        self.deadline = 0.0
+
+    def start(self) -> "Handoff":
+        os.makedirs(self.directory, exist_ok=True)
+        for name in (READY_FILE, SNAPSHOT_FILE):
+            _remove(os.path.join(self.directory, name))
+        env = dict(os.environ, **{PARENT_ENV: str(os.getpid())})
+        self.proc = subprocess.Popen(self.command, cwd=self.cwd, env=env)
+        self.deadline = time.time() + self.timeout_s
+        bt.logging.info(f"[Handoff] Standby started (pid {self.proc.pid})")
+        return self
+
+    def ready(self) -> bool:
+        if self.proc is None or self.proc.poll() is not None:
+            return False
+        try:
+            with open(os.path.join(self.directory, READY_FILE)) as f:
+                return int(f.read().strip() or 0) == self.proc.pid
+        except (OSError, ValueError):
+            return False
+
+    def failed(self) -> bool:
+        """The standby exited or missed the deadline without becoming ready."""
+        if self.proc is None or self.proc.poll() is not None:
+            return True
+        return not self.ready() and time.time() > self.deadline
+
+    def commit(self, snapshot: Dict) -> None:
+        """Hand over: record the standby as active, then release it with the snapshot."""
+        write_atomic(os.path.join(self.directory, ACTIVE_PID_FILE), f"{self.proc.pid}\n")
+        write_atomic(os.path.join(self.directory, SNAPSHOT_FILE), json.dumps(snapshot))
+        bt.logging.info(f"[Handoff] Handed over to pid {self.proc.pid} at step {snapshot.get('step')}")
+
+    def abort(self) -> None:
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        for name in (READY_FILE, SNAPSHOT_FILE):
+            _remove(os.path.join(self.directory, name))
+
+
+def await_handoff(directory: str, poll_s: float = 1.0, should_exit=lambda: False) -> Optional[Dict]:
+    """
+    Standby side: announce readiness and block until the active process
+    hands over. Returns the snapshot, or None if the parent (the active
+    process) went away first or should_exit() turned true.
+    """
+    parent = int(os.environ.get(PARENT_ENV) or os.getppid())
+    os.makedirs(directory, exist_ok=True)
+    write_atomic(os.path.join(directory, READY_FILE), f"{os.getpid()}\n")
+    snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+    bt.logging.info("[Handoff] Standby ready, waiting for the active validator to hand over")
+    while not should_exit():
+        # Parent checked first: it writes the snapshot before exiting
+        orphaned = not _pid_alive(parent)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path) as f:
+                snapshot = json.load(f)
+            for name in (READY_FILE, SNAPSHOT_FILE):
+                _remove(os.path.join(directory, name))
+            return snapshot
+        if orphaned:
+            bt.logging.warning("[Handoff] Active validator exited before handing over")
+            _remove(os.path.join(directory, READY_FILE))
+            return None
+        time.sleep(poll_s)
+    _remove(os.path.join(directory, READY_FILE))
+    return None
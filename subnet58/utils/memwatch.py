@@ -0,0 +1,192 @@
+# Handshake58 Subnet 58 - Memory Watchdog
+#
+# Opt-in memory instrumentation for long-running neurons. A daemon thread
+# samples every interval (default: one epoch): process RSS, live object
+# counts for the types that tend to pile up (synapses, metagraphs, axon
+# infos, HTTP clients), and a tracemalloc snapshot diffed against the
+# previous one to name the top growing allocation sites. RSS is exported
+# as gauges along with its trend (least-squares slope over the recent
+# samples). When RSS has grown more than a threshold above the lowest
+# recent sample and is still rising, a report (RSS history, object counts,
+# top allocators) is written to disk, at most once per further threshold
+# of growth.
+
+import gc
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from typing import Deque, Dict, List, Optional, Sequence, Tuple
+
+import bittensor as bt
+
+# Object types counted by class name (subclasses of Synapse are matched by MRO)
+TRACKED_TYPES = ("Synapse", "Metagraph", "SnapshotMetagraph", "AxonInfo", "AsyncClient", "Session", "Task")
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def count_objects(types: Sequence[str] = TRACKED_TYPES) -> Dict[str, int]:
+    """Live gc-tracked objects whose class (or a base class) is named in types."""
+    wanted = set(types)
+    counts: Counter = Counter()
+    for obj in gc.get_objects():
+        for cls in type(obj).__mro__:
+            if cls.__name__ in wanted:
+                counts[cls.__name__] += 1
+                break
+    return {name: counts.get(name, 0) for name in types}
+
+
+def slope_per_hour(samples: Sequence[Tuple[float, int]]) -> float:
+    """Least-squares RSS slope in bytes per hour over (timestamp, rss) samples."""
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_t = sum(t for t, _ in samples) / n
+    mean_r = sum(r for _, r in samples) / n
+    var = sum((t - mean_t) ** 2 for t, _ in samples)
+    if var == 0:
+        return 0.0
+    cov = sum((t - mean_t) * (r - mean_r) for t, r in samples)
+    return cov / var * 3600
+
+
+class MemoryWatch:
+    """
+    Periodic RSS / object-count / tracemalloc sampling with a growth alarm.
+
+    start() runs sample() every interval_s on a daemon thread; sample() can
+    also be called directly. Reports are JSON files in report_dir.
+    """
+
+    def __init__(
+        self,
+        report_dir: str,
+        interval_s: float = 4320.0,
+        growth_mb: float = 256.0,
+        window: int = 12,
+        top: int = 25,
+        frames: int = 1,
+        registry=None,
+    ):
+        self.report_dir = report_dir
+        self.interval_s = interval_s
+        self.growth_bytes = growth_mb * 2**20
+        self.top = top
+        self.frames = frames
+        self.samples: Deque[Tuple[float, int]] = deque(maxlen=max(2, window))
+        self.objects: Dict[str, int] = {}
+        self.top_growth: List[Dict] = []
+        self.reports: List[str] = []
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._alarm_rss = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._gauges = None
+        if registry is not None:
+            self._gauges = (
+                registry.gauge("hs58_process_rss_bytes", "Resident set size."),
+                registry.gauge("hs58_process_rss_growth_bytes_per_hour", "RSS trend over recent samples."),
+                registry.gauge("hs58_process_tracked_objects", "Live objects of watched types.", labels=("type",)),
+                registry.counter("hs58_process_memory_reports_total", "Memory growth reports written."),
+            )
+
+    def start(self) -> "MemoryWatch":
+        os.makedirs(self.report_dir, exist_ok=True)
+        if self.frames > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self._thread = threading.Thread(target=self._run, name="memwatch", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        # First sample right away sets the baseline
+        while True:
+            try:
+                self.sample()
+            except Exception as e:
+                bt.logging.warning(f"[MemWatch] Sample failed: {e}")
+            if self._stop.wait(self.interval_s):
+                break
+
+    def sample(self) -> Dict:
+        """Take one sample; writes a report if the growth alarm fires."""
+        now, rss = time.time(), rss_bytes()
+        self.samples.append((now, rss))
+        self.objects = count_objects()
+        self._diff_allocations()
+
+        trend = slope_per_hour(list(self.samples))
+        if self._gauges is not None:
+            rss_gauge, trend_gauge, objects_gauge, _ = self._gauges
+            rss_gauge.set(rss)
+            trend_gauge.set(trend)
+            for name, count in self.objects.items():
+                objects_gauge.set(count, name)
+
+        floor = min(r for _, r in self.samples)
+        if len(self.samples) >= 3 and rss - floor >= self.growth_bytes and trend > 0 and rss >= self._alarm_rss:
+            self._alarm_rss = rss + self.growth_bytes
+            self.report(reason=f"RSS grew {(rss - floor) / 2**20:.0f} MiB over {len(self.samples)} samples")
+        return {"rss": rss, "trend_per_hour": trend, "objects": self.objects}
+
+    def _diff_allocations(self) -> None:
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+        if self._snapshot is not None:
+            stats = snapshot.compare_to(self._snapshot, "traceback")
+            self.top_growth = [
+                {
+                    "size_diff": s.size_diff,
+                    "size": s.size,
+                    "count_diff": s.count_diff,
+                    "traceback": [f"{f.filename}:{f.lineno}" for f in s.traceback],
+                }
+                for s in stats[: self.top]
+                if s.size_diff > 0
+            ]
+        self._snapshot = snapshot
+
+    def report(self, reason: str = "manual") -> str:
+        """Write the current RSS history, object counts and top allocators to a JSON file."""
+        path = os.path.join(self.report_dir, f"memwatch-{int(time.time())}.json")
+        body = {
+            "reason": reason,
+            "pid": os.getpid(),
+            "rss": [{"ts": t, "rss": r} for t, r in self.samples],
+            "trend_bytes_per_hour": slope_per_hour(list(self.samples)),
+            "objects": self.objects,
+            "gc_counts": gc.get_count(),
+            "traced_memory": tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else None,
+            "top_growth": self.top_growth,
+        }
+        with open(path, "w") as f:
+            json.dump(body, f, indent=2)
+        self.reports.append(path)
+        if self._gauges is not None:
+            self._gauges[3].inc()
+        bt.logging.warning(f"[MemWatch] {reason}; report written to {path}")
+        return path
@@ -0,0 +1,206 @@
+# Handshake58 Subnet 58 - Metrics
+#
+# Minimal Prometheus-compatible metrics with no external dependency.
+# Updates are plain dict/list increments with no locks, so they are cheap
+# enough for the probe hot path; under concurrent writers an increment can
+# at worst be lost, which is acceptable for monitoring. The text exposition
+# is served from a daemon thread only when METRICS_PORT is set.
+
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import bittensor as bt
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROUND_BUCKETS = (1.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0)
+
+
+def _label_str(names: Sequence[str], values: Tuple, extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1.0) -> None:
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def get(self, *label_values) -> float:
+        return self._values.get(label_values, 0.0)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, value in list(self._values.items()):
+            lines.append(f"{self.name}{_label_str(self.label_names, key)} {value:g}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, *label_values) -> None:
+        self._values[label_values] = float(value)
+
+    def dec(self, *label_values, amount: float = 1.0) -> None:
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *label_values) -> None:
+        series = self._series.get(label_values)
+        if series is None:
+            series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            self._series[label_values] = series
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for key, (counts, total, count) in list(self._series.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                labels = _label_str(self.label_names, key, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_str(self.label_names, key)
+            lines.append(f"{self.name}_sum{labels} {total:g}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds a neuron's metrics and renders the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._add(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._add(Gauge(name, help, labels))
+
+    def histogram(
+        self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._add(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class ValidatorMetrics:
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        r = self.registry = registry or MetricsRegistry()
+        self.round_duration = r.histogram(
+            "hs58_validator_round_duration_seconds", "Wall-clock time of a validation round.",
+            buckets=ROUND_BUCKETS,
+        )
+        self.query_duration = r.histogram(
+            "hs58_validator_dendrite_query_seconds", "Dendrite fan-out time per probed target.",
+            labels=("protocol",),
+        )
+        self.response_latency = r.histogram(
+            "hs58_validator_dendrite_response_seconds", "Per-miner dendrite response time.",
+        )
+        self.responses = r.counter(
+            "hs58_validator_responses_total", "Miner responses by outcome.", labels=("outcome",),
+        )
+        self.consensus = r.counter(
+            "hs58_validator_consensus_total", "Consensus outcomes per probed target.", labels=("reachable",),
+        )
+        self.registry_fetch = r.histogram(
+            "hs58_validator_registry_fetch_seconds", "Time spent fetching the provider registry.",
+        )
+        self.providers = r.gauge("hs58_validator_providers", "Providers in the last registry fetch.")
+        self.set_weights = r.counter(
+            "hs58_validator_set_weights_total", "set_weights attempts by result.", labels=("result",),
+        )
+        self.nonzero_scores = r.gauge("hs58_validator_nonzero_scores", "Miners with a non-zero score.")
+        self.spot_checks = r.counter(
+            "hs58_validator_spot_checks_total", "Validator spot checks by outcome.", labels=("outcome",),
+        )
+        self.collusion_flagged = r.gauge(
+            "hs58_validator_collusion_flagged", "Miners in suspected copycat clusters.",
+        )
+        self.step = r.gauge("hs58_validator_step", "Completed validation rounds.")
+
+
+class MinerMetrics:
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        r = self.registry = registry or MetricsRegistry()
+        self.probes = r.counter("hs58_miner_probes_total", "Probes served by outcome.", labels=("outcome",))
+        self.probe_latency = r.histogram("hs58_miner_probe_latency_seconds", "Measured provider latency.")
+        self.in_flight = r.gauge("hs58_miner_probes_in_flight", "Probes currently running.")
+        self.blacklisted = r.counter(
+            "hs58_miner_blacklist_rejections_total", "Requests rejected by blacklist.", labels=("reason",),
+        )
+
+
+def start_metrics_server(registry: MetricsRegistry, port: int, addr: str = "0.0.0.0") -> ThreadingHTTPServer:
+    """Serve registry.render() at /metrics from a daemon thread."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    bt.logging.info(f"[Metrics] Serving on http://{addr}:{port}/metrics")
+    return server
@@ -0,0 +1,35 @@
+# Handshake58 Subnet 58 - Packed Probe Answers
+#
+# The compact ProviderProbe answer: a base64 fixed-layout record (flags,
+# status, latency; 7 bytes) carried in probe_packed. Kept free of bittensor
+# so the validator's scoring and the offline replay tool can decode it.
+
+import base64
+import struct
+from typing import Optional, Sequence
+
+import numpy as np
+
+# flags (bit0 = answered, bit1 = reachable), HTTP status, latency in ms
+_PACKED = struct.Struct("<BHI")
+PACKED_DTYPE = np.dtype([("flags", "u1"), ("status", "<u2"), ("latency", "<u4")])
+_EMPTY = bytes(_PACKED.size)
+
+
+def pack_probe(reachable: bool, status: int, latency_ms: int) -> str:
+    flags = 1 | (2 if reachable else 0)
+    return base64.b64encode(
+        _PACKED.pack(flags, max(0, min(int(status or 0), 0xFFFF)), max(0, min(int(latency_ms or 0), 0xFFFFFFFF)))
+    ).decode("ascii")
+
+
+def unpack_probes(packed: Sequence[Optional[str]]) -> np.ndarray:
+    """Decode packed answers into one PACKED_DTYPE record each (None/invalid -> flags 0)."""
+    chunks = []
+    for p in packed:
+        try:
+            raw = base64.b64decode(p) if p else _EMPTY
+        except (ValueError, TypeError):
+            raw = _EMPTY
+        chunks.append(raw if len(raw) == _PACKED.size else _EMPTY)
+    return np.frombuffer(b"".join(chunks), dtype=PACKED_DTYPE)
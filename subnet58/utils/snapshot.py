@@ -0,0 +1,154 @@
+# Handshake58 Subnet 58 - Metagraph Snapshot
+#
+# The last synced metagraph (hotkeys, coldkeys, axons, stake, permits) saved
+# as a small .npz after every sync. On restart a neuron can serve and
+# schedule from the snapshot immediately while the subtensor connection and
+# live metagraph download run in the background. Arrays are stored without
+# pickling; axons are stored as parallel columns.
+
+import os
+import time
+from typing import Optional
+
+import numpy as np
+import bittensor as bt
+
+SNAPSHOT_VERSION = 1
+
+
+def save_snapshot(metagraph, path: str, netuid: int, block: Optional[int] = None) -> None:
+    """Atomically write metagraph to path (tmp file + os.replace)."""
+    axons = list(metagraph.axons)
+    if block is None:
+        block = int(np.asarray(getattr(metagraph, "block", 0)))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(
+            f,
+            version=SNAPSHOT_VERSION,
+            netuid=netuid,
+            block=int(block),
+            saved_at=time.time(),
+            uids=np.asarray(metagraph.uids, dtype=np.int64),
+            hotkeys=np.array(list(metagraph.hotkeys), dtype=str),
+            coldkeys=np.array(list(metagraph.coldkeys), dtype=str),
+            stake=np.asarray(metagraph.S, dtype=np.float32),
+            validator_permit=np.asarray(metagraph.validator_permit, dtype=bool),
+            axon_ip=np.array([a.ip for a in axons], dtype=str),
+            axon_port=np.array([a.port for a in axons], dtype=np.int32),
+            axon_ip_type=np.array([a.ip_type for a in axons], dtype=np.int8),
+            axon_version=np.array([a.version for a in axons], dtype=np.int64),
+            axon_protocol=np.array([getattr(a, "protocol", 4) for a in axons], dtype=np.int8),
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SnapshotMetagraph:
+    """
+    Metagraph restored from a snapshot, exposing the fields the neurons use.
+
+    sync(subtensor) switches it to live data: the first call adopts a
+    metagraph staged by the background connect (or downloads one), later
+    calls sync that live metagraph in place. Attributes not held here are
+    delegated to the live metagraph once there is one.
+    """
+
+    def __init__(self, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            if int(data["version"]) != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {int(data['version'])}")
+            self.netuid = int(data["netuid"])
+            self.block = np.array(int(data["block"]), dtype=np.int64)
+            self.saved_at = float(data["saved_at"])
+            self.uids = data["uids"].astype(np.int64)
+            self.n = np.array(len(self.uids), dtype=np.int64)
+            self.hotkeys = [str(h) for h in data["hotkeys"]]
+            self.coldkeys = [str(c) for c in data["coldkeys"]]
+            self.S = data["stake"].astype(np.float32)
+            self.validator_permit = data["validator_permit"].astype(bool)
+            self.axons = [
+                bt.AxonInfo(
+                    version=int(version), ip=str(ip), port=int(port), ip_type=int(ip_type),
+                    hotkey=hotkey, coldkey=coldkey, protocol=int(protocol),
+                )
+                for ip, port, ip_type, version, protocol, hotkey, coldkey in zip(
+                    data["axon_ip"], data["axon_port"], data["axon_ip_type"],
+                    data["axon_version"], data["axon_protocol"],
+                    self.hotkeys, self.coldkeys,
+                )
+            ]
+        self._live = None
+        self._staged = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.saved_at
+
+    @property
+    def is_live(self) -> bool:
+        return self._live is not None
+
+    def estimated_block(self, block_time: float = 12.0) -> int:
+        """Chain head extrapolated from the snapshot block and its age."""
+        return int(self.block) + int(max(0.0, self.age) / block_time)
+
+    def stage(self, live) -> None:
+        """Hand over a live metagraph, adopted by the next sync()."""
+        self._staged = live
+
+    def sync(self, subtensor=None, lite: bool = True, block: Optional[int] = None):
+        if self._live is None:
+            if self._staged is not None:
+                self._live, self._staged = self._staged, None
+            elif subtensor is not None:
+                self._live = subtensor.metagraph(self.netuid)
+            else:
+                return
+        else:
+            self._live.sync(subtensor=subtensor, lite=lite)
+        self._adopt(self._live)
+
+    def _adopt(self, live) -> None:
+        self.block = np.asarray(live.block)
+        self.n = np.asarray(live.n)
+        self.uids = np.asarray(live.uids)
+        self.hotkeys = list(live.hotkeys)
+        self.coldkeys = list(live.coldkeys)
+        self.S = np.asarray(live.S, dtype=np.float32)
+        self.validator_permit = np.asarray(live.validator_permit, dtype=bool)
+        self.axons = list(live.axons)
+
+    def __getattr__(self, name):
+        live = self.__dict__.get("_live")
+        if live is None or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(live, name)
+
+    def __str__(self):
+        source = "live" if self._live is not None else f"snapshot age:{self.age:.0f}s"
+        return f"SnapshotMetagraph(netuid:{self.netuid}, n:{int(self.n)}, block:{int(self.block)}, {source})"
+
+
+def load_snapshot(
+    path: str, netuid: int, hotkey: Optional[str], max_age: float
+) -> Optional[SnapshotMetagraph]:
+    """The snapshot at path if it exists, matches netuid, lists hotkey (if given) and is fresh enough."""
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = SnapshotMetagraph(path)
+    except Exception as e:
+        bt.logging.warning(f"[Snapshot] Ignoring unreadable metagraph snapshot {path}: {e}")
+        return None
+    if snapshot.netuid != netuid:
+        bt.logging.info(f"[Snapshot] Snapshot is for netuid {snapshot.netuid}, ignoring")
+        return None
+    if max_age > 0 and snapshot.age > max_age:
+        bt.logging.info(f"[Snapshot] Snapshot is {snapshot.age:.0f}s old (max {max_age:.0f}s), ignoring")
+        return None
+    if hotkey is not None and hotkey not in snapshot.hotkeys:
+        bt.logging.info("[Snapshot] Hotkey not in snapshot, ignoring")
+        return None
+    return snapshot
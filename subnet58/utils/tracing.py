@@ -0,0 +1,343 @@
+# Handshake58 Subnet 58 - Round Tracing
+#
+# Nested timing spans for validation rounds, written as one JSON record per
+# round to a size-rotated file; a round split into micro-batches across the
+# epoch is one record too, with a child span per burst. When tracing is
+# disabled, span() returns a shared no-op context manager, so instrumented
+# code pays one attribute check per span. An optional sampling profiler watches every traced round
+# and keeps a collapsed-stack profile only for rounds slower than a
+# threshold (flamegraph.pl / speedscope compatible).
+
+import glob
+import json
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import bittensor as bt
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **attrs) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "attrs", "start", "end", "children")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.start = 0.0
+        self.end = 0.0
+        self.children: List["Span"] = []
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = self.tracer._stack
+        stack[-1].children.append(self)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end = time.perf_counter()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._stack.pop()
+        return False
+
+    def to_dict(self, origin: float) -> Dict:
+        out = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round((self.end - self.start) * 1000, 3),
+        }
+        if self.attrs:
+            out["attrs"] = self.attrs
+        if self.children:
+            out["children"] = [c.to_dict(origin) for c in self.children]
+        return out
+
+
+class SamplingProfiler:
+    """Samples one thread's stack every interval_s from a helper thread."""
+
+    def __init__(self, thread_id: int, interval_s: float = 0.01):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        # Restartable: a scheduled round samples only while a part runs
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="round-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(1)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, n: int = 10) -> List[List]:
+        leaves: Counter = Counter()
+        for stack, count in self.stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        return [[name, count] for name, count in leaves.most_common(n)]
+
+
+class Tracer:
+    """
+    Per-round span tracer.
+
+    Usage:
+        with tracer.round(step=step, block=block):
+            with tracer.span("sync"):
+                ...
+    Spans are only recorded on the thread that opened the round.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        enabled: bool = False,
+        max_bytes: int = 10 * 2**20,
+        backups: int = 5,
+        profile_threshold_s: float = 0.0,
+        profile_interval_s: float = 0.01,
+    ):
+        self.enabled = enabled and bool(path)
+        self.path = path
+        self.backups = backups
+        self.profile_threshold_s = profile_threshold_s
+        self.profile_interval_s = profile_interval_s
+        self._stack: List[Span] = []
+        self._thread_id: Optional[int] = None
+        self._logger: Optional[logging.Logger] = None
+
+        if self.enabled:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(
+                path, maxBytes=max_bytes, backupCount=backups
+            )
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger = logging.getLogger(f"hs58.trace.{id(self)}")
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._logger.addHandler(handler)
+            bt.logging.info(f"[Trace] Writing round traces to {path}")
+
+    def span(self, name: str, **attrs):
+        if not self._stack or threading.get_ident() != self._thread_id:
+            return _NOOP
+        return Span(self, name, attrs)
+
+    def round(self, name: str = "round", **attrs):
+        if not self.enabled:
+            return _NOOP
+        return _RoundContext(self, name, attrs)
+
+    def open_round(self, name: str = "round", **attrs):
+        """
+        A round that runs in separate bursts (scheduled micro-batches): each
+        part() is a child span of one root, written as a single record by
+        close().
+        """
+        if not self.enabled:
+            return _NOOP_ROUND
+        return _ScheduledRound(self, name, attrs)
+
+    def close(self) -> None:
+        """Stop tracing and release the trace file."""
+        self.enabled = False
+        if self._logger is not None:
+            for handler in list(self._logger.handlers):
+                self._logger.removeHandler(handler)
+                handler.close()
+            self._logger = None
+
+    def _prune_profiles(self) -> None:
+        """Keep only the newest `backups` slow-round profiles, like the rotated trace."""
+        pattern = os.path.splitext(self.path)[0] + "-profile-*.folded"
+        profiles = sorted(glob.glob(pattern), key=os.path.getmtime)
+        for stale in profiles[: max(0, len(profiles) - max(1, self.backups))]:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+    def _write(self, record: Dict) -> None:
+        try:
+            self._logger.info(json.dumps(record, separators=(",", ":"), default=str))
+        except Exception as e:
+            bt.logging.trace(f"[Trace] Write failed: {e}")
+
+
+class _RoundContext:
+    def __init__(self, tracer: Tracer, name: str, attrs: Dict):
+        self.tracer = tracer
+        self.root = Span(tracer, name, attrs)
+        self.profiler: Optional[SamplingProfiler] = None
+        self.wall_start = 0.0
+        # Time spent inside the round's parts (all of it for a one-shot round)
+        self.busy_s = 0.0
+        self._resumed = 0.0
+
+    def set(self, **attrs) -> None:
+        self.root.set(**attrs)
+
+    def _open(self) -> None:
+        self.wall_start = time.time()
+        self.root.start = time.perf_counter()
+
+    def _resume(self, span: Span) -> None:
+        tracer = self.tracer
+        tracer._thread_id = threading.get_ident()
+        tracer._stack = [span]
+        if tracer.profile_threshold_s > 0:
+            if self.profiler is None:
+                self.profiler = SamplingProfiler(tracer._thread_id, tracer.profile_interval_s)
+            self.profiler.thread_id = tracer._thread_id
+            self.profiler.start()
+        self._resumed = time.perf_counter()
+
+    def _pause(self) -> None:
+        self.busy_s += time.perf_counter() - self._resumed
+        self.tracer._stack = []
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def __enter__(self):
+        self._open()
+        self._resume(self.root)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.root.attrs["error"] = exc_type.__name__
+        self._pause()
+        self._finish()
+        return False
+
+    def _finish(self) -> None:
+        tracer = self.tracer
+        self.root.end = time.perf_counter()
+        record = {"ts": round(self.wall_start, 3)}
+        record.update(self.root.to_dict(self.root.start))
+
+        if self.profiler is not None:
+            duration = self.busy_s
+            if duration >= tracer.profile_threshold_s and self.profiler.samples:
+                profile_path = (
+                    os.path.splitext(tracer.path)[0]
+                    + f"-profile-{int(self.wall_start)}.folded"
+                )
+                try:
+                    with open(profile_path, "w") as f:
+                        f.write(self.profiler.collapsed())
+                    tracer._prune_profiles()
+                    record["profile"] = {
+                        "path": profile_path,
+                        "samples": self.profiler.samples,
+                        "top": self.profiler.top_functions(),
+                    }
+                    bt.logging.warning(
+                        f"[Trace] Slow round ({duration:.1f}s), profile saved to {profile_path}"
+                    )
+                except Exception as e:
+                    bt.logging.warning(f"[Trace] Profile write failed: {e}")
+
+        tracer._write(record)
+
+
+class _ScheduledRound(_RoundContext):
+    """Root span opened at construction, written by close() after its parts."""
+
+    def __init__(self, tracer: Tracer, name: str, attrs: Dict):
+        super().__init__(tracer, name, attrs)
+        self.closed = False
+        self._open()
+
+    def part(self, name: str, **attrs):
+        return _RoundPart(self, Span(self.tracer, name, attrs))
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.root.attrs["busy_ms"] = round(self.busy_s * 1000, 3)
+        self._finish()
+
+
+class _RoundPart:
+    def __init__(self, round_: _ScheduledRound, span: Span):
+        self.round = round_
+        self.span = span
+
+    def __enter__(self):
+        self.round.root.children.append(self.span)
+        self.round._resume(self.span)
+        self.span.start = time.perf_counter()
+        return self.span
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.span.end = time.perf_counter()
+        if exc_type is not None:
+            self.span.attrs["error"] = exc_type.__name__
+        self.round._pause()
+        return False
+
+
+class _NoopRound:
+    __slots__ = ()
+
+    def part(self, name: str, **attrs):
+        return _NOOP
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+_NOOP_ROUND = _NoopRound()
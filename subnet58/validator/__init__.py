@@ -0,0 +1,20 @@
+# Exports resolve lazily: probe_log imports bittensor, which the offline
+# replay tool and scoring code do not need.
+import importlib
+
+_EXPORTS = {
+    "ScoreHistory": "history",
+    "ProbeLog": "probe_log",
+    "TargetResult": "probe_log",
+    "Consensus": "reward",
+    "compute_consensus": "reward",
+    "probe_accuracy": "reward",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
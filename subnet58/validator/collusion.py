@@ -0,0 +1,166 @@
+# Handshake58 Subnet 58 - Collusion Detection
+#
+# Consensus scoring rewards agreement, so a group of miners that copy one
+# answer outvotes honest ones. Copied answers leave two fingerprints that
+# independent measurements do not: identical latency values probe after
+# probe, and latency residuals (latency - consensus median) that move in
+# lockstep. A rolling (uids x probes) matrix of answers is kept and both
+# statistics are computed for all pairs with NumPy: exact-match counts in
+# row blocks, residual correlation from masked matrix products
+# (pairwise-complete Pearson). Pairs over either threshold are joined into
+# clusters with union-find; scoring can split a cluster's reward.
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class CollusionReport:
+    clusters: List[List[int]] = field(default_factory=list)
+    pairs: int = 0
+    probes: int = 0
+
+    def multipliers(self, n: int) -> np.ndarray:
+        """Reward multiplier per uid: 1/size for cluster members, else 1."""
+        out = np.ones(n, dtype=np.float32)
+        for cluster in self.clusters:
+            members = [uid for uid in cluster if uid < n]
+            out[members] = 1.0 / len(cluster)
+        return out
+
+    def apply(self, rewards: np.ndarray, uids: Sequence[int], n: int) -> np.ndarray:
+        """rewards (aligned with uids) with each cluster sharing one reward."""
+        multipliers = self.multipliers(n)
+        return rewards * np.array([multipliers[uid] if uid < n else 1.0 for uid in uids], dtype=np.float32)
+
+    @property
+    def flagged(self) -> int:
+        return sum(len(c) for c in self.clusters)
+
+
+class CollusionDetector:
+    """
+    Rolling per-uid answer matrix with pairwise copycat statistics.
+
+    add_probe() records one probed target; analyze() returns the clusters of
+    uids whose answers are too alike to be independent measurements.
+    """
+
+    def __init__(
+        self,
+        max_uids: int = 256,
+        window: int = 2048,
+        min_joint: int = 50,
+        match_threshold: float = 0.9,
+        corr_threshold: float = 0.98,
+        block: int = 32,
+    ):
+        self.max_uids = max_uids
+        self.window = window
+        self.min_joint = min_joint
+        self.match_threshold = match_threshold
+        self.corr_threshold = corr_threshold
+        self.block = block
+        # Reported latency in ms, -1 where there is no positive latency
+        self.latency = np.full((max_uids, window), -1, dtype=np.int32)
+        # Latency minus consensus median, NaN where missing
+        self.residual = np.full((max_uids, window), np.nan, dtype=np.float32)
+        self.hotkeys: List[Optional[str]] = [None] * max_uids
+        self.cursor = 0
+        self.probes = 0
+
+    def sync_hotkeys(self, hotkeys: Sequence[str]) -> None:
+        """Forget the history of uids whose hotkey changed."""
+        for uid, hotkey in enumerate(hotkeys[: self.max_uids]):
+            if self.hotkeys[uid] != hotkey:
+                if self.hotkeys[uid] is not None:
+                    self.latency[uid] = -1
+                    self.residual[uid] = np.nan
+                self.hotkeys[uid] = hotkey
+
+    def add_probe(self, uids: Sequence[int], responses, consensus) -> None:
+        col = self.cursor
+        self.latency[:, col] = -1
+        self.residual[:, col] = np.nan
+        median = consensus.median_latency_ms if consensus is not None else 0
+        for uid, r in zip(uids, responses):
+            if uid >= self.max_uids or r is None or not r.probe_reachable:
+                continue
+            latency = r.probe_latency_ms or 0
+            if latency <= 0:
+                continue
+            self.latency[uid, col] = latency
+            if median > 0:
+                self.residual[uid, col] = latency - median
+        self.cursor = (col + 1) % self.window
+        self.probes += 1
+
+    def exact_matches(self):
+        """(joint, equal) counts of positive latencies for every uid pair."""
+        lat = self.latency
+        valid = lat >= 0
+        n = self.max_uids
+        valid_f = valid.astype(np.float32)
+        joint = (valid_f @ valid_f.T).astype(np.int32)
+        equal = np.zeros((n, n), dtype=np.int32)
+        active = np.flatnonzero(valid.any(axis=1))
+        for start in range(0, len(active), self.block):
+            rows = active[start:start + self.block]
+            # (b, 1, W) == (1, a, W) over active uids only
+            eq = (lat[rows, None, :] == lat[None, active, :]) & valid[rows, None, :]
+            equal[np.ix_(rows, active)] = eq.sum(axis=2)
+        return joint, equal
+
+    def residual_correlation(self) -> np.ndarray:
+        """Pairwise-complete Pearson correlation of latency residuals."""
+        mask = ~np.isnan(self.residual)
+        m = mask.astype(np.float64)
+        x = np.where(mask, self.residual, 0.0).astype(np.float64)
+        corr = np.zeros((self.max_uids, self.max_uids), dtype=np.float32)
+        count = m @ m.T
+        for start in range(0, self.max_uids, self.block):
+            rows = slice(start, start + self.block)
+            c = count[rows]
+            sx = x[rows] @ m.T
+            sy = m[rows] @ x.T
+            sxx = (x[rows] ** 2) @ m.T
+            syy = m[rows] @ (x ** 2).T
+            sxy = x[rows] @ x.T
+            cov = c * sxy - sx * sy
+            var = (c * sxx - sx ** 2) * (c * syy - sy ** 2)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r = np.where(var > 0, cov / np.sqrt(np.maximum(var, 1e-12)), 0.0)
+            corr[rows] = r
+        return corr
+
+    def analyze(self) -> CollusionReport:
+        joint, equal = self.exact_matches()
+        corr = self.residual_correlation()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            match_rate = np.where(joint > 0, equal / np.maximum(joint, 1), 0.0)
+        suspicious = (joint >= self.min_joint) & (
+            (match_rate >= self.match_threshold) | (corr >= self.corr_threshold)
+        )
+        np.fill_diagonal(suspicious, False)
+        a, b = np.nonzero(np.triu(suspicious))
+
+        parent = list(range(self.max_uids))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in zip(a.tolist(), b.tolist()):
+            ri, rj = find(i), find(j)
+            if ri != rj:
+                parent[rj] = ri
+
+        groups: Dict[int, List[int]] = {}
+        for uid in set(a.tolist()) | set(b.tolist()):
+            groups.setdefault(find(uid), []).append(uid)
+        clusters = sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: (-len(g), g[0]))
+        return CollusionReport(clusters=clusters, pairs=len(a), probes=min(self.probes, self.window))
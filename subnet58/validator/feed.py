@@ -0,0 +1,253 @@
+# Handshake58 Subnet 58 - Consensus Feed
+#
+# Streams every round's per-provider consensus (reachable, status, median
+# latency) to the marketplace. Each round becomes one batch with a sequence
+# number; a batch carries only providers whose consensus changed since the
+# last batch (status flip, reachability flip or a latency move beyond a
+# threshold), plus a full keyframe every few rounds so the receiver can
+# resync after a gap. Batches are appended to a bounded JSONL outbox on disk
+# first and drained by a background thread that POSTs them gzip-compressed
+# over a pooled requests.Session, oldest first, so nothing is lost while the
+# marketplace is unreachable. The queued batches are mirrored in memory, so
+# the file is only appended to, and rewritten when batches are trimmed or
+# acknowledged.
+
+import gzip
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+import requests
+import bittensor as bt
+
+FEED_VERSION = 1
+FEED_PATH = "/api/validator/consensus-feed"
+
+
+class ConsensusFeed:
+    """
+    Delta-encoded consensus batches with a durable outbox and a sender thread.
+
+    record() collects one target's consensus during a round, publish() turns
+    the round into a batch and queues it; start() runs the sender.
+    """
+
+    def __init__(
+        self,
+        marketplace_url: str,
+        outbox_path: str,
+        hotkey: str = "",
+        signer: Optional[Callable[[bytes], str]] = None,
+        keyframe_every: int = 10,
+        latency_delta_ms: int = 50,
+        max_outbox: int = 500,
+        timeout: float = 10.0,
+        max_backoff: float = 300.0,
+    ):
+        self.url = marketplace_url.rstrip("/") + FEED_PATH
+        self.outbox_path = outbox_path
+        self.hotkey = hotkey
+        self.signer = signer
+        self.keyframe_every = max(1, keyframe_every)
+        self.latency_delta_ms = latency_delta_ms
+        self.max_outbox = max_outbox
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+
+        # provider id -> (reachable, status, median latency) as last published
+        self._published: Dict[str, Tuple[int, int, int]] = {}
+        self._pending: Dict[str, Tuple[int, int, int]] = {}
+        self._seq = 0
+        self._rounds_since_keyframe = self.keyframe_every  # first batch is a keyframe
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._session: Optional[requests.Session] = None
+        # (seq, serialized batch) for every batch in the outbox file, oldest first
+        self._queue: Deque[Tuple[int, str]] = deque()
+        self.sent = 0
+        self.dropped = 0
+        self._load_outbox()
+
+    # ------------------------------------------------------------------
+    # Producer side (validator loop)
+    # ------------------------------------------------------------------
+
+    def record(self, provider: Dict, consensus) -> None:
+        """Remember one target's consensus for this round's batch."""
+        if consensus is None:
+            return
+        key = provider.get("id") or provider.get("probeUrl", "")
+        self._pending[key] = (
+            int(bool(consensus.reachable)),
+            int(consensus.status or 0),
+            int(consensus.median_latency_ms or 0),
+        )
+
+    def _changed(self, key: str, entry: Tuple[int, int, int]) -> bool:
+        last = self._published.get(key)
+        if last is None:
+            return True
+        return (
+            entry[0] != last[0]
+            or entry[1] != last[1]
+            or abs(entry[2] - last[2]) >= self.latency_delta_ms
+        )
+
+    def publish(self, step: int, block: int) -> Optional[Dict]:
+        """Queue this round's batch (changes only, or everything on a keyframe)."""
+        pending, self._pending = self._pending, {}
+        # Quiet rounds count too, so a stable network still gets keyframes
+        keyframe = self._rounds_since_keyframe >= self.keyframe_every
+        self._rounds_since_keyframe = 1 if keyframe else self._rounds_since_keyframe + 1
+        if keyframe:
+            self._published.update(pending)
+            entries = self._published
+        else:
+            entries = {k: v for k, v in pending.items() if self._changed(k, v)}
+            self._published.update(entries)
+        if not entries and not keyframe:
+            return None
+
+        self._seq += 1
+        batch = {
+            "v": FEED_VERSION,
+            "seq": self._seq,
+            "keyframe": keyframe,
+            "hotkey": self.hotkey,
+            "step": step,
+            "block": block,
+            "ts": int(time.time()),
+            # [providerId, reachable, status, medianLatencyMs]
+            "entries": [[k, *v] for k, v in entries.items()],
+        }
+        self._append(batch)
+        self._wake.set()
+        return batch
+
+    # ------------------------------------------------------------------
+    # Outbox
+    # ------------------------------------------------------------------
+
+    def _load_outbox(self) -> None:
+        """Queue what a previous run left and continue numbering after it."""
+        torn = False
+        if os.path.exists(self.outbox_path):
+            with open(self.outbox_path) as f:
+                for line in f:
+                    try:
+                        seq = int(json.loads(line).get("seq", 0))
+                    except (ValueError, AttributeError):
+                        torn = True  # torn last line after a crash
+                        continue
+                    self._queue.append((seq, line.rstrip("\n")))
+                    self._seq = max(self._seq, seq)
+        if torn:
+            self._write_outbox()
+        seq_path = self.outbox_path + ".seq"
+        try:
+            with open(seq_path) as f:
+                self._seq = max(self._seq, int(f.read().strip() or 0))
+        except (OSError, ValueError):
+            pass
+
+    def _write_outbox(self) -> None:
+        tmp = self.outbox_path + ".tmp"
+        with open(tmp, "w") as f:
+            for _, line in self._queue:
+                f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.outbox_path)
+
+    def _append(self, batch: Dict) -> None:
+        line = json.dumps(batch, separators=(",", ":"))
+        with self._lock:
+            with open(self.outbox_path, "a") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.outbox_path + ".seq", "w") as f:
+                f.write(str(self._seq))
+            self._queue.append((batch["seq"], line))
+            if len(self._queue) > self.max_outbox:
+                # Oldest batches go first; the receiver sees the seq gap and
+                # resyncs from the next keyframe
+                while len(self._queue) > self.max_outbox:
+                    self._queue.popleft()
+                    self.dropped += 1
+                self._write_outbox()
+
+    def backlog(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    # ------------------------------------------------------------------
+    # Sender thread
+    # ------------------------------------------------------------------
+
+    def start(self) -> "ConsensusFeed":
+        self._thread = threading.Thread(target=self._run, name="consensus-feed", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._session is not None:
+            self._session.close()
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            self._wake.wait(timeout=backoff if backoff > 1.0 else 60.0)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                self.flush()
+                backoff = 1.0
+            except Exception as e:
+                backoff = min(backoff * 2, self.max_backoff)
+                bt.logging.debug(f"[Feed] Send failed, retrying in {backoff:.0f}s: {e}")
+
+    def flush(self) -> int:
+        """Send queued batches in order; returns how many were delivered."""
+        with self._lock:
+            queued = list(self._queue)
+        delivered = 0
+        try:
+            for _, line in queued:
+                self._post(line)
+                delivered += 1
+        finally:
+            if delivered:
+                with self._lock:
+                    # Batches appended meanwhile stay behind the delivered
+                    # prefix; ones trimmed meanwhile are already gone
+                    sent_seqs = {seq for seq, _ in queued[:delivered]}
+                    while self._queue and self._queue[0][0] in sent_seqs:
+                        self._queue.popleft()
+                    self._write_outbox()
+                self.sent += delivered
+        return delivered
+
+    def _post(self, line: str) -> None:
+        if self._session is None:
+            self._session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=2)
+            self._session.mount("https://", adapter)
+            self._session.mount("http://", adapter)
+        body = gzip.compress(line.encode(), compresslevel=6)
+        headers = {"Content-Type": "application/json", "Content-Encoding": "gzip"}
+        if self.signer is not None:
+            headers["X-Validator-Hotkey"] = self.hotkey
+            headers["X-Validator-Signature"] = self.signer(body)
+        resp = self._session.post(self.url, data=body, headers=headers, timeout=self.timeout)
+        resp.raise_for_status()
@@ -0,0 +1,245 @@
+# Handshake58 Subnet 58 - Score History
+#
+# Append-only, fixed-record history of per-round rewards and EMA scores.
+# The file is a ring of `retention` slots behind a small header, mapped with
+# numpy.memmap so analysis tools can slice thousands of rounds without
+# parsing. A record only becomes visible once its sequence number and the
+# header count are written, so a crash mid-append never exposes a torn row.
+
+import hashlib
+import os
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+MAGIC = b"HS58HIST"
+FORMAT_VERSION = 1
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("max_uids", "<u4"),
+    ("capacity", "<u4"),
+    ("_pad", "<u4"),
+    ("count", "<u8"),
+])
+HEADER_SIZE = 64
+
+
+def record_dtype(max_uids: int) -> np.dtype:
+    return np.dtype([
+        ("seq", "<u8"),
+        ("step", "<u8"),
+        ("block", "<i8"),
+        ("timestamp", "<f8"),
+        ("n", "<u4"),
+        ("_pad", "<u4"),
+        ("rewards", "<f4", (max_uids,)),
+        ("scores", "<f4", (max_uids,)),
+        ("hotkey_hash", "<u8", (max_uids,)),
+    ])
+
+
+def hotkey_hashes(hotkeys: Sequence[str], max_uids: int) -> np.ndarray:
+    """Stable 64-bit digests of hotkeys, used to detect replaced UIDs on restore."""
+    out = np.zeros(max_uids, dtype=np.uint64)
+    for uid, hotkey in enumerate(hotkeys[:max_uids]):
+        digest = hashlib.blake2b(str(hotkey).encode(), digest_size=8).digest()
+        out[uid] = int.from_bytes(digest, "little")
+    return out
+
+
+class ScoreHistory:
+    """
+    Memory-mapped ring of per-round reward/score records.
+
+    Record seq k lives in slot k % capacity; the header count is the number
+    of committed records ever written. Once the ring is full the oldest
+    round is overwritten, which bounds the file at retention records.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_uids: int = 256,
+        retention: int = 2000,
+        readonly: bool = False,
+    ):
+        self.path = path
+        self.readonly = readonly
+
+        if readonly:
+            self._open(path, mode="r")
+            return
+
+        if os.path.exists(path):
+            self._open(path, mode="r+")
+            if self.max_uids != max_uids or self.capacity != retention:
+                self._migrate(max_uids, retention)
+        else:
+            self._create(path, max_uids, retention)
+            self._open(path, mode="r+")
+
+    # -- file management -------------------------------------------------
+
+    @staticmethod
+    def _create(path: str, max_uids: int, capacity: int) -> None:
+        rec = record_dtype(max_uids)
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["version"] = FORMAT_VERSION
+        header["max_uids"] = max_uids
+        header["capacity"] = capacity
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+            f.truncate(HEADER_SIZE + rec.itemsize * capacity)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _open(self, path: str, mode: str) -> None:
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode=mode, shape=(1,))
+        if bytes(self._header["magic"][0]) != MAGIC:
+            raise ValueError(f"{path} is not a score history file")
+        if int(self._header["version"][0]) != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported history version")
+        self.max_uids = int(self._header["max_uids"][0])
+        self.capacity = int(self._header["capacity"][0])
+        self.dtype = record_dtype(self.max_uids)
+        self._records = np.memmap(
+            path, dtype=self.dtype, mode=mode,
+            offset=HEADER_SIZE, shape=(self.capacity,),
+        )
+
+    def _migrate(self, max_uids: int, capacity: int) -> None:
+        """Rewrite the file for a new layout, keeping the newest records."""
+        old = self.read()
+        self.close()
+        tmp = self.path + ".migrate"
+        try:
+            self._create(tmp, max_uids, capacity)
+            self._open(tmp, mode="r+")
+            for rec in old[-capacity:]:
+                # Records are cut or zero-padded to the new max_uids
+                n = min(int(rec["n"]), max_uids)
+                hashes = np.zeros(max_uids, dtype=np.uint64)
+                keep = min(max_uids, len(rec["hotkey_hash"]))
+                hashes[:keep] = rec["hotkey_hash"][:keep]
+                self.append(
+                    step=int(rec["step"]),
+                    block=int(rec["block"]),
+                    rewards=rec["rewards"][:n],
+                    scores=rec["scores"][:n],
+                    timestamp=float(rec["timestamp"]),
+                    hashes=hashes,
+                )
+            self.close()
+            os.replace(tmp, self.path)
+        except Exception:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        finally:
+            self._open(self.path, mode="r+")
+
+    def flush(self) -> None:
+        if not self.readonly:
+            self._records.flush()
+            self._header.flush()
+
+    def close(self) -> None:
+        self.flush()
+        del self._records
+        del self._header
+
+    # -- writes ----------------------------------------------------------
+
+    @property
+    def count(self) -> int:
+        return int(self._header["count"][0])
+
+    def append(
+        self,
+        step: int,
+        block: int,
+        rewards: np.ndarray,
+        scores: np.ndarray,
+        hotkeys: Optional[Sequence[str]] = None,
+        timestamp: Optional[float] = None,
+        hashes: Optional[np.ndarray] = None,
+    ) -> int:
+        """Commit one round. Returns its sequence number."""
+        if self.readonly:
+            raise IOError("history opened read-only")
+
+        seq = self.count
+        slot = seq % self.capacity
+        n = min(len(scores), self.max_uids)
+
+        rec = self._records[slot]
+        # Invalidate the slot first so a crash leaves no stale-but-valid row
+        rec["seq"] = np.iinfo(np.uint64).max
+        self._records.flush()
+
+        rec["step"] = step
+        rec["block"] = block
+        rec["timestamp"] = time.time() if timestamp is None else timestamp
+        rec["n"] = n
+        rec["rewards"][:] = 0
+        rec["rewards"][: min(len(rewards), n)] = rewards[:n]
+        rec["scores"][:] = 0
+        rec["scores"][:n] = scores[:n]
+        if hashes is None:
+            hashes = hotkey_hashes(hotkeys or [], self.max_uids)
+        rec["hotkey_hash"][:] = hashes
+        self._records.flush()
+
+        # Commit: the seq marker and header count make the record visible
+        rec["seq"] = seq
+        self._records.flush()
+        self._header["count"] = seq + 1
+        self._header.flush()
+        return seq
+
+    # -- reads -----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def read(self, last_n: Optional[int] = None) -> np.ndarray:
+        """Committed records, oldest first (a copy, safe to keep)."""
+        count = self.count
+        size = len(self)
+        if last_n is not None:
+            size = min(size, last_n)
+        if size == 0:
+            return np.zeros(0, dtype=self.dtype)
+        seqs = np.arange(count - size, count, dtype=np.uint64)
+        out = self._records[seqs % self.capacity].copy()
+        return out[out["seq"] == seqs]
+
+    def last(self) -> Optional[np.void]:
+        recs = self.read(last_n=1)
+        return recs[0] if len(recs) else None
+
+    def matrix(self, field: str, last_n: Optional[int] = None) -> np.ndarray:
+        """(rounds x max_uids) view of 'rewards' or 'scores' for analysis."""
+        return self.read(last_n)[field]
+
+    def restore_scores(self, hotkeys: List[str]) -> Optional[np.ndarray]:
+        """
+        Scores from the newest record, realigned to the current hotkeys.
+        UIDs whose hotkey changed since that record start from zero.
+        """
+        rec = self.last()
+        if rec is None:
+            return None
+        n = len(hotkeys)
+        scores = np.zeros(n, dtype=np.float32)
+        copy_len = min(n, int(rec["n"]))
+        scores[:copy_len] = rec["scores"][:copy_len]
+        same = hotkey_hashes(hotkeys, self.max_uids)[:copy_len] == rec["hotkey_hash"][:copy_len]
+        scores[:copy_len][~same] = 0
+        return scores
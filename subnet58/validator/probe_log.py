@@ -0,0 +1,213 @@
+# Handshake58 Subnet 58 - Probe Log
+#
+# Local SQLite log of everything the validator learns per probe: each
+# miner's reachable/status/latency answer and the consensus for the target.
+# Rounds are queued and written in one transaction by a background thread,
+# so logging never blocks the validation loop. Small query helpers expose
+# provider uptime and latency percentiles over a time window.
+
+import atexit
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import bittensor as bt
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS probes (
+    ts REAL NOT NULL,
+    step INTEGER NOT NULL,
+    provider_id TEXT NOT NULL,
+    uid INTEGER NOT NULL,
+    reachable INTEGER,
+    status INTEGER,
+    latency_ms INTEGER
+);
+CREATE TABLE IF NOT EXISTS consensus (
+    ts REAL NOT NULL,
+    step INTEGER NOT NULL,
+    provider_id TEXT NOT NULL,
+    probe_url TEXT NOT NULL,
+    reachable INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    median_latency_ms INTEGER NOT NULL,
+    responders INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_probes_provider ON probes (provider_id, ts);
+CREATE INDEX IF NOT EXISTS idx_probes_uid ON probes (uid, ts);
+CREATE INDEX IF NOT EXISTS idx_consensus_provider ON consensus (provider_id, ts);
+"""
+
+# (uid, reachable, status, latency_ms) — None where the miner did not answer
+MinerAnswer = Tuple[int, Optional[bool], Optional[int], Optional[int]]
+
+
+class TargetResult:
+    """Everything observed for one probed target in a round."""
+
+    __slots__ = ("provider_id", "probe_url", "consensus", "answers", "ts")
+
+    def __init__(self, provider_id: str, probe_url: str, consensus, answers: List[MinerAnswer]):
+        self.provider_id = provider_id
+        self.probe_url = probe_url
+        self.consensus = consensus
+        self.answers = answers
+        self.ts = time.time()
+
+
+class ProbeLog:
+    """
+    Asynchronous, batched probe-result store.
+
+    log_round() only enqueues; a daemon thread owns the write connection
+    and commits each round as one transaction. Reads use their own
+    connection (WAL mode), so queries never wait on the writer.
+    """
+
+    def __init__(self, path: str, retention_days: float = 14.0, max_pending: int = 64):
+        self.path = path
+        self.retention_s = retention_days * 86400
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        self._closed = False
+        self.dropped_rounds = 0
+
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+        conn.close()
+
+        self._thread = threading.Thread(target=self._writer, name="probe-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # -- writes ----------------------------------------------------------
+
+    def log_round(self, step: int, results: Sequence[TargetResult]) -> None:
+        """Queue one round for writing. Never blocks; drops if the writer lags."""
+        if self._closed or not results:
+            return
+        try:
+            self._queue.put_nowait((step, list(results)))
+        except queue.Full:
+            self.dropped_rounds += 1
+            bt.logging.warning("[ProbeLog] Writer backlog full, dropping round")
+
+    def _writer(self) -> None:
+        conn = self._connect()
+        last_prune = 0.0
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            step, results = item
+            try:
+                self._write_round(conn, step, results)
+                if time.time() - last_prune > 3600:
+                    self._prune(conn)
+                    last_prune = time.time()
+            except Exception as e:
+                bt.logging.warning(f"[ProbeLog] Write failed: {e}")
+        conn.close()
+
+    @staticmethod
+    def _write_round(conn: sqlite3.Connection, step: int, results: Sequence[TargetResult]) -> None:
+        probe_rows = []
+        consensus_rows = []
+        for r in results:
+            for uid, reachable, status, latency in r.answers:
+                probe_rows.append((
+                    r.ts, step, r.provider_id, uid,
+                    None if reachable is None else int(reachable),
+                    status, latency,
+                ))
+            if r.consensus is not None:
+                responders = sum(1 for a in r.answers if a[1] is not None)
+                consensus_rows.append((
+                    r.ts, step, r.provider_id, r.probe_url,
+                    int(r.consensus.reachable), int(r.consensus.status or 0),
+                    int(r.consensus.median_latency_ms), responders,
+                ))
+        with conn:
+            conn.executemany("INSERT INTO probes VALUES (?, ?, ?, ?, ?, ?, ?)", probe_rows)
+            conn.executemany("INSERT INTO consensus VALUES (?, ?, ?, ?, ?, ?, ?, ?)", consensus_rows)
+
+    def _prune(self, conn: sqlite3.Connection) -> None:
+        cutoff = time.time() - self.retention_s
+        with conn:
+            conn.execute("DELETE FROM probes WHERE ts < ?", (cutoff,))
+            conn.execute("DELETE FROM consensus WHERE ts < ?", (cutoff,))
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Flush queued rounds and stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # -- queries ---------------------------------------------------------
+
+    def _query(self, sql: str, args: tuple) -> List[tuple]:
+        conn = self._connect()
+        try:
+            return conn.execute(sql, args).fetchall()
+        finally:
+            conn.close()
+
+    def provider_uptime(self, provider_id: str, window_s: float = 86400) -> Dict:
+        """Fraction of rounds in the window where consensus said reachable."""
+        rows = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(reachable), 0) FROM consensus "
+            "WHERE provider_id = ? AND ts >= ?",
+            (provider_id, time.time() - window_s),
+        )
+        total, up = rows[0]
+        return {
+            "provider_id": provider_id,
+            "probes": total,
+            "uptime": (up / total) if total else None,
+        }
+
+    def uptime_table(self, window_s: float = 86400) -> List[Dict]:
+        """Uptime for every provider probed within the window."""
+        rows = self._query(
+            "SELECT provider_id, COUNT(*), SUM(reachable) FROM consensus "
+            "WHERE ts >= ? GROUP BY provider_id ORDER BY provider_id",
+            (time.time() - window_s,),
+        )
+        return [
+            {"provider_id": pid, "probes": total, "uptime": up / total}
+            for pid, total, up in rows
+        ]
+
+    def latency_percentiles(
+        self,
+        provider_id: Optional[str] = None,
+        uid: Optional[int] = None,
+        window_s: float = 86400,
+        percentiles: Sequence[float] = (50, 95, 99),
+    ) -> Dict:
+        """Latency percentiles of reachable answers, filtered by provider and/or miner."""
+        sql = "SELECT latency_ms FROM probes WHERE ts >= ? AND reachable = 1 AND latency_ms > 0"
+        args: list = [time.time() - window_s]
+        if provider_id is not None:
+            sql += " AND provider_id = ?"
+            args.append(provider_id)
+        if uid is not None:
+            sql += " AND uid = ?"
+            args.append(uid)
+
+        samples = np.fromiter((r[0] for r in self._query(sql, tuple(args))), dtype=np.float64)
+        result = {"samples": int(samples.size)}
+        for p in percentiles:
+            result[f"p{p:g}"] = float(np.percentile(samples, p)) if samples.size else None
+        return result
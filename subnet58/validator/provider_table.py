@@ -0,0 +1,167 @@
+# Handshake58 Subnet 58 - Provider Table
+#
+# The registry's providers keyed by id, each with a stable integer index
+# for as long as it stays registered (freed indices are reused). Fields are
+# held as columns: url, name and a protocol code into a small vocabulary.
+# Registry fetches are applied as deltas (added / removed / changed ids),
+# either computed from a full listing or taken directly from a registry
+# that answers ?since=<version> with only what changed, so the per-round
+# cost follows the number of changes rather than the registry size.
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class ProviderDelta:
+    added: List[int] = field(default_factory=list)
+    removed: List[int] = field(default_factory=list)
+    changed: List[int] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def __str__(self) -> str:
+        return f"+{len(self.added)} -{len(self.removed)} ~{len(self.changed)}"
+
+
+def parse_provider(p: Dict) -> Optional[Tuple[str, str, str, str]]:
+    """(id, probeUrl, name, protocol) from a registry entry, None without a URL."""
+    probe_url = p.get("probeUrl") or p.get("apiUrl", "")
+    if not probe_url:
+        return None
+    return p.get("id", ""), probe_url, p.get("name", "unknown"), p.get("protocol", "drain")
+
+
+class ProviderTable:
+    """
+    Registered providers with stable indices and columnar fields.
+
+    apply() takes a full registry listing, apply_delta() a registry delta;
+    both return what changed. providers() returns the rows as the dicts
+    the rest of the validator uses, rebuilt only after a change.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.index: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.urls: List[str] = []
+        self.names: List[str] = []
+        self.protocol_names: List[str] = []
+        self._protocol_codes: Dict[str, int] = {}
+        self.protocols = np.zeros(capacity, dtype=np.uint16)
+        self.active = np.zeros(capacity, dtype=bool)
+        self._free: List[int] = []
+        self.version: Optional[str] = None
+        self._rows: Dict[int, Dict] = {}
+        self._list: Optional[List[Dict]] = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @staticmethod
+    def key(provider_id: str, probe_url: str) -> str:
+        return provider_id or probe_url
+
+    def _protocol_code(self, protocol: str) -> int:
+        code = self._protocol_codes.get(protocol)
+        if code is None:
+            code = len(self.protocol_names)
+            self._protocol_codes[protocol] = code
+            self.protocol_names.append(protocol)
+        return code
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        idx = len(self.ids)
+        if idx == len(self.active):
+            capacity = max(2 * idx, 16)
+            self.active = np.concatenate([self.active, np.zeros(capacity - idx, dtype=bool)])
+            self.protocols = np.concatenate([self.protocols, np.zeros(capacity - idx, dtype=np.uint16)])
+        self.ids.append("")
+        self.urls.append("")
+        self.names.append("")
+        return idx
+
+    def _upsert(self, entry: Tuple[str, str, str, str], delta: ProviderDelta) -> str:
+        provider_id, url, name, protocol = entry
+        key = self.key(provider_id, url)
+        code = self._protocol_code(protocol)
+        idx = self.index.get(key)
+        if idx is None:
+            idx = self._allocate()
+            self.index[key] = idx
+            self.active[idx] = True
+            delta.added.append(idx)
+        elif (self.urls[idx], self.names[idx], int(self.protocols[idx])) == (url, name, code):
+            return key
+        else:
+            delta.changed.append(idx)
+        self.ids[idx] = provider_id
+        self.urls[idx] = url
+        self.names[idx] = name
+        self.protocols[idx] = code
+        self._rows.pop(idx, None)
+        return key
+
+    def _remove(self, key: str, delta: ProviderDelta) -> None:
+        idx = self.index.pop(key, None)
+        if idx is None:
+            return
+        self.active[idx] = False
+        self.ids[idx] = self.urls[idx] = self.names[idx] = ""
+        self._rows.pop(idx, None)
+        self._free.append(idx)
+        delta.removed.append(idx)
+
+    def _commit(self, delta: ProviderDelta, version: Optional[str]) -> ProviderDelta:
+        self.version = version
+        if delta:
+            self._list = None
+        return delta
+
+    def apply(self, providers: Iterable[Dict], version: Optional[str] = None) -> ProviderDelta:
+        """Replace the table's contents with a full registry listing."""
+        delta = ProviderDelta()
+        seen = set()
+        for p in providers:
+            entry = parse_provider(p)
+            if entry is not None:
+                seen.add(self._upsert(entry, delta))
+        for key in [k for k in self.index if k not in seen]:
+            self._remove(key, delta)
+        return self._commit(delta, version)
+
+    def apply_delta(
+        self, upserts: Iterable[Dict], removed: Iterable[str], version: Optional[str] = None,
+    ) -> ProviderDelta:
+        """Apply a registry delta: added/changed entries and removed ids."""
+        delta = ProviderDelta()
+        for p in upserts:
+            entry = parse_provider(p)
+            if entry is not None:
+                self._upsert(entry, delta)
+        for key in removed:
+            self._remove(key, delta)
+        return self._commit(delta, version)
+
+    def row(self, idx: int) -> Dict:
+        row = self._rows.get(idx)
+        if row is None:
+            row = self._rows[idx] = {
+                "id": self.ids[idx],
+                "probeUrl": self.urls[idx],
+                "name": self.names[idx],
+                "protocol": self.protocol_names[int(self.protocols[idx])],
+                "index": idx,
+            }
+        return row
+
+    def providers(self) -> List[Dict]:
+        """Active providers in index order (cached until the next change)."""
+        if self._list is None:
+            self._list = [self.row(int(idx)) for idx in np.flatnonzero(self.active)]
+        return self._list
@@ -0,0 +1,296 @@
+# Handshake58 Subnet 58 - Round Record & Replay
+#
+# RoundRecorder dumps the raw material of each validation round (targets,
+# every miner's answer, dendrite timings, the spot check used) as
+# gzip-compressed JSONL, one line per round. The replay entry point re-runs
+# the validator's scoring offline over those files: consensus, spot-check
+# anchoring, accuracy, collusion penalties, the EMA update and the uint16
+# weight quantization. Scoring can be benchmarked and MAX_LATENCY_DEVIATION
+# / alpha tuned without a live subnet:
+#
+#   python -m subnet58.validator.replay rounds/*.jsonl.gz --alpha 0.1 --repeat 10
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from subnet58.config import (
+    COLLUSION_MODE,
+    COLLUSION_WINDOW,
+    HISTORY_MAX_UIDS,
+    MAX_LATENCY_DEVIATION,
+    WEIGHTS_TOP_K,
+)
+from subnet58.probe import ProbeResult
+from subnet58.validator.collusion import CollusionDetector
+from subnet58.validator.reward import (
+    Answer,
+    ProbeAnswers,
+    accuracy_from_answers,
+    consensus_from_answers,
+    scatter_rewards,
+    ema_update,
+    quantize_weights,
+)
+from subnet58.validator.spot_check import SpotChecker
+
+
+RecordedResponse = Answer
+
+
+class RoundRecorder:
+    """Appends one JSON line per round to a daily gzip file in `directory`."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._round: Optional[Dict] = None
+
+    def begin_round(self, step: int, block: int, uids: List[int]) -> None:
+        self._round = {
+            "step": step,
+            "block": block,
+            "ts": round(time.time(), 3),
+            "uids": uids,
+            "targets": [],
+        }
+
+    def add_target(self, target: Dict, responses, query_s: float, answers=None, spot=None) -> None:
+        """
+        Record one target's fan-out; responses are aligned with the round's
+        uids. answers (decoded Answer records) take precedence over the
+        responses' own probe fields when given. spot is the finished spot
+        check the consensus was anchored to, if any.
+        """
+        if self._round is None:
+            return
+        reachable, status, latency, rtt_ms = [], [], [], []
+        for i, response in enumerate(responses):
+            r = answers[i] if answers is not None else response
+            if r is None:
+                reachable.append(None)
+                status.append(None)
+                latency.append(None)
+            else:
+                reachable.append(None if r.probe_reachable is None else int(r.probe_reachable))
+                status.append(r.probe_status)
+                latency.append(r.probe_latency_ms)
+            process_time = getattr(getattr(response, "dendrite", None), "process_time", None)
+            rtt_ms.append(None if process_time is None else int(float(process_time) * 1000))
+        self._round["targets"].append({
+            "id": target.get("id", ""),
+            "name": target.get("name", ""),
+            "protocol": target.get("protocol", ""),
+            "probeUrl": target.get("probeUrl", ""),
+            "query_ms": int(query_s * 1000),
+            "reachable": reachable,
+            "status": status,
+            "latency": latency,
+            "rtt_ms": rtt_ms,
+            "spot": None if spot is None else [
+                int(spot.probe_reachable), spot.probe_status, spot.probe_latency_ms,
+            ],
+        })
+
+    def end_round(self) -> None:
+        if self._round is None:
+            return
+        day = time.strftime("%Y%m%d", time.gmtime(self._round["ts"]))
+        path = os.path.join(self.directory, f"rounds-{day}.jsonl.gz")
+        line = json.dumps(self._round, separators=(",", ":")) + "\n"
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            f.write(line)
+        self._round = None
+
+
+def iter_rounds(paths: Iterable[str]) -> Iterator[Dict]:
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _responses(target: Dict) -> List[RecordedResponse]:
+    return [
+        RecordedResponse(None if r is None else bool(r), s, l)
+        for r, s, l in zip(target["reachable"], target["status"], target["latency"])
+    ]
+
+
+def _spot(target: Dict) -> Optional[ProbeResult]:
+    spot = target.get("spot")
+    return None if spot is None else ProbeResult(bool(spot[0]), spot[1], spot[2])
+
+
+class ReplayReport(NamedTuple):
+    rounds: int
+    probes: int
+    consensus_s: float
+    accuracy_s: float
+    collusion_s: float
+    ema_s: float
+    scores: np.ndarray
+    # What set_weights would submit for the final scores
+    weight_uids: np.ndarray
+    weights: np.ndarray
+    spot_checks: int = 0
+    flagged: int = 0
+
+    @property
+    def total_s(self) -> float:
+        return self.consensus_s + self.accuracy_s + self.collusion_s + self.ema_s
+
+
+def replay(
+    rounds: List[Dict],
+    alpha: float = 0.1,
+    max_latency_deviation: float = MAX_LATENCY_DEVIATION,
+    repeat: int = 1,
+    collusion_mode: str = COLLUSION_MODE,
+    top_k: int = WEIGHTS_TOP_K,
+) -> ReplayReport:
+    """
+    Run the validator's scoring pipeline over recorded rounds: consensus,
+    spot-check anchoring (where the recording has it), accuracy, collusion
+    penalties (collusion_mode "penalize"), EMA and weight quantization.
+    """
+    # Decode once into the validator's columnar answers so the timed loop
+    # measures scoring, not JSON parsing
+    decoded = [
+        (rnd["uids"], [(ProbeAnswers.from_responses(_responses(t)), _spot(t)) for t in rnd["targets"]])
+        for rnd in rounds
+    ]
+    n = max((max(uids) + 1 for uids, _ in decoded if uids), default=0)
+    scores = np.zeros(n, dtype=np.float32)
+    consensus_s = accuracy_s = collusion_s = ema_s = 0.0
+    n_rounds = n_probes = n_spot = 0
+    anchor = SpotChecker().anchor
+    collusion = None
+    if collusion_mode in ("log", "penalize"):
+        collusion = CollusionDetector(max_uids=HISTORY_MAX_UIDS, window=COLLUSION_WINDOW)
+    report = None
+
+    for _ in range(repeat):
+        for uids, targets in decoded:
+            accuracy_sums = np.zeros(len(uids), dtype=np.float32)
+            probe_count = 0
+            for answers, spot in targets:
+                t0 = time.perf_counter()
+                consensus = consensus_from_answers(answers)
+                records = None
+                if consensus is not None and (spot is not None or collusion is not None):
+                    records = answers.records()
+                    if spot is not None:
+                        consensus, _ = anchor(consensus, records, spot)
+                        n_spot += 1
+                t1 = time.perf_counter()
+                consensus_s += t1 - t0
+                if consensus is None:
+                    continue
+                accuracy_sums += accuracy_from_answers(answers, consensus, max_latency_deviation)
+                t2 = time.perf_counter()
+                accuracy_s += t2 - t1
+                if collusion is not None:
+                    collusion.add_probe(uids, records, consensus)
+                    collusion_s += time.perf_counter() - t2
+                probe_count += 1
+
+            n_rounds += 1
+            n_probes += probe_count
+            if probe_count == 0:
+                continue
+            rewards = accuracy_sums / probe_count
+            if collusion is not None:
+                t0 = time.perf_counter()
+                report = collusion.analyze()
+                if collusion_mode == "penalize" and report.clusters:
+                    rewards = report.apply(rewards, uids, collusion.max_uids)
+                collusion_s += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            scattered = scatter_rewards(rewards, uids, n)
+            if scattered is not None:
+                scores = ema_update(scores, scattered, alpha)
+            ema_s += time.perf_counter() - t0
+
+    weight_uids, weights = quantize_weights(scores, top_k)
+    return ReplayReport(
+        n_rounds, n_probes, consensus_s, accuracy_s, collusion_s, ema_s, scores,
+        weight_uids, weights, n_spot, report.flagged if report is not None else 0,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded validation rounds offline.")
+    parser.add_argument("paths", nargs="+", help="Recorded .jsonl/.jsonl.gz files or globs")
+    parser.add_argument("--alpha", type=float, default=0.1, help="EMA alpha (neuron.moving_average_alpha)")
+    parser.add_argument("--max-latency-deviation", type=float, default=MAX_LATENCY_DEVIATION)
+    parser.add_argument(
+        "--collusion", choices=("off", "log", "penalize"), default=COLLUSION_MODE,
+        help="Copycat detection as COLLUSION_MODE (penalize splits cluster rewards)",
+    )
+    parser.add_argument("--top-k", type=int, default=WEIGHTS_TOP_K, help="WEIGHTS_TOP_K for the submitted weights")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the recording N times")
+    parser.add_argument("--top", type=int, default=10, help="Print the top-N weights")
+    parser.add_argument("--out", type=str, default=None, help="Save scores/weights to this .npz")
+    args = parser.parse_args(argv)
+
+    paths = sorted(p for pattern in args.paths for p in glob.glob(pattern))
+    t0 = time.perf_counter()
+    rounds = list(iter_rounds(paths))
+    load_s = time.perf_counter() - t0
+    if not rounds:
+        print("No recorded rounds found.")
+        return
+
+    report = replay(rounds, args.alpha, args.max_latency_deviation, args.repeat, args.collusion, args.top_k)
+    total = max(report.total_s, 1e-9)
+    print(f"Loaded {len(rounds)} rounds from {len(paths)} files in {load_s:.3f}s")
+    print(
+        f"Replayed {report.rounds} rounds / {report.probes} probes in {total:.3f}s "
+        f"({report.rounds / total:,.0f} rounds/s, {report.probes / total:,.0f} probes/s)"
+    )
+    print(
+        f"  consensus {report.consensus_s:.3f}s | accuracy {report.accuracy_s:.3f}s | "
+        f"collusion {report.collusion_s:.3f}s | ema {report.ema_s:.3f}s"
+    )
+    print(
+        f"  {report.spot_checks} spot-check anchors applied, "
+        f"{report.flagged} miners in copycat clusters at the end (collusion={args.collusion})"
+    )
+    unrecorded = sum(1 for rnd in rounds for t in rnd["targets"] if "spot" not in t)
+    if unrecorded:
+        print(f"  {unrecorded} targets were recorded without spot-check data; their consensus is unanchored")
+    print(
+        "  Not replayed: hotkey changes (score and collusion-history resets), "
+        "so a recording spanning re-registrations can differ from the chain"
+    )
+
+    weights = np.zeros(len(report.scores), dtype=np.uint16)
+    weights[report.weight_uids] = report.weights
+    share = weights / max(int(weights.sum()), 1)
+    order = np.argsort(-share, kind="stable")[: args.top]
+    print(
+        f"Top {len(order)} weights (alpha={args.alpha}, max_dev={args.max_latency_deviation:g}ms, "
+        f"top_k={args.top_k}, {len(report.weight_uids)} uids submitted):"
+    )
+    for uid in order:
+        print(
+            f"  uid {int(uid):>3}  weight {int(weights[uid]):>5} ({share[uid]:.5f})  "
+            f"score {report.scores[uid]:.5f}"
+        )
+
+    if args.out:
+        np.savez(args.out, scores=report.scores, uids=report.weight_uids, weights=report.weights)
+        print(f"Saved scores and weights to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# Handshake58 Subnet 58 - Reward
+#
+# Consensus and accuracy scoring shared by the live validator and the
+# offline replay tool. Responses only need probe_reachable, probe_status
+# and probe_latency_ms attributes, so recorded rounds score identically.
+
+from collections import Counter
+from dataclasses import dataclass
+from statistics import median
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from subnet58.config import MAX_LATENCY_DEVIATION
+from subnet58.utils.probe_codec import unpack_probes
+
+
+@dataclass
+class Consensus:
+    reachable: bool
+    status: int
+    median_latency_ms: int
+
+
+def compute_consensus(responses) -> Optional[Consensus]:
+    """Majority vote on reachable/status, median of positive latencies."""
+    valid = [
+        r for r in responses
+        if r is not None and r.probe_reachable is not None
+    ]
+    if not valid:
+        return None
+
+    reachable_votes = [r.probe_reachable for r in valid]
+    status_votes = [r.probe_status for r in valid]
+    latencies = [
+        r.probe_latency_ms for r in valid
+        if r.probe_latency_ms is not None and r.probe_latency_ms > 0
+    ]
+
+    return Consensus(
+        reachable=Counter(reachable_votes).most_common(1)[0][0],
+        status=Counter(status_votes).most_common(1)[0][0],
+        median_latency_ms=int(median(latencies)) if latencies else 0,
+    )
+
+
+class Answer(NamedTuple):
+    probe_reachable: Optional[bool]
+    probe_status: Optional[int]
+    probe_latency_ms: Optional[int]
+
+
+@dataclass
+class ProbeAnswers:
+    """
+    One target's miner answers as columns, aligned with the queried uids.
+
+    reachable is -1 where the miner gave no answer, status is -1 where it
+    is missing and latency 0. Built straight from packed responses when the
+    miners used the compact encoding.
+    """
+
+    reachable: np.ndarray  # int8
+    status: np.ndarray  # int32
+    latency: np.ndarray  # int64
+
+    def __len__(self) -> int:
+        return len(self.reachable)
+
+    @classmethod
+    def from_responses(cls, responses) -> "ProbeAnswers":
+        n = len(responses)
+        reachable = np.full(n, -1, dtype=np.int8)
+        status = np.full(n, -1, dtype=np.int32)
+        latency = np.zeros(n, dtype=np.int64)
+
+        # Packed answers (miners asked for the compact encoding) decode as a batch
+        rest = range(n)
+        packed = [getattr(r, "probe_packed", None) for r in responses]
+        if any(packed):
+            records = unpack_probes(packed)
+            use = (records["flags"] & 1).astype(bool)
+            reachable[use] = (records["flags"][use] >> 1) & 1
+            status[use] = records["status"][use]
+            latency[use] = records["latency"][use]
+            rest = np.flatnonzero(~use).tolist()
+
+        # Plain-field answers: one attribute pass, then numpy turns the Nones
+        # into NaN and the rest is array ops
+        idx = [i for i in rest if responses[i] is not None]
+        if idx:
+            plain = np.array(
+                [(r.probe_reachable, r.probe_status, r.probe_latency_ms) for r in map(responses.__getitem__, idx)],
+                dtype=np.float64,
+            )
+            answered = ~np.isnan(plain[:, 0])
+            at = np.asarray(idx)[answered]
+            plain = plain[answered]
+            reachable[at] = plain[:, 0] != 0
+            status[at] = np.where(np.isnan(plain[:, 1]), -1, plain[:, 1])
+            latency[at] = np.nan_to_num(plain[:, 2])
+        return cls(reachable, status, latency)
+
+    def records(self) -> List[Optional[Answer]]:
+        """Per-miner Answer tuples (None where unanswered) for per-response consumers."""
+        return [
+            None if r < 0 else Answer(bool(r), None if s < 0 else s, l)
+            for r, s, l in zip(self.reachable.tolist(), self.status.tolist(), self.latency.tolist())
+        ]
+
+
+def _first_mode(values: np.ndarray):
+    """Most common value; ties go to the value seen first (as Counter.most_common)."""
+    uniq, first, counts = np.unique(values, return_index=True, return_counts=True)
+    tied = counts == counts.max()
+    return uniq[tied][np.argmin(first[tied])]
+
+
+def consensus_from_answers(answers: ProbeAnswers) -> Optional[Consensus]:
+    """Vectorized compute_consensus over columnar answers (same result)."""
+    valid = answers.reachable >= 0
+    if not valid.any():
+        return None
+    status = int(_first_mode(answers.status[valid]))
+    latencies = answers.latency[valid]
+    latencies = latencies[latencies > 0]
+    return Consensus(
+        reachable=bool(_first_mode(answers.reachable[valid])),
+        status=None if status < 0 else status,
+        median_latency_ms=int(np.median(latencies)) if latencies.size else 0,
+    )
+
+
+def accuracy_from_answers(
+    answers: ProbeAnswers,
+    consensus: Consensus,
+    max_latency_deviation: float = MAX_LATENCY_DEVIATION,
+) -> np.ndarray:
+    """Vectorized probe_accuracy for every miner (0 where unanswered)."""
+    valid = answers.reachable >= 0
+    reachable_match = (answers.reachable == int(consensus.reachable)).astype(np.float64)
+    consensus_status = -1 if consensus.status is None else consensus.status
+    status_match = (answers.status == consensus_status).astype(np.float64)
+
+    median = consensus.median_latency_ms
+    if median > 0:
+        deviation = np.abs(answers.latency - median)
+        latency_score = np.where(
+            answers.latency > 0,
+            np.maximum(0.0, 1.0 - deviation / max_latency_deviation),
+            reachable_match,
+        )
+    else:
+        latency_score = reachable_match
+
+    scores = 0.4 * reachable_match + 0.3 * status_match + 0.3 * latency_score
+    return np.where(valid, scores, 0.0).astype(np.float32)
+
+
+def probe_accuracy(
+    response,
+    consensus: Consensus,
+    max_latency_deviation: float = MAX_LATENCY_DEVIATION,
+) -> float:
+    """
+    Score a single miner response against consensus.
+
+    Weights: 40% reachable match, 30% status match, 30% latency closeness.
+    """
+    if response is None or response.probe_reachable is None:
+        return 0.0
+
+    reachable_match = float(response.probe_reachable == consensus.reachable)
+    status_match = float(response.probe_status == consensus.status)
+
+    lat = response.probe_latency_ms or 0
+    if consensus.median_latency_ms > 0 and lat > 0:
+        deviation = abs(lat - consensus.median_latency_ms)
+        latency_score = max(0.0, 1.0 - deviation / max_latency_deviation)
+    else:
+        latency_score = reachable_match
+
+    return 0.4 * reachable_match + 0.3 * status_match + 0.3 * latency_score
+
+
+def scatter_rewards(
+    rewards: np.ndarray,
+    uids: Sequence[int],
+    n: int,
+) -> Optional[np.ndarray]:
+    """Place per-UID rewards into a length-n vector (None if there are none)."""
+    if np.isnan(rewards).any():
+        rewards = np.nan_to_num(rewards, nan=0)
+
+    rewards = np.asarray(rewards)
+    uids_array = np.array(uids) if not isinstance(uids, np.ndarray) else uids.copy()
+
+    if rewards.size == 0 or uids_array.size == 0:
+        return None
+
+    scattered_rewards = np.zeros(n, dtype=np.float32)
+    scattered_rewards[uids_array] = rewards
+    return scattered_rewards
+
+
+def ema_update(scores: np.ndarray, scattered_rewards: np.ndarray, alpha: float) -> np.ndarray:
+    """Exponential moving average on scores."""
+    return alpha * scattered_rewards + (1 - alpha) * scores
+
+
+U16_MAX = 65535
+
+
+def quantize_weights(scores: np.ndarray, top_k: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sparse uint16 weights from scores: (uids, weights).
+
+    Keeps the top_k highest nonzero scores (all nonzero when top_k <= 0),
+    and converts them the way the chain client does: L1-normalize in
+    float32, scale so the largest is U16_MAX, round half to even and drop
+    uids that round to 0. With top_k <= 0 the result equals
+    convert_weights_and_uids_for_emit on the normalized scores, and the
+    client's conversion leaves it unchanged.
+    """
+    scores = np.nan_to_num(np.asarray(scores, dtype=np.float32), nan=0.0)
+    nonzero = np.flatnonzero(scores > 0)
+    if top_k > 0 and len(nonzero) > top_k:
+        # Stable sort: ties at the cut go to the lower uid
+        order = np.argsort(-scores[nonzero], kind="stable")
+        nonzero = np.sort(nonzero[order[:top_k]])
+    if len(nonzero) == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint16)
+
+    kept = (scores / np.sum(scores))[nonzero].astype(np.float64)
+    weights = np.round(kept / kept.max() * U16_MAX)
+    keep = weights > 0
+    return nonzero[keep].astype(np.int64), weights[keep].astype(np.uint16)
@@ -0,0 +1,190 @@
+# Handshake58 Subnet 58 - Target Sampler
+#
+# Chooses which providers to probe each round. Per-provider state lives in
+# flat arrays (one row per provider id): when it was last probed, an EMA of
+# how many miners disagreed with consensus, and an EMA of how often the
+# consensus itself flipped. A probe where every miner agrees scores all
+# miners the same and adds no discrimination, so targets are drawn with
+# weight floor + staleness + disagreement + flip, using Efraimidis-Spirakis
+# keys (u ** (1 / w)) for weighted sampling without replacement.
+
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from subnet58.config import TEMPO
+
+# Prior for providers never probed: treat them as maximally informative
+UNKNOWN_PRIOR = 0.5
+# Disagreement fraction that counts as fully informative
+DISAGREEMENT_SCALE = 0.25
+SECONDS_PER_ROUND = TEMPO * 12
+
+
+def provider_key(provider: Dict) -> str:
+    return provider.get("id") or provider.get("probeUrl", "")
+
+
+class TargetSampler:
+    """
+    Weighted provider selection with persistent per-provider statistics.
+
+    sample() picks the targets for a round; update() records what a probe
+    showed. State is saved to / loaded from a small .npz file.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        floor: float = 0.05,
+        capacity: int = 256,
+        seed: Optional[int] = None,
+    ):
+        self.alpha = alpha
+        self.floor = floor
+        self.rng = np.random.default_rng(seed)
+        self._reset(capacity)
+
+    def _reset(self, capacity: int) -> None:
+        self.index: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.last_probed = np.zeros(capacity, dtype=np.float64)  # 0 = never
+        self.disagreement = np.full(capacity, UNKNOWN_PRIOR, dtype=np.float32)
+        self.flip = np.full(capacity, UNKNOWN_PRIOR, dtype=np.float32)
+        self.last_reachable = np.full(capacity, -1, dtype=np.int8)  # -1 = unknown
+        self.last_status = np.zeros(capacity, dtype=np.int32)
+        self.probes = np.zeros(capacity, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _row(self, key: str) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.last_probed):
+                self._grow(max(2 * row, 16))
+            self.index[key] = row
+            self.keys.append(key)
+        return row
+
+    def _grow(self, capacity: int) -> None:
+        def pad(arr: np.ndarray, fill) -> np.ndarray:
+            out = np.full(capacity, fill, dtype=arr.dtype)
+            out[: len(arr)] = arr
+            return out
+
+        self.last_probed = pad(self.last_probed, 0)
+        self.disagreement = pad(self.disagreement, UNKNOWN_PRIOR)
+        self.flip = pad(self.flip, UNKNOWN_PRIOR)
+        self.last_reachable = pad(self.last_reachable, -1)
+        self.last_status = pad(self.last_status, 0)
+        self.probes = pad(self.probes, 0)
+
+    def weights(self, rows: np.ndarray, k: int, now: Optional[float] = None) -> np.ndarray:
+        """Information weight of each row when k of len(rows) are probed per round."""
+        now = time.time() if now is None else now
+        # A uniform sampler revisits each provider every len(rows)/k rounds
+        interval = max(1.0, len(rows) / max(k, 1)) * SECONDS_PER_ROUND
+        last = self.last_probed[rows]
+        staleness = np.where(last > 0, np.minimum((now - last) / interval, 2.0) / 2.0, 1.0)
+        disagreement = np.minimum(self.disagreement[rows] / DISAGREEMENT_SCALE, 1.0)
+        return self.floor + staleness + disagreement + self.flip[rows]
+
+    def sample(self, providers: Sequence[Dict], k: int, now: Optional[float] = None) -> List[Dict]:
+        """Pick k providers, weighted towards stale, contested and flapping ones."""
+        if k >= len(providers):
+            return list(providers)
+        if len(self.keys) > 2 * len(providers):
+            self.prune(provider_key(p) for p in providers)
+        rows = np.fromiter((self._row(provider_key(p)) for p in providers), dtype=np.int64, count=len(providers))
+        w = self.weights(rows, k, now)
+        # Efraimidis-Spirakis: top-k of log(u) / w == top-k of u ** (1 / w)
+        keys = np.log(self.rng.random(len(rows))) / w
+        chosen = np.argpartition(-keys, k - 1)[:k]
+        return [providers[i] for i in chosen[np.argsort(-keys[chosen])]]
+
+    def update(self, provider: Dict, consensus, responses, now: Optional[float] = None) -> None:
+        """Record one probe's outcome for provider."""
+        row = self._row(provider_key(provider))
+        self.last_probed[row] = time.time() if now is None else now
+        if consensus is None:
+            return
+
+        answers = [r for r in responses if r is not None and r.probe_reachable is not None]
+        disagree = sum(
+            1 for r in answers
+            if r.probe_reachable != consensus.reachable or r.probe_status != consensus.status
+        )
+        fraction = disagree / len(answers) if answers else 0.0
+
+        reachable = int(bool(consensus.reachable))
+        status = int(consensus.status or 0)
+        if self.probes[row] == 0:
+            self.disagreement[row] = fraction
+            self.flip[row] = 0.0
+        else:
+            flipped = float(
+                reachable != self.last_reachable[row] or status != self.last_status[row]
+            )
+            self.disagreement[row] += self.alpha * (fraction - self.disagreement[row])
+            self.flip[row] += self.alpha * (flipped - self.flip[row])
+        self.last_reachable[row] = reachable
+        self.last_status[row] = status
+        self.probes[row] += 1
+
+    def prune(self, active_keys) -> None:
+        """Drop rows for providers no longer in the registry."""
+        active = set(active_keys)
+        keep = [row for row, key in enumerate(self.keys) if key in active]
+        self.keys = [self.keys[row] for row in keep]
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        idx = np.asarray(keep, dtype=np.int64)
+        capacity = len(self.last_probed)
+        for name, fill in (
+            ("last_probed", 0), ("disagreement", UNKNOWN_PRIOR), ("flip", UNKNOWN_PRIOR),
+            ("last_reachable", -1), ("last_status", 0), ("probes", 0),
+        ):
+            arr = getattr(self, name)
+            out = np.full(capacity, fill, dtype=arr.dtype)
+            out[: len(idx)] = arr[idx]
+            setattr(self, name, out)
+
+    def stats(self) -> Dict:
+        n = len(self.keys)
+        probed = self.probes[:n] > 0
+        return {
+            "providers": n,
+            "probed": int(probed.sum()),
+            "mean_disagreement": float(self.disagreement[:n][probed].mean()) if probed.any() else 0.0,
+            "mean_flip": float(self.flip[:n][probed].mean()) if probed.any() else 0.0,
+        }
+
+    def save(self, path: str) -> None:
+        n = len(self.keys)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                keys=np.array(self.keys, dtype=str),
+                last_probed=self.last_probed[:n],
+                disagreement=self.disagreement[:n],
+                flip=self.flip[:n],
+                last_reachable=self.last_reachable[:n],
+                last_status=self.last_status[:n],
+                probes=self.probes[:n],
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def load(self, path: str) -> None:
+        with np.load(path, allow_pickle=False) as data:
+            keys = [str(k) for k in data["keys"]]
+            self._reset(max(len(self.last_probed), 2 * len(keys)))
+            for name in ("last_probed", "disagreement", "flip", "last_reachable", "last_status", "probes"):
+                getattr(self, name)[: len(keys)] = data[name]
+        self.keys = keys
+        self.index = {key: i for i, key in enumerate(keys)}
@@ -0,0 +1,102 @@
+# Handshake58 Subnet 58 - Probe Scheduler
+#
+# Spreads a validator's probing across the epoch instead of one burst at
+# the epoch boundary. The epoch (minus a finalize margin) is cut into equal
+# slots, one micro-batch per slot, each at a jittered block offset within
+# its slot. Offsets are seeded by hotkey and epoch, so validators are
+# desynchronized from each other but a restarted validator keeps its plan.
+# Rewards accumulate across batches in a RoundAccumulator; the round is
+# finalized (scores, weights, state) after the last batch, near epoch end.
+
+import random
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+from subnet58.config import TEMPO
+
+
+class ProbeScheduler:
+    """Block offsets within an epoch at which probe batches are due."""
+
+    def __init__(
+        self,
+        batches: int = 1,
+        tempo: int = TEMPO,
+        finalize_margin: int = 10,
+        jitter: float = 0.8,
+        seed_key: str = "",
+    ):
+        self.batches = max(1, batches)
+        self.tempo = tempo
+        self.finalize_offset = max(0, tempo - finalize_margin)
+        self.jitter = jitter
+        self.seed_key = seed_key
+        self.epoch: Optional[int] = None
+        self.offsets: List[int] = []
+        self.next_batch = 0
+
+    def plan(self, epoch: int, start_offset: int = 0) -> List[int]:
+        """Batch offsets for epoch, squeezed into what is left after start_offset."""
+        rng = random.Random(f"{self.seed_key}:{epoch}")
+        end = max(self.finalize_offset, start_offset + 1)
+        slot = (end - start_offset) / self.batches
+        return [
+            start_offset + int(i * slot + rng.random() * slot * self.jitter)
+            for i in range(self.batches)
+        ]
+
+    def start_epoch(self, epoch: int, start_offset: int = 0) -> None:
+        self.epoch = epoch
+        self.offsets = self.plan(epoch, start_offset)
+        self.next_batch = 0
+
+    @property
+    def pending(self) -> bool:
+        """An epoch has been started and not finalized yet."""
+        return self.epoch is not None
+
+    def batch_due(self, offset: int) -> bool:
+        return self.pending and self.next_batch < len(self.offsets) and offset >= self.offsets[self.next_batch]
+
+    def batch_done(self) -> None:
+        self.next_batch += 1
+
+    def finalize_due(self, offset: int) -> bool:
+        return (
+            self.pending
+            and self.next_batch >= len(self.offsets)
+            and offset >= self.finalize_offset
+        )
+
+    def finish(self) -> None:
+        self.epoch = None
+        self.offsets = []
+        self.next_batch = 0
+
+
+class RoundAccumulator:
+    """Per-miner accuracy summed over every probe of a round (all batches)."""
+
+    def __init__(self, uids: Sequence[int], axons: Sequence, providers: Sequence[Dict]):
+        self.uids = list(uids)
+        self.axons = list(axons)
+        self.providers = list(providers)
+        self.accuracy_sums = np.zeros(len(self.uids), dtype=np.float32)
+        self.probe_count = 0
+        self.probed: Set[str] = set()
+        self.batches = 0
+
+    def unprobed(self) -> List[Dict]:
+        """Providers not yet probed this round (all of them once exhausted)."""
+        remaining = [p for p in self.providers if p.get("probeUrl") not in self.probed]
+        return remaining or self.providers
+
+    def add(self, accuracies: np.ndarray) -> None:
+        self.accuracy_sums += accuracies
+        self.probe_count += 1
+
+    def rewards(self) -> Optional[np.ndarray]:
+        if self.probe_count == 0:
+            return None
+        return self.accuracy_sums / self.probe_count
@@ -0,0 +1,191 @@
+# Handshake58 Subnet 58 - Latency Sketches
+#
+# Long-horizon latency quantiles per provider and per miner without keeping
+# raw samples. Each key owns one row of a DDSketch-style histogram: bucket
+# i counts latencies in (gamma^(i-1), gamma^i] ms with gamma = (1+a)/(1-a),
+# so any quantile is returned within relative error a. The bucket range is
+# fixed (min_ms..max_ms, values outside are clamped), which makes memory a
+# fixed number of uint32 counters per key and merging two sketches a plain
+# addition of rows. Persisted as sketches.npz next to state.npz.
+#
+#   python -m subnet58.validator.sketch show sketches.npz --prefix provider/
+#   python -m subnet58.validator.sketch merge a.npz b.npz -o merged.npz
+
+import argparse
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+
+class LatencySketches:
+    """
+    Mergeable fixed-memory latency quantile sketches, one per string key.
+
+    Keys are namespaced by the caller (e.g. "provider/<id>", "miner/<hotkey>").
+    add() feeds samples, quantiles() answers queries, merge() adds another
+    sketch set with the same parameters.
+    """
+
+    def __init__(self, alpha: float = 0.02, min_ms: float = 1.0, max_ms: float = 60_000.0, capacity: int = 64):
+        self.alpha = alpha
+        self.min_ms = min_ms
+        self.max_ms = max_ms
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self._offset = math.ceil(math.log(min_ms) / self._log_gamma)
+        self.buckets = math.ceil(math.log(max_ms) / self._log_gamma) - self._offset + 1
+        self.index: Dict[str, int] = {}
+        self.keys: List[str] = []
+        self.counts = np.zeros((capacity, self.buckets), dtype=np.uint32)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def _row(self, key: str) -> int:
+        row = self.index.get(key)
+        if row is None:
+            row = len(self.keys)
+            if row == len(self.counts):
+                grown = np.zeros((max(2 * row, 16), self.buckets), dtype=np.uint32)
+                grown[:row] = self.counts
+                self.counts = grown
+            self.index[key] = row
+            self.keys.append(key)
+        return row
+
+    def bucket_of(self, values: np.ndarray) -> np.ndarray:
+        clamped = np.clip(values, self.min_ms, self.max_ms)
+        idx = np.ceil(np.log(clamped) / self._log_gamma).astype(np.int64) - self._offset
+        return np.clip(idx, 0, self.buckets - 1)
+
+    def bucket_value(self, idx: np.ndarray) -> np.ndarray:
+        """Representative latency of bucket idx (relative error <= alpha)."""
+        return 2 * self.gamma ** (idx + self._offset) / (1 + self.gamma)
+
+    def add(self, key: str, values: Iterable[float]) -> None:
+        """Add positive latencies (ms) to key's sketch; zeros and negatives are ignored."""
+        values = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=np.float64)
+        values = values[values > 0]
+        if values.size:
+            np.add.at(self.counts[self._row(key)], self.bucket_of(values), 1)
+
+    def add_many(self, keys: Sequence[str], values: Sequence[float]) -> None:
+        """Add one latency per key (e.g. one answer per miner)."""
+        rows, vals = [], []
+        for key, value in zip(keys, values):
+            if value is not None and value > 0:
+                rows.append(self._row(key))
+                vals.append(value)
+        if rows:
+            np.add.at(self.counts, (np.asarray(rows), self.bucket_of(np.asarray(vals, dtype=np.float64))), 1)
+
+    def count(self, key: str) -> int:
+        row = self.index.get(key)
+        return 0 if row is None else int(self.counts[row].sum())
+
+    def quantiles(self, key: str, percentiles: Sequence[float] = (50, 95, 99)) -> Dict:
+        """{"samples": n, "p50": ms, ...} for key (None values when empty)."""
+        row = self.index.get(key)
+        counts = self.counts[row] if row is not None else np.zeros(self.buckets, dtype=np.uint32)
+        total = int(counts.sum())
+        result = {"samples": total}
+        cumulative = np.cumsum(counts, dtype=np.int64)
+        for p in percentiles:
+            if not total:
+                result[f"p{p:g}"] = None
+                continue
+            rank = p / 100 * (total - 1)
+            idx = int(np.searchsorted(cumulative, rank, side="right"))
+            result[f"p{p:g}"] = float(self.bucket_value(min(idx, self.buckets - 1)))
+        return result
+
+    def table(self, prefix: str = "", percentiles: Sequence[float] = (50, 95, 99)) -> List[Dict]:
+        return [
+            {"key": key[len(prefix):], **self.quantiles(key, percentiles)}
+            for key in self.keys if key.startswith(prefix)
+        ]
+
+    def compatible(self, other: "LatencySketches") -> bool:
+        return (self.alpha, self.min_ms, self.max_ms) == (other.alpha, other.min_ms, other.max_ms)
+
+    def merge(self, other: "LatencySketches") -> None:
+        """Add other's counts into this sketch set (same alpha and range required)."""
+        if not self.compatible(other):
+            raise ValueError("cannot merge sketches with different alpha or range")
+        rows = np.fromiter((self._row(key) for key in other.keys), dtype=np.int64, count=len(other.keys))
+        self.counts[rows] += other.counts[: len(other.keys)]
+
+    def forget(self, keep: Iterable[str]) -> None:
+        """Drop every key not in keep (e.g. deregistered hotkeys)."""
+        keep = set(keep)
+        rows = [row for row, key in enumerate(self.keys) if key in keep]
+        self.keys = [self.keys[row] for row in rows]
+        self.index = {key: i for i, key in enumerate(self.keys)}
+        counts = np.zeros_like(self.counts)
+        counts[: len(rows)] = self.counts[rows]
+        self.counts = counts
+
+    def save(self, path: str) -> None:
+        n = len(self.keys)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                alpha=self.alpha,
+                min_ms=self.min_ms,
+                max_ms=self.max_ms,
+                keys=np.array(self.keys, dtype=str),
+                counts=self.counts[:n],
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LatencySketches":
+        with np.load(path, allow_pickle=False) as data:
+            keys = [str(k) for k in data["keys"]]
+            sketches = cls(
+                alpha=float(data["alpha"]),
+                min_ms=float(data["min_ms"]),
+                max_ms=float(data["max_ms"]),
+                capacity=max(16, 2 * len(keys)),
+            )
+            sketches.counts[: len(keys)] = data["counts"]
+        sketches.keys = keys
+        sketches.index = {key: i for i, key in enumerate(keys)}
+        return sketches
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect or merge latency sketch files.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    show = sub.add_parser("show", help="Print p50/p95/p99 per key")
+    show.add_argument("path")
+    show.add_argument("--prefix", default="", help="Only keys with this prefix (provider/ or miner/)")
+    merge = sub.add_parser("merge", help="Merge sketch files from several validators or shards")
+    merge.add_argument("paths", nargs="+")
+    merge.add_argument("-o", "--out", required=True)
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        sketches = LatencySketches.load(args.path)
+        print(f"{'key':<48} {'samples':>9} {'p50_ms':>9} {'p95_ms':>9} {'p99_ms':>9}")
+        for row in sketches.table(args.prefix):
+            fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+            print(f"{row['key']:<48} {row['samples']:>9} {fmt(row['p50'])} {fmt(row['p95'])} {fmt(row['p99'])}")
+    else:
+        merged = LatencySketches.load(args.paths[0])
+        for path in args.paths[1:]:
+            merged.merge(LatencySketches.load(path))
+        merged.save(args.out)
+        print(f"Merged {len(args.paths)} files, {len(merged)} keys -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
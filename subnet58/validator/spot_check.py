@@ -0,0 +1,101 @@
+# Handshake58 Subnet 58 - Spot Checks
+#
+# The validator probes a few of each round's targets itself, with the same
+# probe code the miners run, on a small async pool (bounded concurrency,
+# own timeout). Spot checks are started when a batch begins and run while
+# the dendrite fan-outs are in flight; a target only uses its spot check if
+# it has already finished, so they never extend the round. A finished
+# check breaks reachability ties in the miner vote and is compared with
+# the consensus as a sanity anchor.
+
+import asyncio
+from dataclasses import replace
+from typing import Dict, Optional, Sequence, Tuple
+
+from subnet58.probe import ProbeResult, make_client, probe_url
+from subnet58.validator.reward import Consensus
+
+# Outcomes of anchor(), also the labels of the spot-check metric
+AGREE = "agree"
+DISAGREE = "disagree"
+TIEBREAK = "tiebreak"
+PENDING = "pending"
+
+
+class SpotChecker:
+    """Validator-side probes of sampled targets on a bounded async pool."""
+
+    def __init__(self, concurrency: int = 4, timeout_ms: float = 5000, tie_margin: float = 0.1):
+        self.concurrency = max(1, concurrency)
+        self.timeout_ms = timeout_ms
+        # Reachable vote shares within this margin of 50/50 count as a tie
+        self.tie_margin = tie_margin
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def _ensure_client(self) -> None:
+        # Created lazily so the client and semaphore bind to the running loop
+        if self._client is None:
+            self._client = make_client(self.timeout_ms, max_connections=self.concurrency)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _check(self, url: str) -> ProbeResult:
+        async with self._semaphore:
+            return await probe_url(self._client, url)
+
+    def start(self, urls: Sequence[str]) -> None:
+        """Begin probing urls in the background on the running event loop."""
+        self._ensure_client()
+        for url in urls:
+            if url not in self._tasks:
+                self._tasks[url] = asyncio.ensure_future(self._check(url))
+
+    def result(self, url: str) -> Optional[ProbeResult]:
+        """The spot check for url if it has finished, else None (never waits)."""
+        task = self._tasks.get(url)
+        if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        return task.result()
+
+    def pending(self, url: str) -> bool:
+        task = self._tasks.get(url)
+        return task is not None and not task.done()
+
+    async def cancel(self) -> None:
+        """Drop checks still running at the end of a batch and wait for them to unwind."""
+        tasks, self._tasks = list(self._tasks.values()), {}
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        await self.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def anchor(self, consensus: Consensus, responses, spot: ProbeResult) -> Tuple[Consensus, str]:
+        """
+        Reconcile a miner consensus with the validator's own probe.
+
+        A near-even reachability vote is decided by the spot check (status
+        and latency follow it). Otherwise consensus stands and the outcome
+        records whether the spot check agreed with it.
+        """
+        votes = [r.probe_reachable for r in responses if r is not None and r.probe_reachable is not None]
+        share = sum(1 for v in votes if v) / len(votes) if votes else 0.5
+        if abs(share - 0.5) <= self.tie_margin and spot.probe_reachable != consensus.reachable:
+            latency = (consensus.median_latency_ms or spot.probe_latency_ms) if spot.probe_reachable else 0
+            return replace(
+                consensus,
+                reachable=spot.probe_reachable,
+                status=spot.probe_status,
+                median_latency_ms=latency,
+            ), TIEBREAK
+        agree = spot.probe_reachable == consensus.reachable and (
+            not spot.probe_reachable or spot.probe_status == consensus.status
+        )
+        return consensus, AGREE if agree else DISAGREE
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from subnet58.validator.collusion import CollusionDetector, CollusionReport
+from subnet58.validator.reward import Answer, Consensus
+
+
+def _feed(detector, latencies):
+    """latencies: (probes, miners) ints, <= 0 for no answer; uids are the columns."""
+    uids = list(range(latencies.shape[1]))
+    for row in latencies:
+        answered = row[row > 0]
+        median = int(np.median(answered)) if answered.size else 0
+        detector.add_probe(
+            uids,
+            [Answer(True, 200, int(l)) if l > 0 else None for l in row],
+            Consensus(True, 200, median),
+        )
+
+
+def _honest(rng, probes, offsets, sigma=8.0):
+    base = rng.integers(50, 500, size=(probes, 1))
+    noise = rng.normal(0, sigma, size=(probes, len(offsets)))
+    return np.maximum(1, np.round(base + np.asarray(offsets) + noise)).astype(np.int64)
+
+
+@pytest.mark.parametrize("rate,flagged", [(0.90, True), (0.88, False)])
+def test_exact_match_threshold(rate, flagged):
+    rng = np.random.default_rng(1)
+    latencies = _honest(rng, 100, [0, 10, 20, 30])
+    copied = int(rate * 100)
+    latencies[:copied, 1] = latencies[:copied, 0]
+    # Correlation path off: only the exact-match rate decides
+    detector = CollusionDetector(max_uids=8, window=128, match_threshold=0.9, corr_threshold=1.01)
+    _feed(detector, latencies)
+
+    joint, equal = detector.exact_matches()
+    assert joint[0, 1] == 100
+    assert equal[0, 1] >= copied
+    assert detector.analyze().clusters == ([[0, 1]] if flagged else [])
+
+
+def test_too_few_joint_probes_is_not_flagged():
+    rng = np.random.default_rng(2)
+    latencies = _honest(rng, 40, [0, 10, 20])
+    latencies[:, 1] = latencies[:, 0]
+    detector = CollusionDetector(max_uids=8, window=128, min_joint=50)
+    _feed(detector, latencies)
+    assert detector.analyze().clusters == []
+
+
+def test_residual_correlation_is_pairwise_complete():
+    rng = np.random.default_rng(3)
+    detector = CollusionDetector(max_uids=6, window=64, block=4)
+    residual = rng.normal(0, 20, size=(6, 64)).astype(np.float32)
+    residual[rng.random((6, 64)) < 0.3] = np.nan
+    residual[5] = np.nan  # a uid that never answered
+    detector.residual[:] = residual
+
+    corr = detector.residual_correlation()
+    for i in range(5):
+        for j in range(5):
+            both = ~np.isnan(residual[i]) & ~np.isnan(residual[j])
+            expected = np.corrcoef(residual[i, both], residual[j, both])[0, 1]
+            assert corr[i, j] == pytest.approx(expected, abs=1e-4)
+    assert not corr[5].any()
+
+
+def test_clusters_are_transitive():
+    rng = np.random.default_rng(4)
+    latencies = _honest(rng, 100, [0, 10, 20, 30])
+    # 1 copies 0 except on probes 0-4, 2 copies 1 except on probes 5-9:
+    # 0~1 and 1~2 match on 95%, 0~2 only on 90%
+    latencies[5:, 1] = latencies[5:, 0]
+    latencies[:5, 2] = latencies[:5, 1]
+    latencies[10:, 2] = latencies[10:, 1]
+    detector = CollusionDetector(max_uids=8, window=128, match_threshold=0.93, corr_threshold=1.01)
+    _feed(detector, latencies)
+
+    report = detector.analyze()
+    assert report.pairs == 2
+    assert report.clusters == [[0, 1, 2]]
+    assert report.flagged == 3
+
+
+def test_multipliers_at_max_uids_boundary():
+    report = CollusionReport(clusters=[[1, 2, 3]])
+    np.testing.assert_allclose(report.multipliers(4), [1, 1 / 3, 1 / 3, 1 / 3])
+    # uid 3 is past n: not in the vector, but the others still share three ways
+    np.testing.assert_allclose(report.multipliers(3), [1, 1 / 3, 1 / 3])
+    rewards = np.array([0.9, 0.9, 0.9, 0.9, 0.9], dtype=np.float32)
+    np.testing.assert_allclose(report.apply(rewards, [0, 1, 2, 3, 4], 3), [0.9, 0.3, 0.3, 0.9, 0.9], rtol=1e-6)
+
+
+def test_uids_past_max_uids_are_ignored():
+    rng = np.random.default_rng(5)
+    latencies = _honest(rng, 80, [0, 10, 20, 30, 40, 50])
+    latencies[:, 5] = latencies[:, 4]
+    latencies[:, 1] = latencies[:, 0]
+    detector = CollusionDetector(max_uids=4, window=128)
+    _feed(detector, latencies)
+    assert detector.analyze().clusters == [[0, 1]]
+
+
+def test_shared_constant_offset_is_not_collusion():
+    # Two honest miners in one datacenter: same latency offset to every
+    # provider, independent measurement noise
+    rng = np.random.default_rng(6)
+    latencies = _honest(rng, 300, [35, 35, 0, 12, 50, 8, 27, 60, 3, 41])
+    detector = CollusionDetector(max_uids=16, window=512)
+    _feed(detector, latencies)
+
+    assert abs(detector.residual_correlation()[0, 1]) < 0.5
+    assert detector.analyze().clusters == []
+
+
+def test_copy_with_constant_offset_is_collusion():
+    # A copier adding a fixed delay never matches exactly, but its residuals
+    # move in lockstep with the source's
+    rng = np.random.default_rng(7)
+    latencies = _honest(rng, 300, [0, 12, 50, 8, 27, 60, 3, 41])
+    latencies[:, 1] = latencies[:, 0] + 35
+    detector = CollusionDetector(max_uids=16, window=512)
+    _feed(detector, latencies)
+
+    joint, equal = detector.exact_matches()
+    assert equal[0, 1] == 0
+    assert detector.residual_correlation()[0, 1] > 0.98
+    assert detector.analyze().clusters == [[0, 1]]
@@ -0,0 +1,128 @@
+import json
+
+import pytest
+
+pytest.importorskip("bittensor")
+
+from subnet58.validator.feed import ConsensusFeed  # noqa: E402
+from subnet58.validator.reward import Consensus  # noqa: E402
+
+
+def _feed(tmp_path, **kwargs):
+    kwargs.setdefault("keyframe_every", 3)
+    kwargs.setdefault("latency_delta_ms", 50)
+    return ConsensusFeed("https://market.example", str(tmp_path / "outbox.jsonl"), **kwargs)
+
+
+def _round(feed, consensus, step=0):
+    for pid, c in consensus.items():
+        feed.record({"id": pid}, c)
+    return feed.publish(step=step, block=100 + step)
+
+
+def _entries(batch):
+    return {e[0]: tuple(e[1:]) for e in batch["entries"]}
+
+
+def _outbox_seqs(feed):
+    with open(feed.outbox_path) as f:
+        return [json.loads(line)["seq"] for line in f]
+
+
+def test_changed_thresholds(tmp_path):
+    feed = _feed(tmp_path)
+    assert feed._changed("p0", (1, 200, 100))
+    feed._published["p0"] = (1, 200, 100)
+    assert not feed._changed("p0", (1, 200, 100))
+    assert not feed._changed("p0", (1, 200, 149))
+    assert not feed._changed("p0", (1, 200, 51))
+    assert feed._changed("p0", (1, 200, 150))
+    assert feed._changed("p0", (1, 200, 50))
+    assert feed._changed("p0", (0, 200, 100))
+    assert feed._changed("p0", (1, 503, 100))
+
+
+def test_deltas_between_keyframes(tmp_path):
+    feed = _feed(tmp_path)
+    up = {"p0": Consensus(True, 200, 100), "p1": Consensus(True, 200, 300)}
+
+    first = _round(feed, up, step=0)
+    assert first["keyframe"] and first["seq"] == 1
+    assert _entries(first) == {"p0": (1, 200, 100), "p1": (1, 200, 300)}
+
+    # Jitter under the threshold sends nothing and does not use a seq
+    assert _round(feed, {"p0": Consensus(True, 200, 120), "p1": Consensus(True, 200, 290)}, step=1) is None
+
+    second = _round(feed, {"p0": Consensus(False, 0, 0), "p1": Consensus(True, 200, 290)}, step=2)
+    assert not second["keyframe"] and second["seq"] == 2
+    assert _entries(second) == {"p0": (0, 0, 0)}
+
+    # Every keyframe_every rounds: everything, changed or not
+    keyframe = _round(feed, {"p1": Consensus(True, 200, 300)}, step=3)
+    assert keyframe["keyframe"] and keyframe["seq"] == 3
+    assert _entries(keyframe) == {"p0": (0, 0, 0), "p1": (1, 200, 300)}
+
+    delta = _round(feed, {"p1": Consensus(True, 200, 360)}, step=4)
+    assert not delta["keyframe"] and _entries(delta) == {"p1": (1, 200, 360)}
+
+
+def test_quiet_rounds_still_get_keyframes(tmp_path):
+    feed = _feed(tmp_path)
+    _round(feed, {"p0": Consensus(True, 200, 100)}, step=0)
+    assert feed.publish(step=1, block=101) is None
+    assert feed.publish(step=2, block=102) is None
+    batch = feed.publish(step=3, block=103)
+    assert batch["keyframe"] and batch["seq"] == 2
+    assert _entries(batch) == {"p0": (1, 200, 100)}
+
+    (tmp_path / "every").mkdir()
+    every_round = _feed(tmp_path / "every", keyframe_every=1)
+    assert all(every_round.publish(step=s, block=s)["keyframe"] for s in range(3))
+
+
+def test_outbox_trims_oldest_and_survives_restart(tmp_path):
+    feed = _feed(tmp_path, max_outbox=3)
+    for step in range(5):
+        _round(feed, {"p0": Consensus(True, 200, 100 * (step + 1))}, step=step)
+    assert feed.backlog() == 3
+    assert feed.dropped == 2
+    assert _outbox_seqs(feed) == [3, 4, 5]
+
+    # A crash mid-append leaves a torn line; the restart drops it and
+    # continues numbering after the last queued batch
+    with open(feed.outbox_path, "a") as f:
+        f.write('{"seq": 6, "entr')
+    restarted = _feed(tmp_path, max_outbox=3)
+    assert restarted.backlog() == 3
+    assert _outbox_seqs(restarted) == [3, 4, 5]
+    assert _round(restarted, {"p0": Consensus(True, 200, 100)})["seq"] == 6
+    assert _outbox_seqs(restarted) == [4, 5, 6]
+
+
+def test_flush_sends_in_order_and_keeps_the_rest(tmp_path, monkeypatch):
+    feed = _feed(tmp_path)
+    for step in range(3):
+        _round(feed, {"p0": Consensus(True, 200, 100 * (step + 1))}, step=step)
+
+    posted = []
+
+    def post(line):
+        seq = json.loads(line)["seq"]
+        if seq == 3:
+            raise ConnectionError("marketplace down")
+        posted.append(seq)
+
+    monkeypatch.setattr(feed, "_post", post)
+    with pytest.raises(ConnectionError):
+        feed.flush()
+    assert posted == [1, 2]
+    assert feed.sent == 2
+    assert feed.backlog() == 1
+    assert _outbox_seqs(feed) == [3]
+
+    monkeypatch.setattr(feed, "_post", lambda line: posted.append(json.loads(line)["seq"]))
+    _round(feed, {"p0": Consensus(False, 0, 0)}, step=3)
+    assert feed.flush() == 2
+    assert posted == [1, 2, 3, 4]
+    assert feed.backlog() == 0
+    assert _outbox_seqs(feed) == []
@@ -0,0 +1,170 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip("bittensor")
+
+from subnet58.base.validator import BaseValidatorNeuron  # noqa: E402
+from subnet58.utils import handoff as handoff_mod  # noqa: E402
+from subnet58.utils.handoff import Handoff, await_handoff, record_exit  # noqa: E402
+from subnet58.utils.metrics import ValidatorMetrics  # noqa: E402
+from subnet58.utils.tracing import Tracer  # noqa: E402
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A standby reduced to its handoff: wait for the snapshot, write it out
+STANDBY = """
+import json, sys
+from subnet58.utils.handoff import await_handoff
+snapshot = await_handoff(sys.argv[1], poll_s=0.05)
+with open(sys.argv[2], "w") as f:
+    json.dump(snapshot, f)
+sys.exit(0 if snapshot is not None else 3)
+"""
+
+
+def _wait(predicate, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def test_ready_then_commit_hands_over_the_snapshot(tmp_path):
+    directory, out = str(tmp_path / "handoff"), str(tmp_path / "snapshot.json")
+    handoff = Handoff(directory, [sys.executable, "-c", STANDBY, directory, out], timeout_s=60, cwd=REPO_ROOT).start()
+    try:
+        assert _wait(handoff.ready), "standby never became ready"
+        assert not handoff.failed()
+        handoff.commit({"step": 8, "epoch": 3, "round_block": 1080})
+        assert handoff.proc.wait(30) == 0
+    finally:
+        handoff.abort()
+
+    with open(out) as f:
+        assert json.load(f) == {"step": 8, "epoch": 3, "round_block": 1080}
+    with open(os.path.join(directory, handoff_mod.ACTIVE_PID_FILE)) as f:
+        assert int(f.read()) == handoff.proc.pid
+    # The standby consumed the handshake files
+    assert not os.path.exists(os.path.join(directory, handoff_mod.READY_FILE))
+    assert not os.path.exists(os.path.join(directory, handoff_mod.SNAPSHOT_FILE))
+
+
+def test_standby_that_exits_has_failed(tmp_path):
+    handoff = Handoff(str(tmp_path), [sys.executable, "-c", "raise SystemExit(1)"]).start()
+    handoff.proc.wait(30)
+    assert not handoff.ready()
+    assert handoff.failed()
+
+
+def test_timeout_fails_and_abort_stops_the_standby(tmp_path):
+    handoff = Handoff(str(tmp_path), [sys.executable, "-c", "import time; time.sleep(60)"], timeout_s=0).start()
+    # Alive but never wrote ready, and past its deadline
+    time.sleep(0.05)
+    assert handoff.proc.poll() is None
+    assert handoff.failed()
+    handoff.abort()
+    assert handoff.proc.poll() is not None
+
+
+def test_ready_file_of_another_pid_is_not_ready(tmp_path):
+    handoff = Handoff(str(tmp_path), [sys.executable, "-c", "import time; time.sleep(60)"], timeout_s=60).start()
+    try:
+        handoff_mod.write_atomic(os.path.join(str(tmp_path), handoff_mod.READY_FILE), f"{os.getpid()}\n")
+        assert not handoff.ready()
+        assert not handoff.failed()
+    finally:
+        handoff.abort()
+    assert not os.path.exists(os.path.join(str(tmp_path), handoff_mod.READY_FILE))
+
+
+def test_await_handoff_returns_none_when_orphaned(tmp_path, monkeypatch):
+    monkeypatch.setenv(handoff_mod.PARENT_ENV, str(_dead_pid()))
+    assert await_handoff(str(tmp_path), poll_s=0.01) is None
+    assert not os.path.exists(os.path.join(str(tmp_path), handoff_mod.READY_FILE))
+
+
+def test_await_handoff_stops_on_should_exit(tmp_path, monkeypatch):
+    monkeypatch.setenv(handoff_mod.PARENT_ENV, str(os.getpid()))
+    calls = []
+    assert await_handoff(str(tmp_path), poll_s=0.01, should_exit=lambda: calls.append(1) or len(calls) > 3) is None
+    assert not os.path.exists(os.path.join(str(tmp_path), handoff_mod.READY_FILE))
+
+
+def test_record_exit_only_for_the_active_process(tmp_path):
+    directory = str(tmp_path)
+    exit_path = os.path.join(directory, handoff_mod.EXIT_CODE_FILE)
+    assert not record_exit(directory, 42)
+
+    handoff_mod.write_atomic(os.path.join(directory, handoff_mod.ACTIVE_PID_FILE), f"{_dead_pid()}\n")
+    assert not record_exit(directory, 42)
+    assert not os.path.exists(exit_path)
+
+    handoff_mod.write_atomic(os.path.join(directory, handoff_mod.ACTIVE_PID_FILE), f"{os.getpid()}\n")
+    assert record_exit(directory, 42)
+    with open(exit_path) as f:
+        assert f.read().split() == [str(os.getpid()), "42"]
+
+
+class _Neuron(BaseValidatorNeuron):
+    async def forward(self):
+        pass
+
+
+def _neuron(full_path, standby):
+    # Only the state take_over/hand_over touch; no wallet or chain
+    neuron = object.__new__(_Neuron)
+    neuron.config = SimpleNamespace(
+        neuron=SimpleNamespace(full_path=str(full_path), axon_off=True, moving_average_alpha=0.5)
+    )
+    neuron.standby = standby
+    neuron.metrics = ValidatorMetrics()
+    neuron.metrics_server = None
+    neuron.memwatch = None
+    neuron.tracer = Tracer()
+    neuron.history = None
+    neuron.step = 0
+    neuron.round_block = 0
+    neuron.scores = np.zeros(4, dtype=np.float32)
+    neuron.scores_version = 0
+    neuron.hotkeys = [f"hk{i}" for i in range(4)]
+    neuron._last_rewards = None
+    return neuron
+
+
+def test_take_over_restores_step_and_round_block(tmp_path):
+    active = _neuron(tmp_path, standby=False)
+    active._open_history()
+    active.tracer = Tracer(str(tmp_path / "trace.jsonl"), enabled=True)
+    active.step, active.round_block = 7, 1080
+    active.update_scores(np.array([0.1, 0.2, 0.3, 0.4], dtype=np.float32), [0, 1, 2, 3])
+    active.save_state()
+    # _end_round bumps the step before the next epoch's handoff
+    active.step += 1
+    snapshot = {"step": active.step, "epoch": 3, "block": 1440, "round_block": active.round_block}
+    active.hand_over()
+    assert active.history is None
+    assert not active.tracer.enabled
+
+    standby = _neuron(tmp_path, standby=True)
+    standby.take_over(snapshot)
+    assert not standby.standby
+    assert standby.step == 8
+    assert standby.round_block == 1080
+    np.testing.assert_array_equal(standby.scores, active.scores)
+    assert int(standby.history.last()["step"]) == 7
+    standby.hand_over()
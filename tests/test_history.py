@@ -0,0 +1,46 @@
+import os
+
+import numpy as np
+import pytest
+
+from subnet58.validator.history import ScoreHistory, hotkey_hashes
+
+HOTKEYS = [f"hk{i}" for i in range(6)]
+
+
+def _fill(path, max_uids, rounds=3):
+    history = ScoreHistory(path, max_uids=max_uids, retention=10)
+    for step in range(rounds):
+        scores = np.arange(len(HOTKEYS), dtype=np.float32) + step
+        history.append(step=step, block=100 + step, rewards=scores / 10, scores=scores, hotkeys=HOTKEYS)
+    history.close()
+
+
+@pytest.mark.parametrize("old_uids,new_uids", [(4, 8), (8, 4)])
+def test_migrate_max_uids(tmp_path, old_uids, new_uids):
+    path = str(tmp_path / "history.bin")
+    _fill(path, old_uids)
+
+    history = ScoreHistory(path, max_uids=new_uids, retention=10)
+    assert history.max_uids == new_uids
+    assert not os.path.exists(path + ".migrate")
+
+    records = history.read()
+    assert records["step"].tolist() == [0, 1, 2]
+    kept = min(old_uids, new_uids, len(HOTKEYS))
+    last = records[-1]
+    assert int(last["n"]) == kept
+    np.testing.assert_array_equal(last["scores"][:kept], np.arange(kept) + 2)
+    assert not last["scores"][kept:].any()
+    np.testing.assert_array_equal(last["hotkey_hash"][:kept], hotkey_hashes(HOTKEYS, new_uids)[:kept])
+    assert not last["hotkey_hash"][kept:].any()
+
+    restored = history.restore_scores(HOTKEYS)
+    np.testing.assert_array_equal(restored[:kept], np.arange(kept) + 2)
+
+
+def test_migrate_retention_keeps_newest(tmp_path):
+    path = str(tmp_path / "history.bin")
+    _fill(path, 8, rounds=5)
+    history = ScoreHistory(path, max_uids=8, retention=2)
+    assert history.read()["step"].tolist() == [3, 4]
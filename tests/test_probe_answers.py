@@ -0,0 +1,123 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from subnet58.validator.reward import (
+    Answer,
+    ProbeAnswers,
+    accuracy_from_answers,
+    compute_consensus,
+    consensus_from_answers,
+    probe_accuracy,
+)
+from subnet58.utils.probe_codec import pack_probe, unpack_probes
+
+
+def _synapse(**answer):
+    """Stand-in for a ProviderProbe response (same attributes, no bittensor)."""
+    fields = dict(probe_reachable=None, probe_status=None, probe_latency_ms=None, probe_packed=None)
+    fields.update(answer)
+    return SimpleNamespace(**fields)
+
+
+def test_pack_unpack_round_trip():
+    cases = [(True, 200, 123), (False, 0, 0), (True, 404, 4_000_000), (True, 503, 1)]
+    records = unpack_probes([pack_probe(*c) for c in cases])
+    assert records["flags"].tolist() == [3, 1, 3, 3]
+    assert records["status"].tolist() == [c[1] for c in cases]
+    assert records["latency"].tolist() == [c[2] for c in cases]
+
+
+def test_unpack_missing_and_invalid():
+    records = unpack_probes([None, "", "not base64!", "AAAA", pack_probe(True, 200, 5)])
+    assert records["flags"].tolist() == [0, 0, 0, 0, 3]
+
+
+def test_pack_clamps_out_of_range():
+    (flags, status, latency), = unpack_probes([pack_probe(True, 70_000, -5)]).tolist()
+    assert (flags, status, latency) == (3, 0xFFFF, 0)
+
+
+def _random_responses(rng, n):
+    responses = []
+    for _ in range(n):
+        k = rng.random()
+        if k < 0.15:
+            responses.append(None)
+            continue
+        synapse = _synapse()
+        if k < 0.25:
+            responses.append(synapse)  # no answer
+            continue
+        # Few distinct values so ties are common
+        reachable = rng.random() < 0.6
+        status = rng.choice([200, 200, 404, 0])
+        latency = rng.choice([0, rng.randint(1, 5000)])
+        if rng.random() < 0.5:
+            synapse.probe_packed = pack_probe(reachable, status, latency)
+        else:
+            synapse.probe_reachable, synapse.probe_status, synapse.probe_latency_ms = reachable, status, latency
+        responses.append(synapse)
+    return responses
+
+
+def test_columnar_matches_scalar():
+    rng = random.Random(0)
+    for _ in range(2000):
+        responses = _random_responses(rng, rng.randint(1, 12))
+        answers = ProbeAnswers.from_responses(responses)
+        records = answers.records()
+        consensus = compute_consensus(records)
+        assert consensus_from_answers(answers) == consensus
+        if consensus is None:
+            continue
+        expected = np.array([probe_accuracy(r, consensus, 1500) for r in records], dtype=np.float32)
+        np.testing.assert_allclose(accuracy_from_answers(answers, consensus, 1500), expected, atol=1e-6)
+
+
+def test_plain_and_packed_decode_alike():
+    plain = _synapse(probe_reachable=True, probe_status=200, probe_latency_ms=80)
+    packed = _synapse(probe_packed=pack_probe(True, 200, 80))
+    assert ProbeAnswers.from_responses([plain, packed]).records() == [Answer(True, 200, 80)] * 2
+
+
+def test_records_without_packed_attribute():
+    # Replay hands in Answer tuples, which have no probe_packed
+    answers = ProbeAnswers.from_responses([Answer(False, None, 0), None, Answer(True, 404, 12)])
+    assert answers.records() == [Answer(False, None, 0), None, Answer(True, 404, 12)]
+    assert len(ProbeAnswers.from_responses([])) == 0
+
+
+@pytest.fixture
+def protocol():
+    return pytest.importorskip("subnet58.protocol")
+
+
+def test_synapse_decodes_like_stand_in(protocol):
+    rng = random.Random(1)
+    for _ in range(200):
+        stand_ins = _random_responses(rng, rng.randint(1, 8))
+        responses = [
+            None if r is None else protocol.ProviderProbe(target_url="http://x", **vars(r)) for r in stand_ins
+        ]
+        assert ProbeAnswers.from_responses(responses).records() == ProbeAnswers.from_responses(stand_ins).records()
+
+
+def test_deserialize_packed(protocol):
+    synapse = protocol.ProviderProbe(target_url="http://x", probe_packed=pack_probe(True, 200, 42))
+    assert synapse.deserialize()["probe_reachable"] is True
+    assert synapse.deserialize()["probe_latency_ms"] == 42
+
+
+def test_json_body_omits_unset_answers(protocol):
+    packed = protocol.ProviderProbe(target_url="x", probe_encoding=1, probe_packed=pack_probe(True, 200, 5))
+    body = packed.model_dump(mode="json")
+    assert "probe_packed" in body
+    assert not {"probe_reachable", "probe_status", "probe_latency_ms"} & set(body)
+    plain = protocol.ProviderProbe(target_url="x", probe_reachable=False, probe_status=0, probe_latency_ms=0)
+    assert "probe_packed" not in plain.model_dump(mode="json")
+    assert plain.model_dump(mode="json")["probe_reachable"] is False
+    # The dendrite copies answers back by the keys of a python-mode dump
+    assert {"probe_reachable", "probe_packed"} <= set(protocol.ProviderProbe().model_dump())
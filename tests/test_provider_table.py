@@ -0,0 +1,127 @@
+import pytest
+
+from subnet58.validator.provider_table import ProviderTable
+
+
+def _entry(i, name=None, protocol="drain"):
+    return {"id": f"p{i}", "probeUrl": f"https://p{i}.example/health", "name": name or f"P{i}", "protocol": protocol}
+
+
+def _rows(table):
+    return sorted((p["id"], p["probeUrl"], p["name"], p["protocol"]) for p in table.providers())
+
+
+def _kinds(table, delta):
+    ids = lambda idxs: sorted(table.ids[i] for i in idxs)  # noqa: E731
+    return ids(delta.added), ids(delta.changed), len(delta.removed)
+
+
+def test_since_delta_matches_diffing_a_full_listing():
+    initial = [_entry(i) for i in range(8)]
+    full_table, delta_table = ProviderTable(), ProviderTable()
+    full_table.apply(initial, version="v1")
+    delta_table.apply(initial, version="v1")
+
+    # Registry moves on: p2 and p5 leave, p3 is renamed, p6 switches
+    # protocol, p8 and p9 join
+    listing = [
+        _entry(0), _entry(1), _entry(3, name="P3 renamed"), _entry(4),
+        _entry(6, protocol="mpp"), _entry(7), _entry(8), _entry(9),
+    ]
+    full = full_table.apply(listing, version="v2")
+    delta = delta_table.apply_delta(
+        [_entry(3, name="P3 renamed"), _entry(6, protocol="mpp"), _entry(8), _entry(9)],
+        ["p2", "p5"],
+        version="v2",
+    )
+
+    assert _rows(delta_table) == _rows(full_table)
+    assert _kinds(delta_table, delta) == _kinds(full_table, full) == (["p8", "p9"], ["p3", "p6"], 2)
+    assert delta_table.version == full_table.version == "v2"
+
+
+def test_unchanged_listing_is_an_empty_delta_and_keeps_the_list():
+    table = ProviderTable()
+    table.apply([_entry(i) for i in range(4)], version="v1")
+    providers = table.providers()
+    delta = table.apply([_entry(i) for i in range(4)], version="v2")
+    assert not delta
+    assert table.providers() is providers
+    assert table.version == "v2"
+
+
+def test_indices_are_stable_while_registered():
+    table = ProviderTable()
+    table.apply([_entry(i) for i in range(4)])
+    before = {p["id"]: p["index"] for p in table.providers()}
+    table.apply_delta([_entry(1, name="renamed")], ["p0"])
+    after = {p["id"]: p["index"] for p in table.providers()}
+    assert after == {k: v for k, v in before.items() if k != "p0"}
+    # The freed index goes to the next newcomer
+    delta = table.apply_delta([_entry(9)], [])
+    assert delta.added == [before["p0"]]
+
+
+def test_more_than_256_protocols():
+    table = ProviderTable(capacity=4)
+    table.apply([_entry(i, protocol=f"proto{i}") for i in range(300)])
+    assert len(table) == 300
+    assert {p["id"]: p["protocol"] for p in table.providers()} == {f"p{i}": f"proto{i}" for i in range(300)}
+
+
+@pytest.fixture
+def registry(monkeypatch, tmp_path):
+    pytest.importorskip("bittensor")
+    import subnet58.registry_client as registry
+
+    monkeypatch.setattr(registry, "REGISTRY_CACHE_FILE", str(tmp_path / "registry_cache.json"))
+    return registry
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def _serve(registry, monkeypatch, responses):
+    calls = []
+
+    def get(url, params=None, timeout=None):
+        calls.append(params)
+        return _Response(responses[len(calls) - 1])
+
+    monkeypatch.setattr(registry.requests, "get", get)
+    return calls
+
+
+def test_fetch_asks_for_changes_since_the_table_version(registry, monkeypatch):
+    calls = _serve(registry, monkeypatch, [
+        {"version": 1, "providers": [_entry(0), _entry(1)]},
+        {"version": 2, "delta": True, "since": "1", "upserts": [_entry(2)], "removed": ["p0"]},
+    ])
+    table = ProviderTable()
+    assert str(registry.fetch_provider_updates(table, ["https://registry.example"])) == "+2 -0 ~0"
+    assert str(registry.fetch_provider_updates(table, ["https://registry.example"])) == "+1 -1 ~0"
+    assert calls == [None, {"since": "1"}]
+    assert table.version == "2"
+    assert _rows(table) == sorted(tuple(_entry(i).values()) for i in (1, 2))
+
+
+def test_delta_from_another_version_refetches_the_full_listing(registry, monkeypatch):
+    calls = _serve(registry, monkeypatch, [
+        {"version": 1, "providers": [_entry(0), _entry(1)]},
+        {"version": 3, "delta": True, "since": "2", "upserts": [], "removed": ["p1"]},
+        {"version": 3, "providers": [_entry(1), _entry(3)]},
+    ])
+    table = ProviderTable()
+    registry.fetch_provider_updates(table, ["https://registry.example"])
+    assert str(registry.fetch_provider_updates(table, ["https://registry.example"])) == "+1 -1 ~0"
+    assert calls == [None, {"since": "1"}, None]
+    assert table.version == "3"
+    assert _rows(table) == sorted(tuple(_entry(i).values()) for i in (1, 3))
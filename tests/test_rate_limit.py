@@ -0,0 +1,94 @@
+import math
+
+import pytest
+
+from subnet58.miner.rate_limit import TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(base=10, max_capacity=40, window_s=60):
+    clock = FakeClock()
+    return TokenBucketLimiter(base, max_capacity, window_s, clock=clock), clock
+
+
+@pytest.mark.parametrize("stake", [0, 9, 99, 1234.5])
+def test_capacity_scales_with_log_stake(stake):
+    limiter, _ = _limiter(max_capacity=1000)
+    assert limiter.capacity_for(stake) == pytest.approx(10 * (1 + math.log10(1 + stake)))
+
+
+def test_capacity_capped_and_negative_stake_is_zero():
+    limiter, _ = _limiter()
+    assert limiter.capacity_for(1e9) == 40
+    assert limiter.capacity_for(-5) == 10
+    # max below base is raised to base
+    assert TokenBucketLimiter(10, 5, 60).capacity_for(1e9) == 10
+
+
+def test_burst_up_to_capacity_then_rejected():
+    limiter, _ = _limiter()
+    stake = 9  # capacity 20
+    assert all(limiter.consume("v1", stake) for _ in range(20))
+    assert not limiter.consume("v1", stake)
+    assert not limiter.consume("v1", stake)
+    # Another hotkey has its own bucket
+    assert limiter.consume("v2", stake)
+
+    stats = limiter.stats()
+    assert stats["allowed"] == 21
+    assert stats["rejected"] == 2
+    assert stats["tracked_hotkeys"] == 2
+    assert stats["top_rejected"] == [("v1", 2)]
+
+
+def test_refills_to_capacity_over_window():
+    limiter, clock = _limiter(window_s=60)
+    for _ in range(10):
+        limiter.consume("v1", 0)
+    assert not limiter.consume("v1", 0)
+
+    # A quarter of the window brings back a quarter of the capacity
+    clock.now += 15
+    assert limiter.fill_ratio("v1") == pytest.approx(0.25)
+    assert sum(limiter.consume("v1", 0) for _ in range(5)) == 2
+
+    # Never above capacity however long it waits
+    clock.now += 3600
+    assert limiter.fill_ratio("v1") == pytest.approx(1.0)
+    assert sum(limiter.consume("v1", 0) for _ in range(15)) == 10
+
+
+def test_fill_ratio_orders_priority():
+    limiter, _ = _limiter()
+    assert limiter.fill_ratio("unseen") == 1.0
+    for _ in range(5):
+        limiter.consume("busy", 0)
+    limiter.consume("quiet", 0)
+    assert limiter.fill_ratio("busy") == pytest.approx(0.5)
+    assert limiter.fill_ratio("quiet") == pytest.approx(0.9)
+    # Priority is stake * fill_ratio: a flooding high-stake caller can fall
+    # behind a quiet lower-stake one
+    assert 100 * limiter.fill_ratio("busy") < 60 * limiter.fill_ratio("quiet")
+
+
+def test_prune_drops_deregistered_hotkeys():
+    limiter, _ = _limiter()
+    for _ in range(11):
+        limiter.consume("gone", 0)
+        limiter.consume("kept", 0)
+    limiter.prune(["kept", "new"])
+
+    stats = limiter.stats()
+    assert stats["tracked_hotkeys"] == 1
+    assert stats["top_rejected"] == [("kept", 1)]
+    assert stats["rejected"] == 2
+    # Re-registered under the same hotkey: starts with a full bucket
+    assert limiter.fill_ratio("gone") == 1.0
+    assert limiter.consume("gone", 0)
@@ -0,0 +1,114 @@
+import numpy as np
+
+from subnet58.probe import ProbeResult
+from subnet58.validator.replay import RoundRecorder, iter_rounds, replay
+from subnet58.validator.reward import (
+    Answer,
+    compute_consensus,
+    ema_update,
+    probe_accuracy,
+    quantize_weights,
+    scatter_rewards,
+)
+
+
+def _round(rng, uids):
+    targets = []
+    for _ in range(4):
+        reachable = [None if rng.random() < 0.2 else int(rng.random() < 0.7) for _ in uids]
+        targets.append({
+            "reachable": reachable,
+            "status": [None if r is None else int(rng.choice([200, 404])) for r in reachable],
+            "latency": [None if r is None else int(rng.integers(0, 3000)) for r in reachable],
+        })
+    return {"uids": uids, "targets": targets}
+
+
+def test_replay_matches_scalar_pipeline():
+    rng = np.random.default_rng(0)
+    uids = list(range(8))
+    rounds = [_round(rng, uids) for _ in range(20)]
+
+    scores = np.zeros(len(uids), dtype=np.float32)
+    for rnd in rounds:
+        sums, probes = np.zeros(len(uids), dtype=np.float32), 0
+        for t in rnd["targets"]:
+            responses = [
+                Answer(None if r is None else bool(r), s, l)
+                for r, s, l in zip(t["reachable"], t["status"], t["latency"])
+            ]
+            consensus = compute_consensus(responses)
+            if consensus is None:
+                continue
+            sums += np.array([probe_accuracy(r, consensus, 2000) for r in responses], dtype=np.float32)
+            probes += 1
+        if probes:
+            scores = ema_update(scores, scatter_rewards(sums / probes, uids, len(uids)), 0.1)
+
+    report = replay(rounds, alpha=0.1, max_latency_deviation=2000, collusion_mode="off")
+    assert report.rounds == 20
+    np.testing.assert_allclose(report.scores, scores, atol=1e-6)
+
+
+def test_weights_are_what_set_weights_submits():
+    rng = np.random.default_rng(1)
+    rounds = [_round(rng, list(range(12))) for _ in range(10)]
+    for top_k in (0, 5):
+        report = replay(rounds, collusion_mode="off", top_k=top_k)
+        uids, weights = quantize_weights(report.scores, top_k)
+        assert report.weight_uids.tolist() == uids.tolist()
+        assert report.weights.tolist() == weights.tolist()
+        assert report.weights.dtype == np.uint16
+
+
+def _tied_target(spot=None):
+    # Two miners say reachable, two say not: the first vote seen wins
+    target = {
+        "reachable": [0, 1, 0, 1],
+        "status": [0, 200, 0, 200],
+        "latency": [0, 100, 0, 100],
+    }
+    if spot is not None:
+        target["spot"] = spot
+    return target
+
+
+def test_spot_check_breaks_recorded_ties():
+    plain = replay([{"uids": [0, 1, 2, 3], "targets": [_tied_target()]}], alpha=1.0, collusion_mode="off")
+    anchored = replay(
+        [{"uids": [0, 1, 2, 3], "targets": [_tied_target([1, 200, 90])]}], alpha=1.0, collusion_mode="off",
+    )
+    assert anchored.spot_checks == 1
+    # Unanchored the unreachable voters win; the spot check flips it
+    assert plain.scores[0] > plain.scores[1]
+    assert anchored.scores[1] > anchored.scores[0]
+
+
+def test_collusion_penalty_applied():
+    rng = np.random.default_rng(2)
+    uids = list(range(6))
+    rounds = []
+    for _ in range(20):
+        targets = []
+        for _ in range(5):
+            latency = [int(v) for v in rng.integers(50, 3000, len(uids))]
+            latency[1] = latency[2] = latency[0]  # uids 0-2 copy one answer
+            targets.append({"reachable": [1] * 6, "status": [200] * 6, "latency": latency})
+        rounds.append({"uids": uids, "targets": targets})
+    logged = replay(rounds, collusion_mode="log")
+    penalized = replay(rounds, collusion_mode="penalize")
+    assert logged.flagged == penalized.flagged == 3
+    np.testing.assert_allclose(penalized.scores[3:], logged.scores[3:], rtol=1e-6)
+    assert np.all(penalized.scores[:3] < logged.scores[:3])
+
+
+def test_recorder_keeps_spot_check(tmp_path):
+    recorder = RoundRecorder(str(tmp_path))
+    recorder.begin_round(1, 100, [0, 1])
+    answers = [Answer(True, 200, 50), None]
+    recorder.add_target({"id": "p"}, [None, None], 0.1, answers, ProbeResult(False, 0, 0))
+    recorder.add_target({"id": "q"}, [None, None], 0.1, answers)
+    recorder.end_round()
+    (rnd,) = iter_rounds([str(p) for p in tmp_path.iterdir()])
+    assert [t["spot"] for t in rnd["targets"]] == [[0, 0, 0], None]
+    assert rnd["targets"][0]["reachable"] == [1, None]
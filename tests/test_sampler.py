@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from subnet58.validator.reward import Answer, Consensus
+from subnet58.validator.sampler import SECONDS_PER_ROUND, TargetSampler, provider_key
+
+NOW = 1_700_000_000.0
+
+
+def _providers(n):
+    return [{"id": f"p{i}", "probeUrl": f"https://p{i}.example/health"} for i in range(n)]
+
+
+def _answers(agree, disagree):
+    return [Answer(True, 200, 100)] * agree + [Answer(False, 503, 0)] * disagree
+
+
+def test_sample_is_top_k_of_efraimidis_spirakis_keys():
+    providers = _providers(12)
+    sampler = TargetSampler(seed=7)
+    # Give the rows different weights
+    for i, p in enumerate(providers[:6]):
+        sampler.update(p, Consensus(True, 200, 100), _answers(10 - i, i), now=NOW - i * SECONDS_PER_ROUND)
+
+    twin = np.random.default_rng(7)
+    chosen = sampler.sample(providers, 4, now=NOW)
+
+    rows = np.array([sampler.index[provider_key(p)] for p in providers])
+    keys = np.log(twin.random(len(providers))) / sampler.weights(rows, 4, NOW)
+    expected = [providers[i] for i in np.argsort(-keys)[:4]]
+    assert chosen == expected
+
+
+def test_fresh_agreed_provider_keeps_floor_weight():
+    providers = _providers(2)
+    sampler = TargetSampler(floor=0.05, seed=0)
+    sampler.update(providers[0], Consensus(True, 200, 100), _answers(10, 0), now=NOW)
+    rows = np.array([sampler._row(provider_key(p)) for p in providers])
+
+    w = sampler.weights(rows, 1, now=NOW)
+    # Just probed, nobody disagreed, never flipped: only the floor is left
+    assert w[0] == pytest.approx(0.05)
+    # Never probed: full staleness plus the unknown priors
+    assert w[1] == pytest.approx(0.05 + 1.0 + 1.0 + 0.5)
+
+
+def test_draw_frequency_follows_weights():
+    providers = _providers(3)
+    sampler = TargetSampler(floor=0.05, seed=1)
+    for p in providers[:2]:
+        sampler.update(p, Consensus(True, 200, 100), _answers(10, 0), now=NOW)
+    rows = np.array([sampler.index[provider_key(p)] for p in providers[:2]] + [sampler._row("p2")])
+    w = sampler.weights(rows, 1, now=NOW)
+
+    draws = 20000
+    counts = {p["id"]: 0 for p in providers}
+    for _ in range(draws):
+        counts[sampler.sample(providers, 1, now=NOW)[0]["id"]] += 1
+    # With k=1 an Efraimidis-Spirakis draw picks row i with p = w_i / sum(w)
+    expected = w / w.sum()
+    for i, p in enumerate(providers):
+        assert counts[p["id"]] / draws == pytest.approx(expected[i], abs=0.01)
+    # The floor keeps agreed providers in rotation
+    assert counts["p0"] > 0 and counts["p1"] > 0
+
+
+def test_save_load_round_trip(tmp_path):
+    providers = _providers(20)
+    sampler = TargetSampler(seed=3)
+    for i, p in enumerate(providers):
+        sampler.update(p, Consensus(i % 3 != 0, 200, 100), _answers(8, i % 4), now=NOW - i)
+    sampler.update(providers[0], Consensus(True, 200, 100), _answers(8, 0), now=NOW)
+    path = str(tmp_path / "sampler.npz")
+    sampler.save(path)
+
+    restored = TargetSampler(seed=3)
+    restored.load(path)
+    assert restored.keys == sampler.keys
+    assert restored.index == sampler.index
+    n = len(sampler)
+    for name in ("last_probed", "disagreement", "flip", "last_reachable", "last_status", "probes"):
+        np.testing.assert_array_equal(getattr(restored, name)[:n], getattr(sampler, name)[:n])
+    # Same state and seed: the same targets next round
+    assert restored.sample(providers, 5, now=NOW) == sampler.sample(providers, 5, now=NOW)
+
+
+def test_prune_keeps_rows_aligned():
+    providers = _providers(6)
+    sampler = TargetSampler(seed=0)
+    for i, p in enumerate(providers):
+        sampler.update(p, Consensus(True, 200, 100), _answers(10 - i, i), now=NOW)
+    before = {key: float(sampler.disagreement[row]) for key, row in sampler.index.items()}
+
+    sampler.prune(["p1", "p4"])
+    assert sampler.keys == ["p1", "p4"]
+    for key, row in sampler.index.items():
+        assert sampler.disagreement[row] == pytest.approx(before[key])
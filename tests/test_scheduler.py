@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from subnet58.validator.scheduler import ProbeScheduler, RoundAccumulator
+
+TEMPO = 360
+
+
+def _scheduler(hotkey="5Fhotkey", batches=4):
+    return ProbeScheduler(batches=batches, tempo=TEMPO, finalize_margin=10, seed_key=hotkey)
+
+
+def test_offsets_stable_per_hotkey_and_epoch():
+    a, b = _scheduler(), _scheduler()
+    assert a.plan(100) == b.plan(100)
+    # A restarted validator mid-epoch keeps the same plan
+    assert _scheduler().plan(100, start_offset=40) == a.plan(100, start_offset=40)
+    assert a.plan(100) != a.plan(101)
+    assert a.plan(100) != _scheduler("5Fother").plan(100)
+
+
+@pytest.mark.parametrize("start_offset", [0, 37, 349])
+def test_one_offset_per_slot_before_finalize(start_offset):
+    scheduler = _scheduler()
+    offsets = scheduler.plan(7, start_offset)
+    end = max(scheduler.finalize_offset, start_offset + 1)
+    slot = (end - start_offset) / scheduler.batches
+    assert len(offsets) == 4
+    for i, offset in enumerate(offsets):
+        # Block offsets are floored; a late start squeezes them together
+        assert int(start_offset + i * slot) <= offset < start_offset + (i + 1) * slot
+    assert offsets == sorted(offsets)
+
+
+def test_batches_then_finalize():
+    scheduler = _scheduler(batches=2)
+    scheduler.start_epoch(5)
+    first, second = scheduler.offsets
+    assert not scheduler.batch_due(first - 1)
+    assert scheduler.batch_due(first)
+    scheduler.batch_done()
+    assert not scheduler.finalize_due(TEMPO - 1)
+    assert scheduler.batch_due(second)
+    scheduler.batch_done()
+    assert not scheduler.batch_due(TEMPO - 1)
+    assert not scheduler.finalize_due(scheduler.finalize_offset - 1)
+    assert scheduler.finalize_due(scheduler.finalize_offset)
+    scheduler.finish()
+    assert not scheduler.pending
+
+
+def test_accumulator_folds_batches_into_one_reward_vector():
+    rng = np.random.default_rng(0)
+    providers = [{"probeUrl": f"https://p{i}.example"} for i in range(6)]
+    accuracies = rng.random((6, 5)).astype(np.float32)
+
+    burst = RoundAccumulator(range(5), [None] * 5, providers)
+    for acc in accuracies:
+        burst.add(acc)
+
+    split = RoundAccumulator(range(5), [None] * 5, providers)
+    for batch in np.array_split(np.arange(6), 3):
+        split.batches += 1
+        for i in batch:
+            split.probed.add(providers[i]["probeUrl"])
+            split.add(accuracies[i])
+        if len(split.probed) < len(providers):
+            # Later batches draw from what is left
+            assert split.unprobed() == [p for p in providers if p["probeUrl"] not in split.probed]
+
+    assert split.batches == 3
+    assert split.probe_count == 6
+    np.testing.assert_allclose(split.rewards(), accuracies.mean(axis=0), rtol=1e-6)
+    np.testing.assert_allclose(split.rewards(), burst.rewards(), rtol=1e-6)
+    # Exhausted: every provider is a candidate again
+    assert split.unprobed() == providers
+
+
+def test_empty_round_has_no_rewards():
+    assert RoundAccumulator([0, 1], [None, None], []).rewards() is None
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from subnet58.probe import ProbeResult
+from subnet58.validator import spot_check
+from subnet58.validator.spot_check import SpotChecker
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    """Fast URLs answer at once, slow ones hang until cancelled."""
+    state = {"clients": [], "unwound": []}
+
+    def make_client(timeout_ms, max_connections):
+        client = FakeClient()
+        state["clients"].append(client)
+        return client
+
+    async def probe_url(client, url):
+        try:
+            if "slow" in url:
+                await asyncio.sleep(60)
+            return ProbeResult(True, 200, 42)
+        finally:
+            state["unwound"].append(url)
+
+    monkeypatch.setattr(spot_check, "make_client", make_client)
+    monkeypatch.setattr(spot_check, "probe_url", probe_url)
+    return state
+
+
+def test_cancel_waits_for_running_checks(probes):
+    checker = SpotChecker(concurrency=2)
+
+    async def batch():
+        checker.start(["https://fast.example", "https://slow.example"])
+        await asyncio.sleep(0.01)
+        assert checker.result("https://fast.example") == ProbeResult(True, 200, 42)
+        assert checker.result("https://slow.example") is None
+        assert checker.pending("https://slow.example")
+        await checker.cancel()
+
+    asyncio.run(batch())
+    # The hung check was cancelled and had unwound before cancel() returned
+    assert sorted(probes["unwound"]) == ["https://fast.example", "https://slow.example"]
+    assert not checker.pending("https://slow.example")
+    assert checker.result("https://fast.example") is None
+
+
+def test_batch_error_still_cancels(probes):
+    checker = SpotChecker()
+
+    async def batch():
+        checker.start(["https://slow.example"])
+        try:
+            await asyncio.sleep(0.01)
+            raise RuntimeError("dendrite failed")
+        finally:
+            await checker.cancel()
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(batch())
+    assert probes["unwound"] == ["https://slow.example"]
+
+
+def test_close_releases_the_client_once(probes):
+    checker = SpotChecker()
+
+    async def run():
+        checker.start(["https://slow.example"])
+        await checker.close()
+        await checker.close()
+
+    asyncio.run(run())
+    assert [c.closed for c in probes["clients"]] == [True]
+    assert checker._client is None
@@ -0,0 +1,97 @@
+import json
+import time
+
+import pytest
+
+pytest.importorskip("bittensor")
+
+from subnet58.utils.tracing import Tracer  # noqa: E402
+
+
+def _records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def _busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_scheduled_round_is_one_record(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(path, enabled=True)
+    trace = tracer.open_round(step=3, block=1000, epoch=2)
+    with trace.part("round_start"):
+        with tracer.span("sync"):
+            pass
+    for batch in range(2):
+        # Idle between bursts: not traced, not busy
+        with tracer.span("outside"):
+            time.sleep(0.02)
+        with trace.part("batch", batch=batch):
+            with tracer.span("dendrite.query"):
+                time.sleep(0.01)
+    with trace.part("finalize"):
+        with tracer.span("set_weights"):
+            pass
+    trace.close()
+    trace.close()
+    tracer.close()
+
+    (record,) = _records(path)
+    assert record["name"] == "round"
+    assert record["attrs"]["step"] == 3 and record["attrs"]["epoch"] == 2
+    parts = record["children"]
+    assert [p["name"] for p in parts] == ["round_start", "batch", "batch", "finalize"]
+    assert [p.get("attrs", {}).get("batch") for p in parts] == [None, 0, 1, None]
+    assert [c["name"] for p in parts for c in p.get("children", [])] == [
+        "sync", "dendrite.query", "dendrite.query", "set_weights",
+    ]
+    # Parts keep their offsets in the round; busy time excludes the gaps
+    starts = [p["start_ms"] for p in parts]
+    assert starts == sorted(starts)
+    busy = record["attrs"]["busy_ms"]
+    assert sum(p["duration_ms"] for p in parts) <= busy + 1
+    assert busy + 30 < record["duration_ms"]
+
+
+def test_one_shot_round_unchanged(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(path, enabled=True)
+    with tracer.round(step=1):
+        with tracer.span("forward"):
+            pass
+    tracer.close()
+
+    (record,) = _records(path)
+    assert [c["name"] for c in record["children"]] == ["forward"]
+    assert "busy_ms" not in record["attrs"]
+
+
+def test_slow_scheduled_round_keeps_one_profile(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(path, enabled=True, profile_threshold_s=0.05, profile_interval_s=0.002)
+    trace = tracer.open_round(step=1)
+    for batch in range(3):
+        with trace.part("batch", batch=batch):
+            _busy(0.03)
+    trace.close()
+    tracer.close()
+
+    (record,) = _records(path)
+    # No single part is over the threshold, the round's busy time is
+    assert record["profile"]["samples"] > 0
+    assert list(tmp_path.glob("trace-profile-*.folded"))
+
+
+def test_disabled_tracer_is_a_noop(tmp_path):
+    tracer = Tracer(str(tmp_path / "trace.jsonl"), enabled=False)
+    trace = tracer.open_round(step=1)
+    with trace.part("batch") as span:
+        span.set(batch=0)
+        with tracer.span("inner"):
+            pass
+    trace.close()
+    assert not (tmp_path / "trace.jsonl").exists()
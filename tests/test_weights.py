@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from subnet58.validator.reward import U16_MAX, quantize_weights
+
+
+def _random_scores(rng, n):
+    scores = rng.random(n).astype(np.float32)
+    scores[rng.random(n) < 0.3] = 0
+    # Tiny scores that round to 0 against the max
+    scores[rng.random(n) < 0.1] = rng.random() * 1e-6
+    scores[0] = max(scores[0], 0.5)
+    return scores
+
+
+def test_max_scaled_and_rounded():
+    uids, weights = quantize_weights(np.array([0.0, 1.0, 0.5, 0.25], dtype=np.float32))
+    assert uids.tolist() == [1, 2, 3]
+    assert weights.dtype == np.uint16
+    # 0.5 * 65535 = 32767.5 and 0.25 * 65535 = 16383.75
+    assert weights.tolist() == [U16_MAX, 32768, 16384]
+
+
+def test_drops_uids_that_round_to_zero():
+    uids, weights = quantize_weights(np.array([1.0, 1e-6, 5e-6, 0.0], dtype=np.float32))
+    # 1e-6 * 65535 < 0.5 rounds away; 5e-6 * 65535 ~= 0.33 does too
+    assert uids.tolist() == [0]
+    assert weights.tolist() == [U16_MAX]
+    uids, _ = quantize_weights(np.array([1.0, 1e-5], dtype=np.float32))
+    assert uids.tolist() == [0, 1]
+
+
+def test_nan_and_negative_are_dropped():
+    uids, _ = quantize_weights(np.array([np.nan, 0.5, -1.0, 0.25], dtype=np.float32))
+    assert uids.tolist() == [1, 3]
+
+
+def test_order_preserved():
+    rng = np.random.default_rng(2)
+    for _ in range(100):
+        scores = _random_scores(rng, 64)
+        uids, weights = quantize_weights(scores)
+        assert weights.max() == U16_MAX
+        assert np.all(np.diff(weights[np.argsort(scores[uids], kind="stable")].astype(int)) >= 0)
+
+
+def test_top_k_and_empty():
+    scores = np.array([0.0, 0.4, 0.9, 0.4, 0.1], dtype=np.float32)
+    uids, weights = quantize_weights(scores, top_k=2)
+    assert uids.tolist() == [1, 2]
+    assert weights.max() == U16_MAX
+    # Ties at the cut go to the lower uid
+    assert quantize_weights(np.array([0.4, 0.4, 0.4]), top_k=2)[0].tolist() == [0, 1]
+    assert len(quantize_weights(np.zeros(4))[0]) == 0
+    assert len(quantize_weights(np.zeros(0))[0]) == 0
+
+
+@pytest.fixture
+def weight_utils():
+    return pytest.importorskip("bittensor.utils.weight_utils")
+
+
+def test_matches_client_conversion(weight_utils):
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        scores = _random_scores(rng, int(rng.integers(1, 256)))
+        # The pre-quantization path: L1-normalized float32 weights through the client
+        raw = scores / np.sum(scores)
+        expected = weight_utils.convert_weights_and_uids_for_emit(np.arange(len(raw)), raw)
+        uids, weights = quantize_weights(scores)
+        assert (uids.tolist(), weights.tolist()) == (list(expected[0]), list(expected[1]))
+
+
+def test_client_conversion_is_identity(weight_utils):
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        uids, weights = quantize_weights(_random_scores(rng, 64))
+        assert weight_utils.convert_weights_and_uids_for_emit(uids, weights) == (uids.tolist(), weights.tolist())